@@ -0,0 +1,318 @@
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from fastedit.core.EditPlan import EditPlan
+from fastedit.core.Scheduler import Scheduler, set_scheduler
+
+
+def _parse_operation(
+    tokens: list
+):
+    """
+    Parses an operation given on the command line as "NAME KEY=VALUE...".
+
+    Values are parsed as JSON, and kept as strings when they are not valid
+    JSON.
+
+    Parameters
+    ----------
+    tokens: list
+        Name of the operation followed by its parameters.
+
+    Returns
+    -------
+    operation: dict
+        Operation with "op" and "params" keys.
+
+    Raises
+    ------
+    ValueError
+        If a parameter is not in the KEY=VALUE form.
+    """
+    params = {}
+    for token in tokens[1:]:
+        if "=" not in token:
+            raise ValueError(
+                f"Invalid parameter '{token}'. Expected KEY=VALUE."
+            )
+        key, value = token.split("=", 1)
+        try:
+            params[key] = json.loads(value)
+        except json.JSONDecodeError:
+            params[key] = value
+    return {
+        "op": tokens[0],
+        "params": params
+    }
+
+
+def _load_manifest(
+    path: str
+):
+    """
+    Loads the edit plans of a manifest.
+
+    A manifest is a JSON file with a "version" key and a "plans" key
+    holding dictionaries with "source", "output" and "operations" keys.
+
+    Parameters
+    ----------
+    path: str
+        Path to the manifest.
+
+    Returns
+    -------
+    edit_plans: list
+        Edit plans of the manifest.
+
+    Raises
+    ------
+    ValueError
+        If the version of the manifest is not supported.
+    """
+    with open(path, "r") as file:
+        manifest = json.load(file)
+    if manifest.get("version") != EditPlan._version:
+        raise ValueError(
+            f"Invalid value: unsupported manifest version. "
+            f"Got version={manifest.get('version')}, but "
+            f"expected version={EditPlan._version}."
+        )
+    return [
+        EditPlan(
+            source=plan["source"],
+            output=plan["output"],
+            operations=plan["operations"]
+        )
+        for plan in manifest["plans"]
+    ]
+
+
+def _stamp_path(
+    edit_plan: EditPlan
+):
+    """
+    Gets the path of the file recording the edit plan of an output.
+
+    Parameters
+    ----------
+    edit_plan: EditPlan
+        The edit plan.
+
+    Returns
+    -------
+    path: str
+        Hidden file next to the output.
+    """
+    directory, name = os.path.split(edit_plan.output)
+    return os.path.join(directory, f".{name}.fastedit")
+
+
+def _is_up_to_date(
+    edit_plan: EditPlan
+):
+    """
+    Checks if the output of an edit plan is up to date.
+
+    An output is up to date when it is newer than every media the plan
+    reads and was produced by the same plan.
+
+    Parameters
+    ----------
+    edit_plan: EditPlan
+        The edit plan.
+
+    Returns
+    -------
+    is_up_to_date: bool
+        True if the edit plan does not need to run.
+    """
+    stamp_path = _stamp_path(edit_plan)
+    if not (
+        os.path.exists(edit_plan.output)
+        and os.path.exists(stamp_path)
+    ):
+        return False
+    output_mtime = os.path.getmtime(edit_plan.output)
+    for path in edit_plan.media_paths():
+        if not os.path.exists(path) or os.path.getmtime(path) > output_mtime:
+            return False
+    with open(stamp_path, "r") as file:
+        return file.read() == edit_plan.digest()
+
+
+def _run_plan(
+    edit_plan: EditPlan,
+    force: bool
+):
+    """
+    Runs an edit plan unless its output is up to date.
+
+    Parameters
+    ----------
+    edit_plan: EditPlan
+        The edit plan.
+    force: bool
+        If True, runs the edit plan even if its output is up to date.
+
+    Returns
+    -------
+    status: str
+        "done", "skipped" or "failed: " followed by the error.
+    elapsed: float
+        Seconds spent on the edit plan.
+    """
+    start = time.perf_counter()
+    if not force and _is_up_to_date(edit_plan):
+        return "skipped", time.perf_counter() - start
+    try:
+        edit_plan.run()
+    except Exception as error:
+        return f"failed: {error}", time.perf_counter() - start
+    with open(_stamp_path(edit_plan), "w") as file:
+        file.write(edit_plan.digest())
+    return "done", time.perf_counter() - start
+
+
+def main(
+    argv: list = None
+):
+    """
+    Entry point of the `fastedit` command.
+
+    Parameters
+    ----------
+    argv: list, optional
+        Command-line arguments. Default is the arguments of the process.
+
+    Returns
+    -------
+    exit_code: int
+        0 if no edit plan failed, 1 otherwise.
+    """
+    parser = argparse.ArgumentParser(
+        prog="fastedit",
+        description="Edits media in batch, from a manifest or from glob "
+        "patterns and a list of operations."
+    )
+    parser.add_argument(
+        "manifest",
+        nargs="?",
+        help="JSON manifest of edit plans"
+    )
+    parser.add_argument(
+        "-i", "--input",
+        action="append",
+        default=[],
+        help="glob pattern of the media to edit, can be repeated"
+    )
+    parser.add_argument(
+        "--op",
+        action="append",
+        nargs="+",
+        default=[],
+        metavar=("NAME", "KEY=VALUE"),
+        help="operation applied to the inputs, can be repeated, values are "
+        "parsed as JSON"
+    )
+    parser.add_argument(
+        "--ops",
+        help="JSON file with the list of operations applied to the inputs"
+    )
+    parser.add_argument(
+        "-o", "--output-dir",
+        help="directory of the edited inputs"
+    )
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=1,
+        help="number of media edited at the same time (default: 1)"
+    )
+    parser.add_argument(
+        "-f", "--force",
+        action="store_true",
+        help="edit media even if their output is up to date"
+    )
+    arguments = parser.parse_args(argv)
+    if arguments.jobs <= 0:
+        parser.error("--jobs must be a positive integer")
+    if arguments.manifest is None and not arguments.input:
+        parser.error("a manifest or at least one --input is required")
+    edit_plans = []
+    if arguments.manifest is not None:
+        edit_plans.extend(_load_manifest(arguments.manifest))
+    if arguments.input:
+        if arguments.output_dir is None:
+            parser.error("--output-dir is required with --input")
+        operations = []
+        if arguments.ops is not None:
+            with open(arguments.ops, "r") as file:
+                operations.extend(json.load(file))
+        try:
+            operations.extend(
+                _parse_operation(tokens) for tokens in arguments.op
+            )
+        except ValueError as error:
+            parser.error(str(error))
+        os.makedirs(arguments.output_dir, exist_ok=True)
+        sources = sorted(
+            {
+                path
+                for pattern in arguments.input
+                for path in glob.glob(pattern, recursive=True)
+                if os.path.isfile(path)
+            }
+        )
+        edit_plans.extend(
+            EditPlan(
+                source=source,
+                output=os.path.join(
+                    arguments.output_dir,
+                    os.path.basename(source)
+                ),
+                operations=operations
+            )
+            for source in sources
+        )
+    # Refusing plans that would overwrite their source or each other
+    outputs = {}
+    for edit_plan in edit_plans:
+        output = os.path.realpath(edit_plan.output)
+        if output == os.path.realpath(edit_plan.source):
+            parser.error(f"{edit_plan.output} would overwrite its source")
+        if output in outputs:
+            parser.error(
+                f"{outputs[output]} and {edit_plan.source} would both be "
+                f"written to {edit_plan.output}"
+            )
+        outputs[output] = edit_plan.source
+    # Running as many FFmpeg processes as edit plans
+    set_scheduler(Scheduler(max_jobs=arguments.jobs))
+    failures = 0
+    with ThreadPoolExecutor(max_workers=arguments.jobs) as pool:
+        results = pool.map(
+            lambda edit_plan: _run_plan(edit_plan, arguments.force),
+            edit_plans
+        )
+        for edit_plan, (status, elapsed) in zip(edit_plans, results):
+            if status.startswith("failed"):
+                failures += 1
+            print(
+                f"{edit_plan.source} -> {edit_plan.output}: {status} "
+                f"({elapsed:.2f}s)",
+                flush=True
+            )
+    print(
+        f"{len(edit_plans) - failures}/{len(edit_plans)} succeeded",
+        flush=True
+    )
+    return 0 if failures == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,275 @@
+import os
+import sys
+import time
+import argparse
+import traceback
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from fastedit.core.EditPlan import EditPlan
+from fastedit.core.Scheduler import Scheduler, set_scheduler
+
+# Directories of the spool, one per state of the edit plans
+_states = ["pending", "running", "done", "failed"]
+# Serialization formats, keyed by edit plan file extension
+_formats = {
+    ".json": "json",
+    ".msgpack": "msgpack"
+}
+
+
+def _prepare_spool(
+    spool: str
+):
+    """
+    Creates the directories of a spool.
+
+    Parameters
+    ----------
+    spool: str
+        Path to the spool directory.
+    """
+    for state in _states:
+        os.makedirs(
+            os.path.join(spool, state),
+            exist_ok=True
+        )
+
+
+def _claim(
+    spool: str
+):
+    """
+    Claims the oldest pending edit plan of a spool.
+
+    The plan is renamed into the running directory, which only one worker
+    can do even when many workers share the spool.
+
+    Parameters
+    ----------
+    spool: str
+        Path to the spool directory.
+
+    Returns
+    -------
+    path: str
+        Path to the claimed edit plan, None if no plan is pending.
+    """
+    pending_dir = os.path.join(spool, "pending")
+    names = sorted(
+        name for name in os.listdir(pending_dir)
+        if os.path.splitext(name)[1] in _formats
+    )
+    for name in names:
+        path = os.path.join(spool, "running", name)
+        try:
+            os.rename(
+                os.path.join(pending_dir, name),
+                path
+            )
+        except FileNotFoundError:
+            # Claimed by another worker
+            continue
+        return path
+    return None
+
+
+def _process(
+    spool: str,
+    path: str
+):
+    """
+    Runs a claimed edit plan and moves it to the done or failed directory.
+
+    The traceback of a failed plan is written next to it, with a ".error"
+    extension.
+
+    Parameters
+    ----------
+    spool: str
+        Path to the spool directory.
+    path: str
+        Path to the claimed edit plan.
+
+    Returns
+    -------
+    succeeded: bool
+        True if the edit plan ran without error.
+    """
+    name = os.path.basename(path)
+    start = time.perf_counter()
+    try:
+        with open(path, "rb") as file:
+            edit_plan = EditPlan.loads(
+                file.read(),
+                format=_formats[os.path.splitext(name)[1]]
+            )
+        edit_plan.run()
+    except Exception:
+        failed_path = os.path.join(spool, "failed", name)
+        with open(failed_path + ".error", "w") as file:
+            file.write(traceback.format_exc())
+        os.rename(path, failed_path)
+        print(f"{name}: failed", flush=True)
+        return False
+    os.rename(
+        path,
+        os.path.join(spool, "done", name)
+    )
+    print(
+        f"{name}: done in {time.perf_counter() - start:.2f}s",
+        flush=True
+    )
+    return True
+
+
+def run_worker(
+    spool: str,
+    jobs: int = 1,
+    poll_interval: float = 1,
+    once: bool = False
+):
+    """
+    Runs the edit plans of a spool directory.
+
+    Plans are written to the "pending" directory of the spool, as ".json"
+    or ".msgpack" files. They are moved to "running" when claimed, then to
+    "done" or "failed". Plans should be written elsewhere then renamed
+    into "pending", so workers never read a partially written plan.
+
+    Parameters
+    ----------
+    spool: str
+        Path to the spool directory.
+    jobs: int, optional
+        Number of edit plans run at the same time. Default is 1.
+    poll_interval: float, optional
+        Seconds between two checks of the pending directory when it is
+        empty. Default is 1.
+    once: bool, optional
+        If True, returns when no plan is pending or running, instead of
+        waiting for new plans. Default is False.
+
+    Raises
+    ------
+    TypeError
+        If spool is not a str.
+        If jobs is not an int.
+        If poll_interval is not an int or a float.
+        If once is not a bool.
+    ValueError
+        If jobs or poll_interval are not positive.
+    """
+    # Verifying parameters types
+    if not isinstance(spool, str):
+        raise TypeError(
+            f"Expected 'spool' to be of type 'str', but got "
+            f"'{type(spool).__name__}' instead."
+        )
+    if not isinstance(jobs, int):
+        raise TypeError(
+            f"Expected 'jobs' to be of type 'int', but got "
+            f"'{type(jobs).__name__}' instead."
+        )
+    if not isinstance(poll_interval, (int, float)):
+        raise TypeError(
+            f"Expected 'poll_interval' to be of type 'int' or 'float', but "
+            f"got '{type(poll_interval).__name__}' instead."
+        )
+    if not isinstance(once, bool):
+        raise TypeError(
+            f"Expected 'once' to be of type 'bool', but got "
+            f"'{type(once).__name__}' instead."
+        )
+    # Verifying parameters values
+    if jobs <= 0:
+        raise ValueError(
+            f"Invalid value: 'jobs' must be a positive integer. "
+            f"Got jobs={jobs}."
+        )
+    if poll_interval <= 0:
+        raise ValueError(
+            f"Invalid value: 'poll_interval' must be positive. "
+            f"Got poll_interval={poll_interval}."
+        )
+    _prepare_spool(spool)
+    running = set()
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while True:
+            # Filling free slots with pending plans
+            while len(running) < jobs:
+                path = _claim(spool)
+                if path is None:
+                    break
+                running.add(pool.submit(_process, spool, path))
+            if not running:
+                if once:
+                    return
+                time.sleep(poll_interval)
+                continue
+            _, running = wait(
+                running,
+                timeout=poll_interval,
+                return_when=FIRST_COMPLETED
+            )
+
+
+def main(
+    argv: list = None
+):
+    """
+    Entry point of the `fastedit-worker` command.
+
+    Parameters
+    ----------
+    argv: list, optional
+        Command-line arguments. Default is the arguments of the process.
+
+    Returns
+    -------
+    exit_code: int
+        Exit code of the command.
+    """
+    parser = argparse.ArgumentParser(
+        prog="fastedit-worker",
+        description="Runs the edit plans written to a spool directory."
+    )
+    parser.add_argument(
+        "spool",
+        help="spool directory, with pending, running, done and failed "
+        "subdirectories"
+    )
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=1,
+        help="number of edit plans run at the same time (default: 1)"
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=1,
+        help="seconds between checks of an empty spool (default: 1)"
+    )
+    parser.add_argument(
+        "--once",
+        action="store_true",
+        help="exit when no edit plan is pending instead of waiting"
+    )
+    arguments = parser.parse_args(argv)
+    if arguments.jobs <= 0:
+        parser.error("--jobs must be a positive integer")
+    # Running as many FFmpeg processes as edit plans
+    set_scheduler(Scheduler(max_jobs=arguments.jobs))
+    try:
+        run_worker(
+            spool=arguments.spool,
+            jobs=arguments.jobs,
+            poll_interval=arguments.poll_interval,
+            once=arguments.once
+        )
+    except KeyboardInterrupt:
+        return 130
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,9 @@
 import os
+import copy
 import shutil
 from tempfile import TemporaryDirectory
+from fastedit.core.Scratch import get_scratch_manager
+from fastedit.core.utils import _link_or_copy
 
 
 class _Base:
@@ -34,14 +37,50 @@ class _Base:
             raise ValueError(
                 f"The specified path '{path}' is invalid or does not exist."
             )
+        self._create_temp_files(
+            os.path.splitext(path)[1],
+            os.path.getsize(path),
+            os.getcwd()
+        )
+        # Copying source file into the main temporary file
+        shutil.copy(
+            path,
+            self._main_temp_file
+        )
+        self._scratch_manager.update(self)
+
+    def _create_temp_files(
+        self,
+        extension: str,
+        size: int,
+        directory: str
+    ):
+        """
+        Creates the temporary directory of the instance, once scratch space
+        is available.
+
+        Parameters
+        ----------
+        extension: str
+            Extension of the temporary files.
+        size: int
+            Number of bytes of the main temporary file.
+        directory: str
+            Directory in which the temporary directory is created.
+        """
+        # Waiting for scratch space for the main file
+        self._closed = None
+        self._scratch_manager = get_scratch_manager()
+        self._scratch_manager.register(
+            self,
+            size
+        )
         # Creating a temp directory for intermediate results
-        cwd = os.getcwd()
         self._temp_dir = TemporaryDirectory(
-            dir=cwd,
+            dir=directory,
             prefix="fastedit-temp-dir"
         )
         # Defining temporary files
-        extension = os.path.splitext(path)[1]
         self._main_temp_file = os.path.join(
             self._temp_dir.name,
             "main" + extension
@@ -50,8 +89,86 @@ class _Base:
             self._temp_dir.name,
             "second" + extension
         )
-        # Copying source file into the main temporary file
-        shutil.copy(
-            path,
-            self._main_temp_file
+
+    def fork(
+        self
+    ):
+        """
+        Creates an independent copy of the instance, in its current state.
+
+        The main file is shared through a hardlink when the filesystem
+        allows it, and copied otherwise. Edits never modify the main file in
+        place, so each copy only gets a file of its own once edited.
+
+        Returns
+        -------
+        forked: _Base
+            The copy of the instance.
+
+        Raises
+        ------
+        ValueError
+            If the instance is closed.
+        """
+        self._verify_open()
+        forked = copy.copy(self)
+        forked._create_temp_files(
+            os.path.splitext(self._main_temp_file)[1],
+            0,
+            os.path.dirname(self._temp_dir.name)
+        )
+        _link_or_copy(
+            self._main_temp_file,
+            forked._main_temp_file
         )
+        forked._scratch_manager.update(forked)
+        return forked
+
+    def close(
+        self
+    ):
+        """
+        Deletes the temporary files of the instance.
+
+        The instance can not be used anymore afterwards. Temporary files are
+        also deleted when the instance is garbage collected.
+        """
+        if self._closed is None:
+            self._closed = "closed"
+        self._scratch_manager.release(self)
+        self._temp_dir.cleanup()
+
+    def _verify_open(
+        self
+    ):
+        """
+        Verifies that the temporary files of the instance still exist.
+
+        Raises
+        ------
+        ValueError
+            If the instance was closed, or evicted by the scratch manager.
+        """
+        if self._closed == "evicted":
+            raise ValueError(
+                "Invalid state: the instance was closed by the scratch "
+                "manager after expiring, it can not be used anymore."
+            )
+        if self._closed is not None:
+            raise ValueError(
+                "Invalid state: the instance is closed, it can not be used "
+                "anymore."
+            )
+
+    def __enter__(
+        self
+    ):
+        return self
+
+    def __exit__(
+        self,
+        exc_type,
+        exc_value,
+        traceback
+    ):
+        self.close()
@@ -0,0 +1,336 @@
+import os
+import shutil
+import ffmpeg
+import subprocess
+from tempfile import TemporaryDirectory
+from fastedit.core.Scheduler import get_scheduler, _limit_argv_threads
+
+
+class CompiledPlan:
+    # Version of the dictionary representation
+    _version = 1
+
+    def __init__(
+        self,
+        extension: str
+    ):
+        """
+        Initializes an empty compiled plan.
+
+        A compiled plan is a list of FFmpeg commands where file paths are
+        replaced by placeholders: "{input}" for the media to edit,
+        "{output}" for the edited media, "{step0}", "{step1}"... for
+        intermediate files and "{input1}", "{input2}"... for other media
+        used by the operations.
+
+        Parameters
+        ----------
+        extension: str
+            Extension of the edited media, used for intermediate files.
+
+        Raises
+        ------
+        TypeError
+            If extension is not a str.
+        """
+        # Verifying parameters types
+        if not isinstance(extension, str):
+            raise TypeError(
+                f"Expected 'extension' to be of type 'str', but got "
+                f"'{type(extension).__name__}' instead."
+            )
+        self.extension = extension
+        # Commands as dictionaries with "argv" and "filter_graph" keys
+        self.steps = []
+        # Paths of the other media, keyed by placeholder name
+        self.inputs = {}
+
+    def _add_input(
+        self,
+        path: str
+    ):
+        """
+        Registers another media used by the operations.
+
+        Parameters
+        ----------
+        path: str
+            Path to the current content of the media.
+        """
+        if path not in self.inputs.values():
+            self.inputs[f"input{len(self.inputs) + 1}"] = path
+
+    def _add_step(
+        self,
+        argv: list,
+        source: str,
+        destination: str
+    ):
+        """
+        Adds a command, replacing known paths by placeholders.
+
+        Parameters
+        ----------
+        argv: list
+            FFmpeg command line.
+        source: str
+            Path of the file the command reads.
+        destination: str
+            Path of the file the command writes.
+        """
+        if self.steps:
+            source_name = f"step{len(self.steps) - 1}"
+        else:
+            source_name = "input"
+        replacements = [
+            (source, "{" + source_name + "}"),
+            (destination, "{" + f"step{len(self.steps)}" + "}")
+        ] + [
+            (path, "{" + name + "}")
+            for name, path in self.inputs.items()
+        ]
+        compiled_argv = []
+        for argument in argv:
+            for path, placeholder in replacements:
+                argument = argument.replace(path, placeholder)
+            compiled_argv.append(argument)
+        filter_graph = None
+        if "-filter_complex" in compiled_argv:
+            filter_graph = compiled_argv[
+                compiled_argv.index("-filter_complex") + 1
+            ]
+        self.steps.append(
+            {
+                "argv": compiled_argv,
+                "filter_graph": filter_graph
+            }
+        )
+
+    def _finalize(
+        self
+    ):
+        """
+        Makes the last command write the output placeholder.
+        """
+        if not self.steps:
+            return
+        last_step = self.steps[-1]
+        placeholder = "{" + f"step{len(self.steps) - 1}" + "}"
+        last_step["argv"] = [
+            argument.replace(placeholder, "{output}")
+            for argument in last_step["argv"]
+        ]
+        if last_step["filter_graph"] is not None:
+            last_step["filter_graph"] = last_step["filter_graph"].replace(
+                placeholder,
+                "{output}"
+            )
+
+    def to_dict(
+        self
+    ):
+        """
+        Gets a JSON serializable representation of the compiled plan.
+
+        Returns
+        -------
+        compiled_plan: dict
+            Dictionary with "version", "extension", "inputs" and "steps"
+            keys.
+        """
+        return {
+            "version": self._version,
+            "extension": self.extension,
+            "inputs": dict(self.inputs),
+            "steps": [
+                {
+                    "argv": list(step["argv"]),
+                    "filter_graph": step["filter_graph"]
+                }
+                for step in self.steps
+            ]
+        }
+
+    @classmethod
+    def from_dict(
+        cls,
+        compiled_plan: dict
+    ):
+        """
+        Creates a compiled plan from its dictionary representation.
+
+        Parameters
+        ----------
+        compiled_plan: dict
+            Dictionary returned by `to_dict`.
+
+        Returns
+        -------
+        compiled_plan: CompiledPlan
+            The compiled plan.
+
+        Raises
+        ------
+        TypeError
+            If compiled_plan is not a dict.
+        ValueError
+            If the version of compiled_plan is not supported.
+        """
+        # Verifying parameters types
+        if not isinstance(compiled_plan, dict):
+            raise TypeError(
+                f"Expected 'compiled_plan' to be of type 'dict', but got "
+                f"'{type(compiled_plan).__name__}' instead."
+            )
+        # Verifying parameters values
+        if compiled_plan.get("version") != cls._version:
+            raise ValueError(
+                f"Invalid value: unsupported compiled plan version. "
+                f"Got version={compiled_plan.get('version')}, but "
+                f"expected version={cls._version}."
+            )
+        instance = cls(compiled_plan["extension"])
+        instance.inputs = dict(compiled_plan["inputs"])
+        instance.steps = [
+            {
+                "argv": list(step["argv"]),
+                "filter_graph": step["filter_graph"]
+            }
+            for step in compiled_plan["steps"]
+        ]
+        return instance
+
+    def commands(
+        self,
+        input: str,
+        output: str,
+        inputs: dict = None,
+        temp_dir: str = None
+    ):
+        """
+        Gets the FFmpeg commands with placeholders replaced by paths.
+
+        Parameters
+        ----------
+        input: str
+            Path to the media to edit.
+        output: str
+            Path where the edited media is written.
+        inputs: dict, optional
+            Paths of the other media, keyed by placeholder name. Default
+            is the paths the plan was compiled with.
+        temp_dir: str, optional
+            Directory of the intermediate files. Default is the directory
+            of the output.
+
+        Returns
+        -------
+        commands: list
+            FFmpeg command lines, to run in order.
+        """
+        if inputs is None:
+            inputs = self.inputs
+        if temp_dir is None:
+            temp_dir = os.path.dirname(os.path.abspath(output))
+        paths = dict(
+            inputs,
+            input=input,
+            output=output
+        )
+        for index in range(len(self.steps)):
+            paths[f"step{index}"] = os.path.join(
+                temp_dir,
+                f"step{index}{self.extension}"
+            )
+        commands = []
+        for step in self.steps:
+            argv = []
+            for argument in step["argv"]:
+                for name, path in paths.items():
+                    argument = argument.replace("{" + name + "}", path)
+                argv.append(argument)
+            commands.append(argv)
+        return commands
+
+    def run(
+        self,
+        input: str,
+        output: str,
+        inputs: dict = None,
+        priority: str = "batch"
+    ):
+        """
+        Runs the compiled plan through the process-wide scheduler.
+
+        Parameters
+        ----------
+        input: str
+            Path to the media to edit.
+        output: str
+            Path where the edited media is written.
+        inputs: dict, optional
+            Paths of the other media, keyed by placeholder name. Default
+            is the paths the plan was compiled with.
+        priority: str, optional
+            Priority class of the FFmpeg jobs, "interactive" or "batch".
+            Default is "batch".
+
+        Raises
+        ------
+        TypeError
+            If input or output are not str.
+        ValueError
+            If input does not exist.
+        ffmpeg.Error
+            If a command fails.
+        """
+        # Verifying parameters types
+        if not isinstance(input, str):
+            raise TypeError(
+                f"Expected 'input' to be of type 'str', but got "
+                f"'{type(input).__name__}' instead."
+            )
+        if not isinstance(output, str):
+            raise TypeError(
+                f"Expected 'output' to be of type 'str', but got "
+                f"'{type(output).__name__}' instead."
+            )
+        # Verifying if input exists
+        if not os.path.exists(input):
+            raise ValueError(
+                f"The specified path '{input}' is invalid or does not exist."
+            )
+        if not self.steps:
+            shutil.copy(input, output)
+            return
+        with TemporaryDirectory(
+            dir=os.path.dirname(os.path.abspath(output)),
+            prefix="fastedit-temp-dir"
+        ) as temp_dir:
+            commands = self.commands(input, output, inputs, temp_dir)
+            for index, argv in enumerate(commands):
+                if index == len(commands) - 1:
+                    destination = output
+                else:
+                    destination = os.path.join(
+                        temp_dir,
+                        f"step{index}{self.extension}"
+                    )
+                with get_scheduler().slot(priority) as cmd:
+                    # Capping the decoders of every input and the encoders
+                    argv = _limit_argv_threads(
+                        argv,
+                        destination,
+                        cmd[-1]
+                    )
+                    process = subprocess.run(
+                        cmd + argv[1:],
+                        stdout=subprocess.PIPE,
+                        stderr=subprocess.PIPE
+                    )
+                if process.returncode != 0:
+                    raise ffmpeg.Error(
+                        "ffmpeg",
+                        process.stdout,
+                        process.stderr
+                    )
@@ -0,0 +1,433 @@
+import json
+import hashlib
+from fastedit.io.Video import Video
+from fastedit.io.Audio import Audio
+from fastedit.io.Subtitles import Subtitles
+from fastedit.io.Image import Image
+from fastedit.core.utils import _guess_file_type
+
+# Media classes, keyed by file type
+_media_classes = {
+    "video": Video,
+    "audio": Audio,
+    "subtitles": Subtitles,
+    "image": Image
+}
+
+
+class EditPlan:
+    # Version of the serialized representation
+    _version = 1
+    # Serialization formats
+    _formats = ["json", "msgpack"]
+
+    def __init__(
+        self,
+        source: str,
+        output: str,
+        operations: list
+    ):
+        """
+        Initializes an edit plan: a source media, a chain of operations and
+        an output path.
+
+        Operations are dictionaries with "op" and "params" keys, "op" being
+        the name of an edit operation of `Video` or `Audio`, a method
+        listed in its `_edit_operations`, and "params" its keyword
+        arguments. A parameter expecting a media is given as a dictionary
+        with a "media" key holding the media path.
+
+        Parameters
+        ----------
+        source: str
+            Path to the media to edit.
+        output: str
+            Path where the edited media is saved.
+        operations: list
+            Operations to run on the source, in order.
+
+        Raises
+        ------
+        TypeError
+            If source or output are not str.
+            If operations is not a list of dict.
+        ValueError
+            If an operation is not an edit operation of the source media
+            class.
+        """
+        # Verifying parameters types
+        if not isinstance(source, str):
+            raise TypeError(
+                f"Expected 'source' to be of type 'str', but got "
+                f"'{type(source).__name__}' instead."
+            )
+        if not isinstance(output, str):
+            raise TypeError(
+                f"Expected 'output' to be of type 'str', but got "
+                f"'{type(output).__name__}' instead."
+            )
+        if not isinstance(operations, list):
+            raise TypeError(
+                f"Expected 'operations' to be of type 'list', but got "
+                f"'{type(operations).__name__}' instead."
+            )
+        for operation in operations:
+            if not isinstance(operation, dict):
+                raise TypeError(
+                    f"Expected 'operations' items to be of type 'dict', but "
+                    f"got '{type(operation).__name__}' instead."
+                )
+        self.source = source
+        self.output = output
+        self.operations = [
+            {
+                "op": operation["op"],
+                "params": dict(operation.get("params", {}))
+            }
+            for operation in operations
+        ]
+
+    def _media_class(
+        self
+    ):
+        """
+        Gets the media class of the source, from its file type.
+
+        Returns
+        -------
+        media_class: type
+            `Video` or `Audio`.
+
+        Raises
+        ------
+        ValueError
+            If the source is not a video or an audio.
+            If an operation is not an edit operation of the media class.
+        """
+        file_type = _guess_file_type(self.source)
+        if file_type not in ["video", "audio"]:
+            raise ValueError(
+                f"Invalid source: Expected a video or audio file, got "
+                f"{file_type} file instead."
+            )
+        media_class = _media_classes[file_type]
+        for operation in self.operations:
+            op = operation["op"]
+            if op not in media_class._edit_operations:
+                raise ValueError(
+                    f"Invalid operation '{op}' for "
+                    f"{media_class.__name__}."
+                )
+        return media_class
+
+    def to_dict(
+        self
+    ):
+        """
+        Gets the dictionary representation of the edit plan.
+
+        Returns
+        -------
+        edit_plan: dict
+            Dictionary with "version", "source", "output" and "operations"
+            keys.
+        """
+        return {
+            "version": self._version,
+            "source": self.source,
+            "output": self.output,
+            "operations": [
+                {
+                    "op": operation["op"],
+                    "params": dict(operation["params"])
+                }
+                for operation in self.operations
+            ]
+        }
+
+    def digest(
+        self
+    ):
+        """
+        Gets the digest identifying the source, output and operations.
+
+        Returns
+        -------
+        digest: str
+            Hexadecimal SHA-256 digest of the edit plan.
+        """
+        data = json.dumps(
+            self.to_dict(),
+            sort_keys=True
+        )
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+    def media_paths(
+        self
+    ):
+        """
+        Gets the paths of the media the edit plan reads.
+
+        Returns
+        -------
+        paths: list
+            Path to the source, followed by the paths of the media given
+            as parameters.
+        """
+        paths = [self.source]
+        values = [
+            value
+            for operation in self.operations
+            for value in operation["params"].values()
+        ]
+        while values:
+            value = values.pop(0)
+            if isinstance(value, list):
+                values.extend(value)
+            elif isinstance(value, dict) and list(value.keys()) == ["media"]:
+                paths.append(value["media"])
+        return paths
+
+    @classmethod
+    def from_dict(
+        cls,
+        edit_plan: dict
+    ):
+        """
+        Creates an edit plan from its dictionary representation.
+
+        Parameters
+        ----------
+        edit_plan: dict
+            Dictionary returned by `to_dict`.
+
+        Returns
+        -------
+        edit_plan: EditPlan
+            The edit plan.
+
+        Raises
+        ------
+        TypeError
+            If edit_plan is not a dict.
+        ValueError
+            If the version of edit_plan is not supported.
+        """
+        # Verifying parameters types
+        if not isinstance(edit_plan, dict):
+            raise TypeError(
+                f"Expected 'edit_plan' to be of type 'dict', but got "
+                f"'{type(edit_plan).__name__}' instead."
+            )
+        # Verifying parameters values
+        if edit_plan.get("version") != cls._version:
+            raise ValueError(
+                f"Invalid value: unsupported edit plan version. "
+                f"Got version={edit_plan.get('version')}, but "
+                f"expected version={cls._version}."
+            )
+        return cls(
+            source=edit_plan["source"],
+            output=edit_plan["output"],
+            operations=edit_plan["operations"]
+        )
+
+    @classmethod
+    def _verify_format(
+        cls,
+        format: str
+    ):
+        """
+        Verifies a serialization format.
+
+        Parameters
+        ----------
+        format: str
+            Serialization format.
+
+        Raises
+        ------
+        TypeError
+            If format is not a str.
+        ValueError
+            If format is not a valid option.
+        """
+        # Verifying parameters types
+        if not isinstance(format, str):
+            raise TypeError(
+                f"Expected 'format' to be of type 'str', but got "
+                f"'{type(format).__name__}' instead."
+            )
+        # Verifying parameters values
+        if format not in cls._formats:
+            raise ValueError(
+                f"Invalid format '{format}'. Expected one of: "
+                f"{', '.join(cls._formats)}."
+            )
+
+    def dumps(
+        self,
+        format: str = "json"
+    ):
+        """
+        Serializes the edit plan.
+
+        Parameters
+        ----------
+        format: str, optional
+            Serialization format, "json" or "msgpack". Default is "json".
+
+        Returns
+        -------
+        data: bytes
+            Serialized edit plan.
+
+        Raises
+        ------
+        TypeError
+            If format is not a str.
+        ValueError
+            If format is not a valid option.
+        ImportError
+            If msgpack is requested but not installed.
+        """
+        self._verify_format(format)
+        if format == "json":
+            return json.dumps(self.to_dict(), indent=2).encode("utf-8")
+        return _import_msgpack().packb(self.to_dict())
+
+    @classmethod
+    def loads(
+        cls,
+        data: bytes,
+        format: str = "json"
+    ):
+        """
+        Deserializes an edit plan.
+
+        Parameters
+        ----------
+        data: bytes
+            Serialized edit plan.
+        format: str, optional
+            Serialization format, "json" or "msgpack". Default is "json".
+
+        Returns
+        -------
+        edit_plan: EditPlan
+            The edit plan.
+
+        Raises
+        ------
+        TypeError
+            If format is not a str.
+        ValueError
+            If format is not a valid option.
+            If the version of the edit plan is not supported.
+        ImportError
+            If msgpack is requested but not installed.
+        """
+        cls._verify_format(format)
+        if format == "json":
+            return cls.from_dict(json.loads(data))
+        return cls.from_dict(_import_msgpack().unpackb(data))
+
+    def run(
+        self,
+        priority: str = "batch"
+    ):
+        """
+        Runs the operations on the source and saves the result.
+
+        Operations are deferred, so they are optimized and rendered
+        together.
+
+        Parameters
+        ----------
+        priority: str, optional
+            Priority class of the FFmpeg jobs, "interactive" or "batch".
+            Default is "batch".
+
+        Raises
+        ------
+        ValueError
+            If the source is not a video or an audio.
+            If an operation is not an edit operation of the source media
+            class.
+        """
+        media_class = self._media_class()
+        # Media given as parameters, closed with the source
+        loaded = []
+        try:
+            with media_class(self.source) as media:
+                media.set_priority(priority)
+                media.defer()
+                for operation in self.operations:
+                    params = {
+                        name: _load_media(value, loaded)
+                        for name, value in operation["params"].items()
+                    }
+                    getattr(media, operation["op"])(**params)
+                media.save(self.output)
+        finally:
+            for parameter in loaded:
+                parameter.close()
+
+
+def _load_media(
+    value,
+    loaded: list
+):
+    """
+    Opens the media a parameter refers to.
+
+    Parameters
+    ----------
+    value: Any
+        Parameter value, a dictionary with a "media" key for media.
+    loaded: list
+        List the opened media are appended to, so they can be closed.
+
+    Returns
+    -------
+    value: Any
+        The opened media, or the value itself for other parameters.
+    """
+    if isinstance(value, list):
+        return [_load_media(item, loaded) for item in value]
+    if isinstance(value, dict) and list(value.keys()) == ["media"]:
+        path = value["media"]
+        file_type = _guess_file_type(path)
+        if file_type not in _media_classes:
+            raise ValueError(
+                f"Invalid media: Expected a video, audio, subtitles or image "
+                f"file, got {file_type} file instead."
+            )
+        media = _media_classes[file_type](path)
+        loaded.append(media)
+        return media
+    return value
+
+
+def _import_msgpack():
+    """
+    Imports msgpack, an optional dependency.
+
+    Returns
+    -------
+    msgpack: module
+        The msgpack module.
+
+    Raises
+    ------
+    ImportError
+        If msgpack is not installed.
+    """
+    try:
+        import msgpack
+    except ImportError:
+        raise ImportError(
+            "msgpack is required for msgpack edit plans, install it with "
+            "'pip install fastedit[msgpack]'."
+        )
+    return msgpack
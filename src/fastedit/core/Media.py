@@ -1,11 +1,55 @@
 import os
+import re
+import copy
+import json
+import bisect
 import shutil
+import tempfile
+import subprocess
 import ffmpeg
+from array import array
 from typing import Union
+from collections import OrderedDict
 from fastedit.core.Base import _Base
+from fastedit.core.utils import _file_digest, _link_or_copy
+from fastedit.core.Scheduler import get_scheduler
+from fastedit.core.optimizer import _optimize_plan
+from fastedit.core.CompiledPlan import CompiledPlan
+
+# Loudness measurements shared by every media, keyed by content digest and
+# audio stream, least recently used first
+_loudness_measurements = OrderedDict()
+# Maximum number of loudness measurements kept
+_max_loudness_measurements = 256
 
 
 class _Media(_Base):
+    # Points to which clip boundaries can be snapped
+    _snaps = ["keyframe"]
+    # Priority of the FFmpeg jobs of the media
+    _priority = "batch"
+    # Edit operations, the methods edit plans can run
+    _edit_operations = [
+        "clip",
+        "loop",
+        "trim_silence",
+        "normalize_loudness",
+        "fade_audio",
+        "gain",
+        "resample",
+        "remap_channels"
+    ]
+    # Operations rendered together as a single filter chain
+    _filters = []
+    # Operations rendered together as a single audio filter chain
+    _audio_filters = ["fade_audio", "gain", "resample", "remap_channels"]
+    # Operations keeping the metadata of the media
+    _metadata_keeping_operations = [
+        "fade_audio",
+        "gain",
+        "normalize_loudness"
+    ]
+
     def __init__(
         self,
         path: str
@@ -27,6 +71,51 @@ class _Media(_Base):
         """
         # Initialize instance
         super().__init__(path)
+        # Results derived from the main file, dropped when it changes
+        self._cache = {}
+        # Operations recorded while deferring, None when not deferring
+        self._plan = None
+        # Commands captured while compiling, None when not compiling
+        self._compiled = None
+        # Expected metadata of the result of the compiled commands, and
+        # whether they kept the audio of the main file
+        self._expected = None
+        # Previous versions of the main file, oldest first
+        self._history = []
+        self._history_retention = 0
+        self._history_max_bytes = None
+        # Versions of the main file kept by tag
+        self._checkpoints = {}
+        self._versions = 0
+
+    def fork(
+        self
+    ):
+        """
+        Creates an independent copy of the media, in its current state.
+
+        The main file is shared through a hardlink when the filesystem
+        allows it, and cached results like metadata are copied, so forking
+        neither copies nor probes the media. Recorded operations are copied
+        too.
+
+        Returns
+        -------
+        forked: _Media
+            The copy of the media.
+        """
+        forked = super().fork()
+        # Nested caches are filled in place, they must not be shared
+        forked._cache = {
+            key: dict(value) if isinstance(value, dict) else value
+            for key, value in self._cache.items()
+        }
+        if self._plan is not None:
+            forked._plan = list(self._plan)
+        # Kept versions are files of the original temporary directory
+        forked._history = []
+        forked._checkpoints = {}
+        return forked
 
     def __refactor_ffprobe_data(
         self,
@@ -115,180 +204,2305 @@ class _Media(_Base):
         -------
         media_metadata: dict
             Dictionary containing media's metadata.
-        """
-        ffprobe_metadata = ffmpeg.probe(
-            filename=self._main_temp_file
-        )
-        media_metadata = self.__refactor_ffprobe_data(ffprobe_metadata)
-        return media_metadata
 
-    def _move_and_replace(
-        self
-    ):
-        """
-        Moving second file to main file
+        Raises
+        ------
+        ValueError
+            If the media is closed.
         """
-        shutil.move(
-            src=self._second_temp_file,
-            dst=self._main_temp_file
-        )
+        self._verify_open()
+        # Expecting the metadata of the result of the compiled commands
+        if (
+            self._compiled is not None
+            and self._compiled.steps
+            and self._expected["metadata"] is not None
+        ):
+            return copy.deepcopy(self._expected["metadata"])
+        self._verify_current()
+        # Probing only once per version of the main file
+        if "metadata" not in self._cache:
+            ffprobe_metadata = ffmpeg.probe(
+                filename=self._main_temp_file
+            )
+            self._cache["metadata"] = self.__refactor_ffprobe_data(
+                ffprobe_metadata
+            )
+        media_metadata = copy.deepcopy(self._cache["metadata"])
+        return media_metadata
 
-    def clip(
+    def set_priority(
         self,
-        start: Union[int, float],
-        end: Union[int, float]
+        priority: str
     ):
         """
-        Extracts a portion of the media.
+        Sets the priority class of the FFmpeg jobs of the media.
 
         Parameters
         ----------
-        start: float
-            Start time of the clip in seconds.
-        end: float
-            End time of the clip in seconds.
+        priority: str
+            The priority class of the jobs. Must be one of the following:
+            - "interactive": Jobs start before any waiting batch job.
+            - "batch": Jobs start after waiting interactive jobs.
 
         Raises
         ------
         TypeError
-            If start or end are not int or float.
+            If `priority` is not a str.
         ValueError
-            If end is not strictly greater than start.
-        ValueError
-            If end is strictly greater than media duration.
+            If `priority` is not one of the valid options.
         """
         # Verifying parameters types
-        if not isinstance(start, (float, int)):
-            raise TypeError(
-                f"Expected 'start' to be of type 'float' or 'int', but got "
-                f"'{type(start).__name__}' instead."
-            )
-        if not isinstance(end, (float, int)):
+        if not isinstance(priority, str):
             raise TypeError(
-                f"Expected 'end' to be of type 'float' or 'int', but got "
-                f"'{type(start).__name__}' instead."
+                f"Expected 'priority' to be of type 'str', but got "
+                f"'{type(priority).__name__}' instead."
             )
         # Verifying parameters consistency
-        if not end > start:
+        valid_priorities = ["interactive", "batch"]
+        if priority not in valid_priorities:
             raise ValueError(
-                f"Invalid 'end' value: 'end' must be strictly greater than "
-                f"'start'. Got start={start} and end={end}."
+                f"Invalid priority '{priority}'. Expected one of: "
+                f"{', '.join(valid_priorities)}."
             )
-        metadata = self.metadata()
-        media_duration = float(metadata["duration"])
-        if not end <= media_duration:
-            raise ValueError(
-                f"Invalid 'end' value: 'end' must be less than or equal to "
-                f"the media duration. Got end={end}, but media duration is "
-                f"{media_duration}."
+        self._priority = priority
+
+    def _run(
+        self,
+        stream_spec,
+        reads_audio: bool = False,
+        **kwargs
+    ):
+        """
+        Runs an FFmpeg command through the process-wide scheduler.
+
+        Parameters
+        ----------
+        stream_spec: ffmpeg.Stream
+            The FFmpeg-python output stream to run.
+        reads_audio: bool, optional
+            If True, the command only reads the audio of the main file, so
+            it can analyse it while compiling after commands keeping the
+            audio. Default is False.
+        **kwargs
+            Keyword arguments passed to `ffmpeg.run`.
+
+        Returns
+        -------
+        out, err: tuple
+            Captured stdout and stderr of FFmpeg.
+
+        Raises
+        ------
+        ValueError
+            If the media is closed.
+        TimeoutError
+            If the scratch budget stays exhausted, see `ScratchManager`.
+        """
+        if self._compiled is not None:
+            argv = ffmpeg.compile(stream_spec)
+            # Commands writing the next version of the media are compiled
+            if any(self._second_temp_file in arg for arg in argv):
+                self._compiled._add_step(
+                    argv,
+                    self._main_temp_file,
+                    self._second_temp_file
+                )
+                return None, None
+            # Analyses run for real, on the media before any compiled step
+            self._verify_current(
+                audio=reads_audio
+            )
+        # Keeping the files of the media while FFmpeg uses them, once the
+        # next version of the media fits in the scratch budget
+        size = 0
+        if any(
+            self._second_temp_file in arg
+            for arg in ffmpeg.compile(stream_spec)
+        ):
+            size = os.path.getsize(self._main_temp_file)
+        with self._scratch_manager.busy(self):
+            self._scratch_manager.reserve(
+                self,
+                size
+            )
+            return get_scheduler().run(
+                stream_spec,
+                priority=self._priority,
+                **kwargs
             )
-        # Trimming input media
-        input = ffmpeg.input(
-            filename=self._main_temp_file,
-            ss=start,
-            to=end
-        )
-        # Defining output and codec copying
-        output = ffmpeg.output(
-            input,
-            self._second_temp_file,
-            c="copy"
-        )
-        overwrite = ffmpeg.overwrite_output(
-            output
-        )
-        # Running command
-        ffmpeg.run(
-            stream_spec=overwrite,
-            quiet=True
-        )
-        # Saving result to main file
-        self._move_and_replace()
 
-    def loop(
+    def defer(
+        self
+    ):
+        """
+        Starts recording operations instead of running them.
+
+        Recorded operations are optimized and run together by `render`.
+        Parameters are verified when operations are recorded, against the
+        media as it was before any recorded operation.
+        """
+        if self._plan is None:
+            self._plan = []
+
+    def _record(
         self,
-        duration: Union[int, float]
+        op: str,
+        **params
     ):
         """
-        Loops a media over a specified time period.
+        Records an operation if operations are deferred.
 
         Parameters
         ----------
-        duration: int or float
-            The duration, in seconds, for which the media will loop.
+        op: str
+            Name of the operation method.
+        **params
+            Parameters of the operation method.
+
+        Returns
+        -------
+        recorded: bool
+            True if the operation was recorded and must not run now.
+        """
+        if self._plan is None:
+            return False
+        self._plan.append(
+            {
+                "op": op,
+                "params": params
+            }
+        )
+        return True
+
+    def _frame_size(
+        self
+    ):
+        """
+        Gets the frame size of the media.
+
+        Returns
+        -------
+        frame_size: tuple
+            Height and width in pixels, None for media without frames.
+        """
+        return None
+
+    def plan(
+        self
+    ):
+        """
+        Gets the optimized plan of the recorded operations.
+
+        Returns
+        -------
+        plan: list
+            Operations as dictionaries with "op" and "params" keys, in the
+            order they would run.
 
         Raises
         ------
-        TypeError
-            If duration is not int or float.
+        ValueError
+            If merged operations are not valid anymore.
         """
-        # Verifying parameters types
-        if not isinstance(duration, (float, int)):
-            raise TypeError(
-                f"Expected 'duration' to be of type 'float' or 'int', but got "
-                f"'{type(duration).__name__}' instead."
+        if not self._plan:
+            return []
+        plan = _optimize_plan(
+            self._plan,
+            self._frame_size(),
+            any(
+                stream["codec_type"] == "subtitle"
+                for stream in self.metadata()["streams"]
             )
-        # Looping input media
-        input = ffmpeg.input(
-            filename=self._main_temp_file,
-            stream_loop="-1",
-            t=duration
         )
-        # Defining output and codec copying
-        output = ffmpeg.output(
-            input,
-            self._second_temp_file,
-            c="copy"
+        return plan
+
+    def render(
+        self
+    ):
+        """
+        Runs the optimized plan of the recorded operations.
+
+        Consecutive filters are rendered in a single encode, starting with
+        a clip of the input when the plan starts with one, and streams left
+        untouched are copied. Operations are not deferred anymore afterwards.
+
+        Raises
+        ------
+        ValueError
+            If merged operations are not valid anymore.
+        """
+        plan = self.plan()
+        # Running operations for real
+        self._plan = None
+        self._execute(plan)
+
+    def compile(
+        self
+    ):
+        """
+        Compiles the recorded operations to FFmpeg commands without
+        running them.
+
+        Commands are the ones `render` would run. The recorded operations
+        are kept, they can still be rendered afterwards. Operations needing
+        metadata get the metadata expected after the previous operations,
+        like the size after a crop or the duration after a clip. Analyses
+        needed by the operations, like loudness measurements, run on the
+        media as it is before the recorded operations. They can only follow
+        operations keeping what they analyse, like an audio measurement
+        after video filters that copy the audio.
+
+        Returns
+        -------
+        compiled_plan: CompiledPlan
+            The FFmpeg commands, with placeholders instead of file paths.
+
+        Raises
+        ------
+        ValueError
+            If merged operations are not valid anymore.
+            If an operation analyses the content of a previous operation
+            result, or needs metadata that cannot be expected, like after
+            mixing audio.
+        """
+        plan = self.plan()
+        compiled_plan = CompiledPlan(
+            os.path.splitext(self._main_temp_file)[1]
         )
-        overwrite = ffmpeg.overwrite_output(
-            output
+        for operation in plan:
+            for value in operation["params"].values():
+                values = value if isinstance(value, list) else [value]
+                for media in values:
+                    if isinstance(media, _Base):
+                        compiled_plan._add_input(media._main_temp_file)
+        recorded_plan = self._plan
+        self._plan = None
+        self._expected = {
+            "metadata": self.metadata(),
+            "audio": True
+        }
+        self._compiled = compiled_plan
+        try:
+            self._execute(plan)
+        finally:
+            self._plan = recorded_plan
+            self._compiled = None
+            self._expected = None
+        compiled_plan._finalize()
+        return compiled_plan
+
+    def _execute(
+        self,
+        plan: list
+    ):
+        """
+        Runs the operations of an optimized plan.
+
+        Parameters
+        ----------
+        plan: list
+            Operations as dictionaries with "op" and "params" keys.
+        """
+        index = 0
+        while index < len(plan):
+            operation = plan[index]
+            following = plan[index + 1] if index + 1 < len(plan) else None
+            # Fusing a clip with the following filters
+            clip = None
+            if (
+                operation["op"] == "clip"
+                and operation["params"]["snap"] is None
+                and following is not None
+                and following["op"] in self._filters
+            ):
+                clip = operation
+                index += 1
+            if plan[index]["op"] in self._filters:
+                operations = []
+                while index < len(plan) and plan[index]["op"] in self._filters:
+                    operations.append(plan[index])
+                    index += 1
+                self._render_filters(
+                    operations,
+                    clip
+                )
+                if clip is not None:
+                    operations.insert(0, clip)
+            elif operation["op"] in self._audio_filters:
+                operations = []
+                while (
+                    index < len(plan)
+                    and plan[index]["op"] in self._audio_filters
+                ):
+                    operations.append(plan[index])
+                    index += 1
+                self._render_audio_filters(operations)
+            else:
+                getattr(self, operation["op"])(**operation["params"])
+                operations = [operation]
+                index += 1
+            if self._compiled is not None:
+                self._expect(operations)
+
+    def _expect(
+        self,
+        operations: list
+    ):
+        """
+        Updates the expected result of the compiled commands.
+
+        Parameters
+        ----------
+        operations: list
+            Operations just compiled, as dictionaries with "op" and "params"
+            keys.
+        """
+        for operation in operations:
+            if self._expected["metadata"] is not None:
+                self._expected["metadata"] = self._expected_metadata(
+                    self._expected["metadata"],
+                    operation
+                )
+            if not self._copies_audio(operation):
+                self._expected["audio"] = False
+
+    def _expected_metadata(
+        self,
+        metadata: dict,
+        operation: dict
+    ):
+        """
+        Gets the metadata expected after an operation.
+
+        Parameters
+        ----------
+        metadata: dict
+            Metadata before the operation, as returned by `metadata`.
+        operation: dict
+            Operation with "op" and "params" keys.
+
+        Returns
+        -------
+        metadata: dict
+            Metadata expected after the operation, None if it cannot be
+            expected.
+        """
+        op, params = operation["op"], operation["params"]
+        if op in self._metadata_keeping_operations:
+            return metadata
+        if op in ["clip", "trim"] and params.get("snap") is None:
+            return _with_duration(metadata, params["end"] - params["start"])
+        if op == "loop":
+            return _with_duration(metadata, params["duration"])
+        if op in ["resample", "remap_channels"]:
+            for stream in metadata["streams"]:
+                if stream["codec_type"] != "audio":
+                    continue
+                if op == "resample":
+                    stream["sample_rate"] = str(params["sample_rate"])
+                else:
+                    stream["channels"] = len(params["channels"])
+                    stream.pop("channel_layout", None)
+            return metadata
+        return None
+
+    def _copies_audio(
+        self,
+        operation: dict
+    ):
+        """
+        Checks if an operation keeps the audio of the media unchanged.
+
+        Parameters
+        ----------
+        operation: dict
+            Operation with "op" and "params" keys.
+
+        Returns
+        -------
+        copies_audio: bool
+            True if the audio streams are stream-copied.
+        """
+        return False
+
+    def _move_and_replace(
+        self
+    ):
+        """
+        Moving second file to main file
+        """
+        # Compiled commands do not write the second file
+        if self._compiled is not None:
+            return
+        # Keeping the previous main file for undo
+        if self._history_retention > 0:
+            path = self._version_path()
+            os.rename(
+                self._main_temp_file,
+                path
+            )
+            self._history.append(path)
+        shutil.move(
+            src=self._second_temp_file,
+            dst=self._main_temp_file
         )
-        # Running command
-        ffmpeg.run(
-            stream_spec=overwrite,
-            quiet=True
+        self._trim_history()
+        # Cached results describe the previous main file
+        self._cache = {}
+        self._scratch_manager.update(self)
+
+    def _version_path(
+        self
+    ):
+        """
+        Gets a new path for a kept version of the main file.
+
+        Returns
+        -------
+        path: str
+            Path in the temporary directory of the media.
+        """
+        self._versions += 1
+        extension = os.path.splitext(self._main_temp_file)[1]
+        return os.path.join(
+            self._temp_dir.name,
+            f"version{self._versions}{extension}"
         )
-        # Saving result to main file
-        self._move_and_replace()
 
-    def save(
+    def _trim_history(
+        self
+    ):
+        """
+        Deletes the oldest versions exceeding the retention count or the
+        disk cap.
+        """
+        while self._history and (
+            len(self._history) > self._history_retention
+            or (
+                self._history_max_bytes is not None
+                and sum(map(os.path.getsize, self._history))
+                > self._history_max_bytes
+            )
+        ):
+            os.remove(self._history.pop(0))
+
+    def set_history(
         self,
-        path: str
+        retention: int,
+        max_bytes: int = None
     ):
         """
-        Saves the media file to the specified path in the filesystem.
+        Sets how many previous versions of the media are kept for `undo`.
+
+        Previous versions are kept by renaming the main file, they are
+        never copied. History is disabled by default.
 
         Parameters
         ----------
-        path : str
-            The destination file path where the media file will be saved.
+        retention: int
+            Maximum number of previous versions kept, 0 to disable history.
+        max_bytes: int, optional
+            Maximum number of bytes of previous versions, the oldest ones
+            are deleted first. Default is None, for no limit.
 
         Raises
         ------
         TypeError
-            If `path` is not of type `str`.
+            If retention or max_bytes are not int.
         ValueError
-            If the specified `path` is invalid or does not exist.
+            If retention is negative or max_bytes is not positive.
         """
-        # Verifying path's type
-        if not isinstance(path, str):
+        # Verifying parameters types
+        if not isinstance(retention, int):
             raise TypeError(
-                f"Expected 'path' to be of type 'str', but got "
-                f"'{type(path).__name__}' instead."
+                f"Expected 'retention' to be of type 'int', but got "
+                f"'{type(retention).__name__}' instead."
             )
-        # Verifying if path exists
-        media_abs_path = os.path.abspath(
-            path=path
-        )
-        media_dir_path = os.path.dirname(
-            p=media_abs_path
+        if max_bytes is not None and not isinstance(max_bytes, int):
+            raise TypeError(
+                f"Expected 'max_bytes' to be of type 'int', but got "
+                f"'{type(max_bytes).__name__}' instead."
+            )
+        # Verifying parameters values
+        if retention < 0:
+            raise ValueError(
+                f"Invalid value: 'retention' must be a non-negative "
+                f"integer. Got retention={retention}."
+            )
+        if max_bytes is not None and max_bytes <= 0:
+            raise ValueError(
+                f"Invalid value: 'max_bytes' must be a positive integer. "
+                f"Got max_bytes={max_bytes}."
+            )
+        self._history_retention = retention
+        self._history_max_bytes = max_bytes
+        self._trim_history()
+        self._scratch_manager.update(self)
+
+    def undo(
+        self
+    ):
+        """
+        Reverts the media to its version before the last operation.
+
+        Raises
+        ------
+        ValueError
+            If no previous version is kept.
+        """
+        if not self._history:
+            raise ValueError(
+                "Nothing to undo: no previous version is kept, enable "
+                "history with 'set_history'."
+            )
+        os.replace(
+            self._history.pop(),
+            self._main_temp_file
+        )
+        self._cache = {}
+        self._scratch_manager.update(self)
+
+    def checkpoint(
+        self,
+        tag: str
+    ):
+        """
+        Keeps the current version of the media under a tag.
+
+        The version is kept through a hardlink of the main file, so it
+        costs no disk space until the media is edited.
+
+        Parameters
+        ----------
+        tag: str
+            Name of the version, replacing any version with the same name.
+
+        Raises
+        ------
+        TypeError
+            If tag is not a str.
+        """
+        # Verifying parameters types
+        if not isinstance(tag, str):
+            raise TypeError(
+                f"Expected 'tag' to be of type 'str', but got "
+                f"'{type(tag).__name__}' instead."
+            )
+        if tag in self._checkpoints:
+            os.remove(self._checkpoints.pop(tag))
+        path = self._version_path()
+        _link_or_copy(
+            self._main_temp_file,
+            path
+        )
+        self._checkpoints[tag] = path
+        self._scratch_manager.update(self)
+
+    def restore(
+        self,
+        tag: str
+    ):
+        """
+        Reverts the media to a version kept by `checkpoint`.
+
+        Restoring is an operation itself, it can be undone when history is
+        enabled.
+
+        Parameters
+        ----------
+        tag: str
+            Name of the version.
+
+        Raises
+        ------
+        TypeError
+            If tag is not a str.
+        ValueError
+            If no version is kept under tag.
+        """
+        # Verifying parameters types
+        if not isinstance(tag, str):
+            raise TypeError(
+                f"Expected 'tag' to be of type 'str', but got "
+                f"'{type(tag).__name__}' instead."
+            )
+        # Verifying parameters consistency
+        if tag not in self._checkpoints:
+            raise ValueError(
+                f"Invalid tag '{tag}'. Expected one of: "
+                f"{', '.join(self._checkpoints)}."
+            )
+        _link_or_copy(
+            self._checkpoints[tag],
+            self._second_temp_file
+        )
+        self._move_and_replace()
+
+    def _verify_current(
+        self,
+        audio: bool = False
+    ):
+        """
+        Verifies the main file is the current version of the media.
+
+        Parameters
+        ----------
+        audio: bool, optional
+            If True, only verifies the audio of the main file is current.
+            Default is False.
+
+        Raises
+        ------
+        ValueError
+            If commands writing a newer version were compiled.
+        """
+        if self._compiled is not None and self._compiled.steps:
+            if audio and self._expected["audio"]:
+                return
+            raise ValueError(
+                "Invalid plan: an operation depends on the result of a "
+                "previous compiled operation. Render the previous "
+                "operations before compiling this one."
+            )
+
+    def _packet_index(
+        self
+    ):
+        """
+        Gets the packet index of the main stream of the media.
+
+        The main stream is the first video stream, or the first audio stream
+        when there is no video. The index is built from a single demux-only
+        FFprobe scan and cached as compact arrays.
+
+        Returns
+        -------
+        packet_index: dict
+            Dictionary containing packets presentation timestamps ("pts") and
+            sizes ("sizes") in decoding order, and sorted keyframes
+            timestamps ("keyframes").
+
+        Raises
+        ------
+        ffmpeg.Error
+            If FFprobe fails to read the packets.
+        """
+        self._verify_current()
+        if "packets" not in self._cache:
+            metadata = self.metadata()
+            codec_types = [
+                stream.get("codec_type")
+                for stream in metadata["streams"]
+            ]
+            stream_selector = "v:0" if "video" in codec_types else "a:0"
+            # Reading packets without decoding them
+            args = [
+                "ffprobe",
+                "-v", "error",
+                "-select_streams", stream_selector,
+                "-show_entries", "packet=pts_time,size,flags",
+                "-of", "csv=p=0",
+                self._main_temp_file
+            ]
+            pts = array("d")
+            sizes = array("q")
+            keyframes = array("d")
+            # Buffering errors in a file, an unread pipe could fill up
+            with self._scratch_manager.busy(self), \
+                    get_scheduler().slot(self._priority), \
+                    tempfile.TemporaryFile() as errors:
+                process = subprocess.Popen(
+                    args,
+                    stdout=subprocess.PIPE,
+                    stderr=errors
+                )
+                for line in process.stdout:
+                    fields = line.decode().strip().split(",")
+                    # Packets without timestamp cannot be seeked to
+                    if len(fields) < 3 or fields[0] == "N/A":
+                        continue
+                    timestamp = float(fields[0])
+                    pts.append(timestamp)
+                    sizes.append(int(fields[1]))
+                    if "K" in fields[2]:
+                        keyframes.append(timestamp)
+                process.communicate()
+                if process.returncode != 0:
+                    errors.seek(0)
+                    raise ffmpeg.Error(
+                        "ffprobe",
+                        None,
+                        errors.read()
+                    )
+            self._cache["packets"] = {
+                "pts": pts,
+                "sizes": sizes,
+                "keyframes": array("d", sorted(keyframes))
+            }
+        return self._cache["packets"]
+
+    def keyframes(
+        self
+    ):
+        """
+        Gets keyframes timestamps of the main stream of the media.
+
+        Returns
+        -------
+        keyframes: list
+            Sorted keyframes timestamps in seconds.
+        """
+        keyframes = list(self._packet_index()["keyframes"])
+        return keyframes
+
+    def _keyframe_before(
+        self,
+        timestamp: float
+    ):
+        """
+        Gets the last keyframe at or before the specified timestamp.
+
+        This is where decoding has to start to seek to the timestamp.
+
+        Parameters
+        ----------
+        timestamp: float
+            Timestamp in seconds.
+
+        Returns
+        -------
+        keyframe: float
+            Timestamp in seconds of the keyframe, or 0 if there is no
+            keyframe before the timestamp.
+        """
+        keyframes = self._packet_index()["keyframes"]
+        # Tolerating rounding errors of printed timestamps
+        position = bisect.bisect_right(keyframes, timestamp + 1e-3)
+        if position == 0:
+            return 0.0
+        return keyframes[position - 1]
+
+    def _is_keyframe(
+        self,
+        timestamp: float
+    ):
+        """
+        Checks if a stream copy can start exactly at the specified timestamp.
+
+        Parameters
+        ----------
+        timestamp: float
+            Timestamp in seconds.
+
+        Returns
+        -------
+        is_keyframe: bool
+            True if a keyframe is within a millisecond of the timestamp.
+        """
+        keyframe = self._keyframe_before(timestamp)
+        is_keyframe = abs(keyframe - timestamp) <= 1e-3
+        return is_keyframe
+
+    def _snap_points(
+        self,
+        snap: str
+    ):
+        """
+        Gets the timestamps to which clip boundaries can be snapped.
+
+        Parameters
+        ----------
+        snap: str
+            The kind of points to snap to, one of `_snaps`.
+
+        Returns
+        -------
+        points: list
+            Sorted timestamps in seconds.
+
+        Raises
+        ------
+        NameError
+            If the snap is not found.
+        """
+        if snap == "keyframe":
+            return self.keyframes()
+        raise NameError(
+            "Snap not found"
+        )
+
+    def clip(
+        self,
+        start: Union[int, float],
+        end: Union[int, float],
+        snap: str = None,
+        accurate: bool = False
+    ):
+        """
+        Extracts a portion of the media.
+
+        Parameters
+        ----------
+        start: float
+            Start time of the clip in seconds.
+        end: float
+            End time of the clip in seconds.
+        snap: str, optional
+            Moves start and end to the nearest point of the specified kind,
+            "keyframe" or "scene" on videos. Default is None.
+        accurate: bool, optional
+            Whether the clip must start exactly at `start`. Streams are copied
+            when `start` is on a keyframe and re-encoded otherwise. When
+            False, streams are always copied and the clip starts at the
+            keyframe before `start`. Default is False.
+
+        Raises
+        ------
+        TypeError
+            If start or end are not int or float.
+            If snap is not a str.
+            If accurate is not a bool.
+        ValueError
+            If end is not strictly greater than start.
+        ValueError
+            If end is strictly greater than media duration.
+        ValueError
+            If snap is not a valid option.
+            If start and end snap to the same point.
+        """
+        # Verifying parameters types
+        if not isinstance(start, (float, int)):
+            raise TypeError(
+                f"Expected 'start' to be of type 'float' or 'int', but got "
+                f"'{type(start).__name__}' instead."
+            )
+        if not isinstance(end, (float, int)):
+            raise TypeError(
+                f"Expected 'end' to be of type 'float' or 'int', but got "
+                f"'{type(start).__name__}' instead."
+            )
+        if snap is not None and not isinstance(snap, str):
+            raise TypeError(
+                f"Expected 'snap' to be of type 'str', but got "
+                f"'{type(snap).__name__}' instead."
+            )
+        if not isinstance(accurate, bool):
+            raise TypeError(
+                f"Expected 'accurate' to be of type 'bool', but got "
+                f"'{type(accurate).__name__}' instead."
+            )
+        # Verifying parameters consistency
+        if not end > start:
+            raise ValueError(
+                f"Invalid 'end' value: 'end' must be strictly greater than "
+                f"'start'. Got start={start} and end={end}."
+            )
+        metadata = self.metadata()
+        media_duration = float(metadata["duration"])
+        if not end <= media_duration:
+            raise ValueError(
+                f"Invalid 'end' value: 'end' must be less than or equal to "
+                f"the media duration. Got end={end}, but media duration is "
+                f"{media_duration}."
+            )
+        if snap is not None and snap not in self._snaps:
+            raise ValueError(
+                f"Invalid snap '{snap}'. Expected one of: "
+                f"{', '.join(self._snaps)}."
+            )
+        # Deferring operation when a plan is recorded
+        if self._record(
+            "clip",
+            start=start,
+            end=end,
+            snap=snap,
+            accurate=accurate
+        ):
+            return
+        # Snapping boundaries to the nearest points
+        if snap is not None:
+            points = [0.0] + self._snap_points(snap) + [media_duration]
+            snapped_start = min(points, key=lambda point: abs(point - start))
+            snapped_end = min(points, key=lambda point: abs(point - end))
+            if not snapped_end > snapped_start:
+                raise ValueError(
+                    f"Invalid 'snap' value: start={start} and end={end} "
+                    f"both snap to {snapped_start} with snap='{snap}'."
+                )
+            start, end = snapped_start, snapped_end
+        # Trimming input media
+        input = ffmpeg.input(
+            filename=self._main_temp_file,
+            ss=start,
+            to=end
+        )
+        # Copying codecs unless the cut would not start on a keyframe
+        if not accurate or self._is_keyframe(start):
+            output = ffmpeg.output(
+                input,
+                self._second_temp_file,
+                c="copy"
+            )
+        else:
+            output = ffmpeg.output(
+                input,
+                self._second_temp_file
+            )
+        overwrite = ffmpeg.overwrite_output(
+            output
+        )
+        # Running command
+        self._run(
+            stream_spec=overwrite,
+            quiet=True
+        )
+        # Saving result to main file
+        self._move_and_replace()
+
+    def loop(
+        self,
+        duration: Union[int, float]
+    ):
+        """
+        Loops a media over a specified time period.
+
+        Whole repeats of the media are stream-copied through a concat list,
+        only the final partial repeat is re-encoded, so the result lasts
+        exactly `duration` seconds.
+
+        Parameters
+        ----------
+        duration: int or float
+            The duration, in seconds, for which the media will loop.
+
+        Raises
+        ------
+        TypeError
+            If duration is not int or float.
+        ValueError
+            If duration is not positive.
+        """
+        # Verifying parameters types
+        if not isinstance(duration, (float, int)):
+            raise TypeError(
+                f"Expected 'duration' to be of type 'float' or 'int', but got "
+                f"'{type(duration).__name__}' instead."
+            )
+        # Verifying parameters values
+        if duration <= 0:
+            raise ValueError(
+                f"Invalid value: 'duration' must be positive. "
+                f"Got duration={duration}."
+            )
+        # Deferring operation when a plan is recorded
+        if self._record("loop", duration=duration):
+            return
+        # Compiled plans hold single commands, looping without a concat list
+        if self._compiled is not None:
+            input = ffmpeg.input(
+                filename=self._main_temp_file,
+                stream_loop="-1",
+                t=duration
+            )
+            output = ffmpeg.output(
+                input,
+                self._second_temp_file,
+                c="copy"
+            )
+            overwrite = ffmpeg.overwrite_output(
+                output
+            )
+            self._run(
+                stream_spec=overwrite,
+                quiet=True
+            )
+            self._move_and_replace()
+            return
+        metadata = self.metadata()
+        media_duration = float(metadata["duration"])
+        repeats = int(duration // media_duration)
+        remainder = round(duration - repeats * media_duration, 6)
+        extension = os.path.splitext(self._main_temp_file)[1]
+        tail_path = os.path.join(self._temp_dir.name, "tail" + extension)
+        list_path = os.path.join(self._temp_dir.name, "loop.txt")
+        entries = [(self._main_temp_file, media_duration)] * repeats
+        try:
+            # Re-encoding the partial repeat with the codecs of the media
+            if remainder > 0:
+                kwargs = {"c:s": "copy"}
+                for stream in metadata["streams"]:
+                    if stream["codec_type"] == "video":
+                        kwargs["c:v"] = stream["codec_name"]
+                        kwargs["pix_fmt"] = stream["pix_fmt"]
+                    elif stream["codec_type"] == "audio":
+                        kwargs["c:a"] = stream["codec_name"]
+                        kwargs["ar"] = stream["sample_rate"]
+                        kwargs["ac"] = stream["channels"]
+                input = ffmpeg.input(
+                    filename=self._main_temp_file,
+                    t=remainder
+                )
+                output = ffmpeg.output(
+                    input,
+                    tail_path,
+                    **kwargs
+                )
+                overwrite = ffmpeg.overwrite_output(
+                    output
+                )
+                self._run(
+                    stream_spec=overwrite,
+                    quiet=True
+                )
+                entries.append((tail_path, remainder))
+            # Listing every repeat, durations spare probing each of them
+            with open(list_path, "w") as file:
+                file.write("ffconcat version 1.0\n")
+                for path, entry_duration in entries:
+                    file.write(
+                        f"file '{path}'\nduration {entry_duration}\n"
+                    )
+            # Copying the repeats one after the other
+            input = ffmpeg.input(
+                filename=list_path,
+                f="concat",
+                safe=0
+            )
+            output = ffmpeg.output(
+                input,
+                self._second_temp_file,
+                c="copy"
+            )
+            overwrite = ffmpeg.overwrite_output(
+                output
+            )
+            # Running command
+            self._run(
+                stream_spec=overwrite,
+                quiet=True
+            )
+        finally:
+            for path in [tail_path, list_path]:
+                if os.path.exists(path):
+                    os.remove(path)
+        # Saving result to main file
+        self._move_and_replace()
+
+    def loop_to(
+        self,
+        media: "_Media"
+    ):
+        """
+        Loops a media to the duration of another media, like a music bed
+        under a video.
+
+        Parameters
+        ----------
+        media: _Media
+            The media whose duration is matched. Its metadata is read from
+            its cache when available.
+
+        Raises
+        ------
+        TypeError
+            If media is not an instance of `_Media`.
+        """
+        # Verifying parameters types
+        if not isinstance(media, _Media):
+            raise TypeError(
+                f"Expected 'media' to be of type '_Media', but got "
+                f"'{type(media).__name__}' instead."
+            )
+        self.loop(
+            duration=float(media.metadata()["duration"])
+        )
+
+    def detect_silence(
+        self,
+        noise: Union[int, float] = -50,
+        duration: Union[int, float] = 0.5
+    ):
+        """
+        Detects silent intervals in a single decode of the audio.
+
+        Only the first audio stream is decoded. Intervals are cached with the
+        metadata of the media, so later calls with the same parameters reuse
+        them.
+
+        Parameters
+        ----------
+        noise: int or float, optional
+            Level (in dB) under which the audio is silent. Default is -50.
+        duration: int or float, optional
+            Minimum duration (in seconds) of a silent interval. Default is
+            0.5.
+
+        Returns
+        -------
+        intervals: list
+            Sorted (start, end) tuples in seconds of the silent intervals.
+
+        Raises
+        ------
+        TypeError
+            If noise or duration are not int or float.
+        ValueError
+            If noise is not negative.
+            If duration is not positive.
+            If the media has no audio stream.
+        """
+        # Verifying parameters types
+        if not isinstance(noise, (int, float)):
+            raise TypeError(
+                f"Expected 'noise' to be of type 'int' or 'float', but got "
+                f"'{type(noise).__name__}' instead."
+            )
+        if not isinstance(duration, (int, float)):
+            raise TypeError(
+                f"Expected 'duration' to be of type 'int' or 'float', but got "
+                f"'{type(duration).__name__}' instead."
+            )
+        # Verifying parameters values
+        if noise >= 0:
+            raise ValueError(
+                f"Invalid value: 'noise' must be negative. Got noise={noise}."
+            )
+        if duration <= 0:
+            raise ValueError(
+                f"Invalid value: 'duration' must be positive. "
+                f"Got duration={duration}."
+            )
+        self._audio_metadata()
+        self._verify_current(
+            audio=True
+        )
+        silences = self._cache.setdefault("silences", {})
+        key = (noise, duration)
+        if key not in silences:
+            # Decoding the audio only
+            input = ffmpeg.input(
+                filename=self._main_temp_file
+            )
+            stream = ffmpeg.filter(
+                input["a:0"],
+                "silencedetect",
+                noise=f"{noise}dB",
+                duration=duration
+            )
+            output = ffmpeg.output(
+                stream,
+                "-",
+                format="null"
+            )
+            # Running command
+            _, stderr = self._run(
+                stream_spec=output,
+                reads_audio=True,
+                capture_stderr=True,
+                quiet=True
+            )
+            silences[key] = _parse_intervals(
+                stderr.decode(errors="replace"),
+                r"silence_(start|end):\s*(-?[0-9.]+)",
+                float(self.metadata()["duration"])
+            )
+        return list(silences[key])
+
+    def trim_silence(
+        self,
+        noise: Union[int, float] = -50,
+        duration: Union[int, float] = 0.5,
+        accurate: bool = False
+    ):
+        """
+        Removes the silence at the start and at the end of the media.
+
+        The media is cut with `clip`, so streams are copied and, unless
+        `accurate` is True, the cut starts at the keyframe before the end
+        of the leading silence.
+
+        Parameters
+        ----------
+        noise: int or float, optional
+            Level (in dB) under which the audio is silent. Default is -50.
+        duration: int or float, optional
+            Minimum duration (in seconds) of a silent interval. Default is
+            0.5.
+        accurate: bool, optional
+            Whether the media must start exactly at the end of the leading
+            silence, see `clip`. Default is False.
+
+        Raises
+        ------
+        TypeError
+            If noise or duration are not int or float.
+            If accurate is not a bool.
+        ValueError
+            If noise is not negative.
+            If duration is not positive.
+            If the media has no audio stream.
+            If the media is silent from start to end.
+        """
+        # Verifying parameters types
+        if not isinstance(accurate, bool):
+            raise TypeError(
+                f"Expected 'accurate' to be of type 'bool', but got "
+                f"'{type(accurate).__name__}' instead."
+            )
+        # Deferring operation when a plan is recorded
+        if self._record(
+            "trim_silence",
+            noise=noise,
+            duration=duration,
+            accurate=accurate
+        ):
+            return
+        self._trim_intervals(
+            self.detect_silence(
+                noise=noise,
+                duration=duration
+            ),
+            accurate=accurate
+        )
+
+    def _trim_intervals(
+        self,
+        intervals: list,
+        accurate: bool,
+        tolerance: float = 0
+    ):
+        """
+        Clips the media to remove the intervals touching its start and end.
+
+        Parameters
+        ----------
+        intervals: list
+            Sorted (start, end) tuples in seconds.
+        accurate: bool
+            Whether the media must start exactly at the end of the leading
+            interval, see `clip`.
+        tolerance: float, optional
+            Seconds between an interval and the first timestamp or the end
+            of the media for the interval to touch it. Default is 0.
+
+        Raises
+        ------
+        ValueError
+            If a single interval covers the whole media.
+        """
+        metadata = self.metadata()
+        media_duration = float(metadata["duration"])
+        # Streams may start after 0, e.g. after AAC priming
+        first_timestamp = float(metadata.get("start_time", 0))
+        start, end = 0.0, media_duration
+        if intervals and intervals[0][0] <= first_timestamp + tolerance:
+            start = intervals[0][1]
+        if intervals and intervals[-1][1] >= media_duration - tolerance:
+            end = intervals[-1][0]
+        if start == 0 and end == media_duration:
+            return
+        if not end > start:
+            raise ValueError(
+                "Nothing to keep: the media is covered from start to end by "
+                "the detected intervals."
+            )
+        self.clip(
+            start=start,
+            end=end,
+            accurate=accurate
+        )
+
+    def _digest(
+        self,
+        audio: bool = False
+    ):
+        """
+        Gets the digest identifying the content of the main file.
+
+        Parameters
+        ----------
+        audio: bool, optional
+            If True, the digest only identifies the audio, so the main file
+            only needs to have the current audio. Default is False.
+
+        Returns
+        -------
+        digest: str
+            Hexadecimal SHA-256 digest of the main file content.
+        """
+        self._verify_current(
+            audio=audio
+        )
+        if "digest" not in self._cache:
+            self._cache["digest"] = _file_digest(self._main_temp_file)
+        return self._cache["digest"]
+
+    def _measure_loudness(
+        self,
+        stream: int = 0
+    ):
+        """
+        Measures the loudness of an audio stream.
+
+        Measurements only depend on the content, so they are shared between
+        every media with the same content and computed once. Only the most
+        recently used measurements are kept.
+
+        Parameters
+        ----------
+        stream: int, optional
+            Index of the audio stream among the audio streams. Default is 0.
+
+        Returns
+        -------
+        measurement: dict
+            Dictionary containing integrated loudness, true peak, loudness
+            range and threshold of the input.
+
+        Raises
+        ------
+        ffmpeg.Error
+            If FFmpeg fails to measure the audio.
+        """
+        key = (
+            self._digest(
+                audio=True
+            ),
+            stream
+        )
+        if key in _loudness_measurements:
+            _loudness_measurements.move_to_end(key)
+        else:
+            # Input
+            input = ffmpeg.input(
+                filename=self._main_temp_file
+            )
+            # Analysing loudness without writing any output
+            measured = ffmpeg.filter(
+                input[f"a:{stream}"],
+                "loudnorm",
+                print_format="json"
+            )
+            output = ffmpeg.output(
+                measured,
+                "-",
+                format="null"
+            )
+            # Running command
+            _, stderr = self._run(
+                stream_spec=output,
+                reads_audio=True,
+                capture_stderr=True,
+                quiet=True
+            )
+            # Report is the last JSON object printed by loudnorm
+            stderr = stderr.decode(errors="replace")
+            report = json.loads(
+                stderr[stderr.rindex("{"):stderr.rindex("}") + 1]
+            )
+            _loudness_measurements[key] = {
+                name: float(report[name])
+                for name in [
+                    "input_i",
+                    "input_tp",
+                    "input_lra",
+                    "input_thresh"
+                ]
+            }
+            if len(_loudness_measurements) > _max_loudness_measurements:
+                _loudness_measurements.popitem(last=False)
+        return dict(_loudness_measurements[key])
+
+    def normalize_loudness(
+        self,
+        target_lufs: Union[int, float] = -23,
+        true_peak: Union[int, float] = -1
+    ):
+        """
+        Normalizes loudness of the audio with a two-pass EBU R128 loudnorm.
+
+        The first pass measures the audio and is cached per content, the
+        second pass applies a linear gain. Every audio stream is normalized
+        on its own, video and subtitles streams are stream-copied.
+
+        Parameters
+        ----------
+        target_lufs: int or float, optional
+            Integrated loudness target in LUFS. Range is -70 to -5. Default
+            is -23.
+        true_peak: int or float, optional
+            Maximum true peak in dBTP. Range is -9 to 0. Default is -1.
+
+        Raises
+        ------
+        TypeError
+            If target_lufs or true_peak are not int or float.
+        ValueError
+            If target_lufs is not between -70 and -5.
+            If true_peak is not between -9 and 0.
+        ValueError
+            If the media has no audio stream.
+        """
+        # Verifying parameters types
+        if not isinstance(target_lufs, (int, float)):
+            raise TypeError(
+                f"Expected 'target_lufs' to be of type 'int' or 'float', but "
+                f"got '{type(target_lufs).__name__}' instead."
+            )
+        if not isinstance(true_peak, (int, float)):
+            raise TypeError(
+                f"Expected 'true_peak' to be of type 'int' or 'float', but "
+                f"got '{type(true_peak).__name__}' instead."
+            )
+        # Verifying parameters values
+        if not -70 <= target_lufs <= -5:
+            raise ValueError(
+                f"Invalid value: 'target_lufs' must be between -70 and -5. "
+                f"Got target_lufs={target_lufs}."
+            )
+        if not -9 <= true_peak <= 0:
+            raise ValueError(
+                f"Invalid value: 'true_peak' must be between -9 and 0. "
+                f"Got true_peak={true_peak}."
+            )
+        # Deferring operation when a plan is recorded
+        if self._record(
+            "normalize_loudness",
+            target_lufs=target_lufs,
+            true_peak=true_peak
+        ):
+            return
+        # Raising when the media has no audio stream
+        self._audio_metadata()
+        audio_streams = [
+            stream
+            for stream in self.metadata()["streams"]
+            if stream.get("codec_type") == "audio"
+        ]
+        # Input
+        input = ffmpeg.input(
+            filename=self._main_temp_file
+        )
+        normalized_streams = []
+        kwargs = {}
+        for index, audio_metadata in enumerate(audio_streams):
+            # First pass, measuring the stream
+            measurement = self._measure_loudness(
+                stream=index
+            )
+            # Linear mode requires a target range covering the input range
+            loudness_range = min(max(7, measurement["input_lra"]), 50)
+            # Second pass, applying a linear gain
+            normalized_streams.append(
+                ffmpeg.filter(
+                    input[f"a:{index}"],
+                    "loudnorm",
+                    i=target_lufs,
+                    tp=true_peak,
+                    lra=loudness_range,
+                    measured_i=measurement["input_i"],
+                    measured_tp=measurement["input_tp"],
+                    measured_lra=measurement["input_lra"],
+                    measured_thresh=measurement["input_thresh"],
+                    linear="true"
+                )
+            )
+            # Loudnorm upsamples so sample rate is restored
+            kwargs[f"ar:a:{index}"] = audio_metadata["sample_rate"]
+        # Defining output
+        output = ffmpeg.output(
+            input["v?"],
+            *normalized_streams,
+            input["s?"],
+            self._second_temp_file,
+            vcodec="copy",
+            scodec="copy",
+            **kwargs
+        )
+        overwrite = ffmpeg.overwrite_output(
+            output
+        )
+        # Running command
+        self._run(
+            stream_spec=overwrite,
+            quiet=True
+        )
+        # Saving result to main file
+        self._move_and_replace()
+
+    def _audio_metadata(
+        self
+    ):
+        """
+        Gets the metadata of the first audio stream.
+
+        Returns
+        -------
+        audio_metadata: dict
+            Metadata of the first audio stream.
+
+        Raises
+        ------
+        ValueError
+            If the media has no audio stream.
+        """
+        metadata = self.metadata()
+        audio_metadata = next(
+            (
+                stream
+                for stream in metadata["streams"]
+                if stream.get("codec_type") == "audio"
+            ),
+            None
+        )
+        if audio_metadata is None:
+            raise ValueError(
+                "No stream with 'codec_type' == 'audio' found."
+            )
+        return audio_metadata
+
+    def _render_audio_filters(
+        self,
+        operations: list
+    ):
+        """
+        Renders audio filter operations in a single encode.
+
+        Every audio stream goes through the filter chain on its own, video
+        and subtitles streams are stream-copied.
+
+        Parameters
+        ----------
+        operations: list
+            Operations of `_audio_filters`, as dictionaries with "op" and
+            "params" keys, applied in order.
+        """
+        self._audio_metadata()
+        audio_count = len([
+            stream
+            for stream in self.metadata()["streams"]
+            if stream.get("codec_type") == "audio"
+        ])
+        input = ffmpeg.input(
+            filename=self._main_temp_file
+        )
+        streams = []
+        for index in range(audio_count):
+            # Chaining filters on the audio stream, tracking its duration
+            # for the filters timed from the end
+            stream = input[f"a:{index}"]
+            media_duration = float(self.metadata()["duration"])
+            for operation in operations:
+                build_filter = getattr(self, f"_{operation['op']}_filter")
+                params = dict(operation["params"])
+                if operation["op"] == "fade_audio":
+                    params["media_duration"] = media_duration
+                stream = build_filter(
+                    stream,
+                    **params
+                )
+                if operation["op"] == "trim":
+                    media_duration = params["end"] - params["start"]
+            streams.append(stream)
+        # Defining output and codec copying
+        output = ffmpeg.output(
+            input["v?"],
+            *streams,
+            input["s?"],
+            self._second_temp_file,
+            vcodec="copy",
+            scodec="copy"
+        )
+        overwrite = ffmpeg.overwrite_output(
+            output
+        )
+        # Running command
+        self._run(
+            stream_spec=overwrite,
+            quiet=True
+        )
+        # Saving result to main file
+        self._move_and_replace()
+
+    def fade_audio(
+        self,
+        fade_in: Union[int, float] = 0,
+        fade_out: Union[int, float] = 0
+    ):
+        """
+        Fades the audio in from silence and out to silence.
+
+        Parameters
+        ----------
+        fade_in: int or float, optional
+            Duration (in seconds) of the fade in at the start. Default is 0,
+            for no fade in.
+        fade_out: int or float, optional
+            Duration (in seconds) of the fade out at the end. Default is 0,
+            for no fade out.
+
+        Raises
+        ------
+        TypeError
+            If fade_in or fade_out are not int or float.
+        ValueError
+            If fade_in or fade_out are negative or longer than the media.
+            If both fade_in and fade_out are 0.
+        """
+        # Verifying parameters types
+        if not isinstance(fade_in, (int, float)):
+            raise TypeError(
+                f"Expected 'fade_in' to be of type 'int' or 'float', but got "
+                f"'{type(fade_in).__name__}' instead."
+            )
+        if not isinstance(fade_out, (int, float)):
+            raise TypeError(
+                f"Expected 'fade_out' to be of type 'int' or 'float', but "
+                f"got '{type(fade_out).__name__}' instead."
+            )
+        # Verifying parameters values
+        media_duration = float(self.metadata()["duration"])
+        for name, value in [("fade_in", fade_in), ("fade_out", fade_out)]:
+            if not 0 <= value <= media_duration:
+                raise ValueError(
+                    f"Invalid value: '{name}' must be between 0 and the "
+                    f"media duration. Got {name}={value}, but media "
+                    f"duration is {media_duration}."
+                )
+        if fade_in == 0 and fade_out == 0:
+            raise ValueError(
+                "Invalid value: 'fade_in' or 'fade_out' must be positive. "
+                "Got fade_in=0 and fade_out=0."
+            )
+        # Deferring operation when a plan is recorded
+        if self._record("fade_audio", fade_in=fade_in, fade_out=fade_out):
+            return
+        self._render_audio_filters(
+            [
+                {
+                    "op": "fade_audio",
+                    "params": {"fade_in": fade_in, "fade_out": fade_out}
+                }
+            ]
+        )
+
+    def _fade_audio_filter(
+        self,
+        stream,
+        fade_in: Union[int, float],
+        fade_out: Union[int, float],
+        media_duration: float
+    ):
+        """
+        Applies the fading filters to an audio stream.
+
+        Parameters are the ones of `fade_audio`, and `media_duration`, the
+        duration of the audio stream at this point of the filter chain.
+
+        Returns
+        -------
+        stream: ffmpeg.Stream
+            The faded audio stream.
+        """
+        if fade_in > 0:
+            stream = ffmpeg.filter(
+                stream,
+                "afade",
+                type="in",
+                start_time=0,
+                duration=fade_in
+            )
+        if fade_out > 0:
+            # Fading out relatively to the duration of the stream
+            stream = ffmpeg.filter(
+                stream,
+                "afade",
+                type="out",
+                start_time=max(0, media_duration - fade_out),
+                duration=fade_out
+            )
+        return stream
+
+    def gain(
+        self,
+        gain: Union[int, float]
+    ):
+        """
+        Changes the volume of the audio.
+
+        Parameters
+        ----------
+        gain: int or float
+            Gain in decibels, negative values lower the volume.
+
+        Raises
+        ------
+        TypeError
+            If gain is not an int or float.
+        """
+        # Verifying parameters types
+        if not isinstance(gain, (int, float)):
+            raise TypeError(
+                f"Expected 'gain' to be of type 'int' or 'float', but got "
+                f"'{type(gain).__name__}' instead."
+            )
+        # Deferring operation when a plan is recorded
+        if self._record("gain", gain=gain):
+            return
+        self._render_audio_filters(
+            [
+                {
+                    "op": "gain",
+                    "params": {"gain": gain}
+                }
+            ]
+        )
+
+    def _gain_filter(
+        self,
+        stream,
+        gain: Union[int, float]
+    ):
+        """
+        Applies the volume filter to an audio stream.
+
+        Parameters are the ones of `gain`.
+
+        Returns
+        -------
+        stream: ffmpeg.Stream
+            The audio stream with its volume changed.
+        """
+        return ffmpeg.filter(
+            stream,
+            "volume",
+            f"{gain}dB"
+        )
+
+    def _trim_filter(
+        self,
+        stream,
+        start: Union[int, float],
+        end: Union[int, float]
+    ):
+        """
+        Applies the trimming filters to an audio stream.
+
+        Parameters are the ones of `trim`.
+
+        Returns
+        -------
+        stream: ffmpeg.Stream
+            The trimmed audio stream, starting at 0.
+        """
+        stream = ffmpeg.filter(
+            stream,
+            "atrim",
+            start=start,
+            end=end
+        )
+        return ffmpeg.filter(
+            stream,
+            "asetpts",
+            "PTS-STARTPTS"
+        )
+
+    def resample(
+        self,
+        sample_rate: int
+    ):
+        """
+        Changes the sample rate of the audio.
+
+        Parameters
+        ----------
+        sample_rate: int
+            Sample rate in Hz, like 44100 or 48000.
+
+        Raises
+        ------
+        TypeError
+            If sample_rate is not an int.
+        ValueError
+            If sample_rate is not positive.
+        """
+        # Verifying parameters types
+        if not isinstance(sample_rate, int):
+            raise TypeError(
+                f"Expected 'sample_rate' to be of type 'int', but got "
+                f"'{type(sample_rate).__name__}' instead."
+            )
+        # Verifying parameters values
+        if sample_rate <= 0:
+            raise ValueError(
+                f"Invalid value: 'sample_rate' must be a positive integer. "
+                f"Got sample_rate={sample_rate}."
+            )
+        # Deferring operation when a plan is recorded
+        if self._record("resample", sample_rate=sample_rate):
+            return
+        self._render_audio_filters(
+            [
+                {
+                    "op": "resample",
+                    "params": {"sample_rate": sample_rate}
+                }
+            ]
+        )
+
+    def _resample_filter(
+        self,
+        stream,
+        sample_rate: int
+    ):
+        """
+        Applies the resampling filter to an audio stream.
+
+        Parameters are the ones of `resample`.
+
+        Returns
+        -------
+        stream: ffmpeg.Stream
+            The resampled audio stream.
+        """
+        return ffmpeg.filter(
+            stream,
+            "aresample",
+            sample_rate
+        )
+
+    def remap_channels(
+        self,
+        channels: list
+    ):
+        """
+        Rearranges the channels of the audio.
+
+        Parameters
+        ----------
+        channels: list
+            Index of the input channel of each output channel. For example
+            [1, 0] swaps left and right, [0] keeps only the left channel and
+            [0, 0] copies the left channel to both sides.
+
+        Raises
+        ------
+        TypeError
+            If channels is not a list of int.
+        ValueError
+            If channels is empty.
+            If a channel index does not exist in the audio.
+            If the media has no audio stream.
+        """
+        # Verifying parameters types
+        if not isinstance(channels, list):
+            raise TypeError(
+                f"Expected 'channels' to be of type 'list', but got "
+                f"'{type(channels).__name__}' instead."
+            )
+        for channel in channels:
+            if not isinstance(channel, int):
+                raise TypeError(
+                    f"Expected 'channels' items to be of type 'int', but got "
+                    f"'{type(channel).__name__}' instead."
+                )
+        # Verifying parameters values
+        if not channels:
+            raise ValueError(
+                "Invalid value: 'channels' must not be empty."
+            )
+        channels_count = int(self._audio_metadata()["channels"])
+        for channel in channels:
+            if not 0 <= channel < channels_count:
+                raise ValueError(
+                    f"Invalid value: channel indexes must be between 0 and "
+                    f"{channels_count - 1}. Got channel={channel}."
+                )
+        # Deferring operation when a plan is recorded
+        if self._record("remap_channels", channels=channels):
+            return
+        self._render_audio_filters(
+            [
+                {
+                    "op": "remap_channels",
+                    "params": {"channels": channels}
+                }
+            ]
+        )
+
+    def _remap_channels_filter(
+        self,
+        stream,
+        channels: list
+    ):
+        """
+        Applies the channel mapping filter to an audio stream.
+
+        Parameters are the ones of `remap_channels`.
+
+        Returns
+        -------
+        stream: ffmpeg.Stream
+            The audio stream with its channels rearranged.
+        """
+        layouts = {
+            1: "mono",
+            2: "stereo",
+            6: "5.1"
+        }
+        return ffmpeg.filter(
+            stream,
+            "channelmap",
+            map="|".join(str(channel) for channel in channels),
+            channel_layout=layouts.get(len(channels), f"{len(channels)}c")
+        )
+
+    def save(
+        self,
+        path: str
+    ):
+        """
+        Saves the media file to the specified path in the filesystem.
+
+        Parameters
+        ----------
+        path : str
+            The destination file path where the media file will be saved.
+
+        Raises
+        ------
+        TypeError
+            If `path` is not of type `str`.
+        ValueError
+            If the specified `path` is invalid or does not exist.
+        ValueError
+            If the media is closed.
+        """
+        self._verify_open()
+        # Verifying path's type
+        if not isinstance(path, str):
+            raise TypeError(
+                f"Expected 'path' to be of type 'str', but got "
+                f"'{type(path).__name__}' instead."
+            )
+        # Verifying if path exists
+        media_abs_path = os.path.abspath(
+            path=path
+        )
+        media_dir_path = os.path.dirname(
+            p=media_abs_path
         )
         if not os.path.exists(media_dir_path):
             raise ValueError(
                 f"The specified path '{path}' is invalid or does not exist."
             )
+        # Running recorded operations, deferring the next ones again
+        if self._plan:
+            self.render()
+            self.defer()
         # Copying file to filesystem
         shutil.copy(
             self._main_temp_file,
             path
         )
+
+    def peaks(
+        self,
+        resolution: int
+    ):
+        """
+        Computes waveform peaks of the first audio stream.
+
+        The audio is decoded to mono in a single streamed pass and reduced
+        chunk by chunk, so memory stays bounded whatever the media duration.
+        Every computed resolution is stored in a pyramid of coarser levels,
+        so any multiple of a cached resolution is derived without decoding
+        again.
+
+        Parameters
+        ----------
+        resolution: int
+            Number of audio samples summarized by each peak.
+
+        Returns
+        -------
+        minimums: numpy.ndarray
+            Minimum sample value of each window.
+        maximums: numpy.ndarray
+            Maximum sample value of each window.
+
+        Raises
+        ------
+        TypeError
+            If resolution is not an int.
+        ValueError
+            If resolution is not a positive integer.
+        ValueError
+            If the media has no audio stream.
+        ImportError
+            If NumPy is not installed.
+        """
+        # Verifying parameters types
+        if not isinstance(resolution, int):
+            raise TypeError(
+                f"Expected 'resolution' to be of type 'int', but got "
+                f"'{type(resolution).__name__}' instead."
+            )
+        # Verifying parameters values
+        if resolution <= 0:
+            raise ValueError(
+                f"Invalid value: 'resolution' must be a positive integer. "
+                f"Got resolution={resolution}."
+            )
+        try:
+            import numpy as np
+        except ImportError:
+            raise ImportError(
+                "NumPy is required to compute peaks, install it with "
+                "'pip install fastedit[numpy]'."
+            )
+        self._verify_current(
+            audio=True
+        )
+        pyramid = self._cache.setdefault("peaks", {})
+        # Deriving from the coarsest cached level dividing the resolution
+        divisors = [
+            level
+            for level in pyramid
+            if resolution % level == 0
+        ]
+        if divisors:
+            level = max(divisors)
+            minimums, maximums = pyramid[level]
+            factor = resolution // level
+        else:
+            minimums, maximums = self.__decode_peaks(resolution)
+            factor = 1
+        if factor > 1:
+            minimums, maximums = _reduce_peaks(
+                minimums,
+                maximums,
+                factor
+            )
+        # Storing the requested level and its coarser levels
+        level = resolution
+        while level not in pyramid:
+            pyramid[level] = (minimums, maximums)
+            if len(minimums) <= 1:
+                break
+            minimums, maximums = _reduce_peaks(
+                minimums,
+                maximums,
+                2
+            )
+            level *= 2
+        minimums, maximums = pyramid[resolution]
+        return np.copy(minimums), np.copy(maximums)
+
+    def __decode_peaks(
+        self,
+        resolution: int
+    ):
+        """
+        Decodes the first audio stream and reduces it to peaks.
+
+        Parameters
+        ----------
+        resolution: int
+            Number of audio samples summarized by each peak.
+
+        Returns
+        -------
+        minimums: numpy.ndarray
+            Minimum sample value of each window.
+        maximums: numpy.ndarray
+            Maximum sample value of each window.
+
+        Raises
+        ------
+        ValueError
+            If the media has no audio stream.
+        ffmpeg.Error
+            If FFmpeg fails to decode the audio.
+        """
+        import numpy as np
+        # Verifying that an audio stream exists
+        metadata = self.metadata()
+        if not any(
+            stream.get("codec_type") == "audio"
+            for stream in metadata["streams"]
+        ):
+            raise ValueError(
+                "No stream with 'codec_type' == 'audio' found."
+            )
+        # Decoding audio to raw mono float samples
+        input = ffmpeg.input(
+            filename=self._main_temp_file
+        )
+        output = ffmpeg.output(
+            input["a:0"],
+            "pipe:",
+            format="f32le",
+            acodec="pcm_f32le",
+            ac=1
+        )
+        output = output.global_args(
+            "-loglevel",
+            "error"
+        )
+        # Holding a scheduler slot while the decoder runs, buffering errors
+        # in a file as an unread pipe could fill up
+        with self._scratch_manager.busy(self), \
+                get_scheduler().slot(self._priority) as cmd, \
+                tempfile.TemporaryFile() as errors:
+            process = subprocess.Popen(
+                ffmpeg.compile(output, cmd=cmd),
+                stdout=subprocess.PIPE,
+                stderr=errors
+            )
+            # Reducing around one million samples at a time
+            sample_size = np.dtype(np.float32).itemsize
+            windows_per_chunk = max(1, 2 ** 20 // resolution)
+            chunk_size = windows_per_chunk * resolution * sample_size
+            minimums = []
+            maximums = []
+            while True:
+                chunk = process.stdout.read(chunk_size)
+                if not chunk:
+                    break
+                samples = np.frombuffer(
+                    chunk[:len(chunk) - len(chunk) % sample_size],
+                    dtype=np.float32
+                )
+                windows = len(samples) // resolution
+                if windows:
+                    full = samples[:windows * resolution].reshape(
+                        windows,
+                        resolution
+                    )
+                    minimums.append(full.min(axis=1))
+                    maximums.append(full.max(axis=1))
+                # Only the last chunk can end with a partial window
+                rest = samples[windows * resolution:]
+                if len(rest):
+                    minimums.append(rest.min(keepdims=True))
+                    maximums.append(rest.max(keepdims=True))
+            process.communicate()
+            if process.returncode != 0:
+                errors.seek(0)
+                raise ffmpeg.Error(
+                    "ffmpeg",
+                    None,
+                    errors.read()
+                )
+        if not minimums:
+            empty = np.zeros(0, dtype=np.float32)
+            return empty, empty
+        return np.concatenate(minimums), np.concatenate(maximums)
+
+
+def _reduce_peaks(
+    minimums,
+    maximums,
+    factor: int
+):
+    """
+    Merges consecutive peaks windows by the specified factor.
+
+    Parameters
+    ----------
+    minimums: numpy.ndarray
+        Minimum sample value of each window.
+    maximums: numpy.ndarray
+        Maximum sample value of each window.
+    factor: int
+        Number of consecutive windows merged together.
+
+    Returns
+    -------
+    minimums: numpy.ndarray
+        Minimum sample value of each merged window.
+    maximums: numpy.ndarray
+        Maximum sample value of each merged window.
+    """
+    import numpy as np
+    # Padding with neutral values to a multiple of the factor
+    padding = -len(minimums) % factor
+    minimums = np.concatenate(
+        [minimums, np.full(padding, np.inf, dtype=minimums.dtype)]
+    )
+    maximums = np.concatenate(
+        [maximums, np.full(padding, -np.inf, dtype=maximums.dtype)]
+    )
+    return (
+        minimums.reshape(-1, factor).min(axis=1),
+        maximums.reshape(-1, factor).max(axis=1)
+    )
+
+
+def _parse_intervals(
+    log: str,
+    pattern: str,
+    media_duration: float
+):
+    """
+    Parses the intervals logged by a detection filter.
+
+    Parameters
+    ----------
+    log: str
+        Standard error of FFmpeg.
+    pattern: str
+        Regular expression matching the start and end of an interval, with
+        "start" or "end" as first group and the timestamp as second group.
+    media_duration: float
+        Duration of the media in seconds, ending an interval still open at
+        the end of the log.
+
+    Returns
+    -------
+    intervals: list
+        Sorted (start, end) tuples in seconds, clamped to the media.
+    """
+    intervals = []
+    start = None
+    for boundary, timestamp in re.findall(pattern, log):
+        timestamp = min(max(float(timestamp), 0.0), media_duration)
+        if boundary == "start":
+            start = timestamp
+        elif start is not None:
+            intervals.append((start, timestamp))
+            start = None
+    if start is not None:
+        intervals.append((start, media_duration))
+    return sorted(intervals)
+
+
+def _with_duration(
+    metadata: dict,
+    duration: Union[int, float]
+):
+    """
+    Changes the duration of media metadata.
+
+    Parameters
+    ----------
+    metadata: dict
+        Metadata, as returned by `_Media.metadata`.
+    duration: int or float
+        New duration in seconds.
+
+    Returns
+    -------
+    metadata: dict
+        The metadata with the new duration, without the frame counts and
+        bitrates depending on the old one.
+    """
+    metadata["duration"] = f"{duration:.6f}"
+    for key in ["size", "bit_rate"]:
+        metadata.pop(key, None)
+    for stream in metadata["streams"]:
+        stream["duration"] = f"{duration:.6f}"
+        for key in ["nb_frames", "bit_rate"]:
+            stream.pop(key, None)
+    return metadata
@@ -0,0 +1,350 @@
+import os
+import heapq
+import ffmpeg
+import itertools
+import threading
+from contextlib import contextmanager
+from ffmpeg.dag import topo_sort
+from ffmpeg.nodes import InputNode, OutputNode, get_stream_spec_nodes
+
+
+class Scheduler:
+    # Priority classes, from the most to the least urgent
+    _priorities = ["interactive", "batch"]
+
+    def __init__(
+        self,
+        max_jobs: int = None,
+        threads: int = None
+    ):
+        """
+        Initializes a scheduler limiting concurrent FFmpeg processes.
+
+        Jobs wait for a free slot, interactive jobs are started before batch
+        jobs and jobs of the same priority are started in submission order.
+
+        Parameters
+        ----------
+        max_jobs: int, optional
+            Maximum number of FFmpeg processes running at the same time.
+            Default is a quarter of the CPU count, at least 1.
+        threads: int, optional
+            Default number of threads used by each FFmpeg process for
+            decoding and filtering. Default is the CPU count divided by
+            `max_jobs`, at least 1.
+
+        Raises
+        ------
+        TypeError
+            If max_jobs or threads are not int.
+        ValueError
+            If max_jobs or threads are not positive integers.
+        """
+        # Verifying parameters types
+        if max_jobs is not None and not isinstance(max_jobs, int):
+            raise TypeError(
+                f"Expected 'max_jobs' to be of type 'int', but got "
+                f"'{type(max_jobs).__name__}' instead."
+            )
+        if threads is not None and not isinstance(threads, int):
+            raise TypeError(
+                f"Expected 'threads' to be of type 'int', but got "
+                f"'{type(threads).__name__}' instead."
+            )
+        # Verifying parameters values
+        if max_jobs is not None and max_jobs <= 0:
+            raise ValueError(
+                f"Invalid value: 'max_jobs' must be a positive integer. "
+                f"Got max_jobs={max_jobs}."
+            )
+        if threads is not None and threads <= 0:
+            raise ValueError(
+                f"Invalid value: 'threads' must be a positive integer. "
+                f"Got threads={threads}."
+            )
+        cpu_count = os.cpu_count() or 1
+        if max_jobs is None:
+            max_jobs = max(1, cpu_count // 4)
+        if threads is None:
+            threads = max(1, cpu_count // max_jobs)
+        self.max_jobs = max_jobs
+        self.threads = threads
+        # Waiting jobs, ordered by priority then submission
+        self._queue = []
+        self._tickets = itertools.count()
+        self._running = 0
+        self._condition = threading.Condition()
+
+    def _verify_job(
+        self,
+        priority: str,
+        threads: int
+    ):
+        """
+        Verifies the parameters of a job.
+
+        Parameters
+        ----------
+        priority: str
+            Priority class of the job.
+        threads: int
+            Number of threads of the job, or None.
+
+        Raises
+        ------
+        TypeError
+            If priority is not a str.
+            If threads is not an int.
+        ValueError
+            If priority is not a valid option.
+            If threads is not a positive integer.
+        """
+        # Verifying parameters types
+        if not isinstance(priority, str):
+            raise TypeError(
+                f"Expected 'priority' to be of type 'str', but got "
+                f"'{type(priority).__name__}' instead."
+            )
+        if threads is not None and not isinstance(threads, int):
+            raise TypeError(
+                f"Expected 'threads' to be of type 'int', but got "
+                f"'{type(threads).__name__}' instead."
+            )
+        # Verifying parameters values
+        if priority not in self._priorities:
+            raise ValueError(
+                f"Invalid priority '{priority}'. Expected one of: "
+                f"{', '.join(self._priorities)}."
+            )
+        if threads is not None and threads <= 0:
+            raise ValueError(
+                f"Invalid value: 'threads' must be a positive integer. "
+                f"Got threads={threads}."
+            )
+
+    @contextmanager
+    def slot(
+        self,
+        priority: str = "batch",
+        threads: int = None
+    ):
+        """
+        Waits for a free slot and holds it until the context exits.
+
+        Parameters
+        ----------
+        priority: str, optional
+            Priority class of the job, "interactive" or "batch". Default is
+            "batch".
+        threads: int, optional
+            Number of threads of the job. Default is the scheduler's
+            `threads`.
+
+        Yields
+        ------
+        cmd: list
+            FFmpeg command prefix applying the thread budget of the job to
+            filters, ending with the number of threads. Its "-threads"
+            option only applies to the first input, so every input and
+            output take their own "-threads" option, see `run`.
+
+        Raises
+        ------
+        TypeError
+            If priority is not a str.
+            If threads is not an int.
+        ValueError
+            If priority is not a valid option.
+            If threads is not a positive integer.
+        """
+        self._verify_job(priority, threads)
+        if threads is None:
+            threads = self.threads
+        entry = (
+            self._priorities.index(priority),
+            next(self._tickets)
+        )
+        # Waiting to be first in line with a free slot
+        with self._condition:
+            heapq.heappush(self._queue, entry)
+            try:
+                self._condition.wait_for(
+                    lambda: (
+                        self._running < self.max_jobs
+                        and self._queue[0] == entry
+                    )
+                )
+            except BaseException:
+                # Leaving the line, so the next jobs are not blocked
+                self._queue.remove(entry)
+                heapq.heapify(self._queue)
+                self._condition.notify_all()
+                raise
+            heapq.heappop(self._queue)
+            self._running += 1
+            # Next job in line may fit in another free slot
+            self._condition.notify_all()
+        try:
+            yield [
+                "ffmpeg",
+                "-filter_threads", str(threads),
+                "-filter_complex_threads", str(threads),
+                "-threads", str(threads)
+            ]
+        finally:
+            with self._condition:
+                self._running -= 1
+                self._condition.notify_all()
+
+    def run(
+        self,
+        stream_spec,
+        priority: str = "batch",
+        threads: int = None,
+        **kwargs
+    ):
+        """
+        Runs an FFmpeg command once a slot is free.
+
+        Parameters
+        ----------
+        stream_spec: ffmpeg.Stream
+            The FFmpeg-python output stream to run.
+        priority: str, optional
+            Priority class of the job, "interactive" or "batch". Default is
+            "batch".
+        threads: int, optional
+            Number of threads of the job. Default is the scheduler's
+            `threads`.
+        **kwargs
+            Keyword arguments passed to `ffmpeg.run`.
+
+        Returns
+        -------
+        out, err: tuple
+            Captured stdout and stderr of FFmpeg.
+        """
+        with self.slot(priority, threads) as cmd:
+            # Capping the decoders of every input and the encoders
+            _limit_threads(
+                stream_spec,
+                cmd[-1]
+            )
+            return ffmpeg.run(
+                stream_spec,
+                cmd=cmd,
+                **kwargs
+            )
+
+
+def _limit_threads(
+    stream_spec,
+    threads: str
+):
+    """
+    Sets the number of threads of the decoders of every input and of the
+    encoders of every output.
+
+    Inputs and outputs with their own "threads" option keep it.
+
+    Parameters
+    ----------
+    stream_spec: ffmpeg.Stream
+        The FFmpeg-python output stream.
+    threads: str
+        Number of threads of the decoders and encoders.
+    """
+    nodes, _ = topo_sort(get_stream_spec_nodes(stream_spec))
+    for node in nodes:
+        if (
+            isinstance(node, (InputNode, OutputNode))
+            and "threads" not in node.kwargs
+        ):
+            node.kwargs = dict(node.kwargs, threads=threads)
+
+
+def _limit_argv_threads(
+    argv: list,
+    output: str,
+    threads: str
+):
+    """
+    Sets the number of threads of the decoders and encoders of a command
+    line.
+
+    Inputs with their own "-threads" option keep it.
+
+    Parameters
+    ----------
+    argv: list
+        FFmpeg command line.
+    output: str
+        Path of the file the command writes, an argument of `argv`.
+    threads: str
+        Number of threads of the decoders and encoders.
+
+    Returns
+    -------
+    argv: list
+        FFmpeg command line with a "-threads" option before every input and
+        before the output.
+    """
+    limited = argv[:1]
+    options = []
+    index = 1
+    while index < len(argv):
+        if argv[index] == "-i":
+            # Options of an input come right before it
+            if "-threads" not in options:
+                options += ["-threads", threads]
+            limited += options + argv[index:index + 2]
+            options = []
+            index += 2
+        else:
+            options.append(argv[index])
+            index += 1
+    limited += options
+    index = len(limited) - 1 - limited[::-1].index(output)
+    return limited[:index] + ["-threads", threads] + limited[index:]
+
+
+# Scheduler shared by every media of the process
+_scheduler = Scheduler()
+
+
+def get_scheduler():
+    """
+    Gets the process-wide scheduler.
+
+    Returns
+    -------
+    scheduler: Scheduler
+        The scheduler every media operation is submitted to.
+    """
+    return _scheduler
+
+
+def set_scheduler(
+    scheduler: Scheduler
+):
+    """
+    Replaces the process-wide scheduler.
+
+    Parameters
+    ----------
+    scheduler: Scheduler
+        The scheduler every media operation will be submitted to.
+
+    Raises
+    ------
+    TypeError
+        If scheduler is not an instance of `Scheduler`.
+    """
+    global _scheduler
+    # Verifying parameters types
+    if not isinstance(scheduler, Scheduler):
+        raise TypeError(
+            f"Expected 'scheduler' to be of type 'Scheduler', but got "
+            f"'{type(scheduler).__name__}' instead."
+        )
+    _scheduler = scheduler
@@ -0,0 +1,437 @@
+import os
+import time
+import weakref
+import threading
+from contextlib import contextmanager
+
+
+class ScratchManager:
+    def __init__(
+        self,
+        budget: int = None,
+        expiry: float = None,
+        timeout: float = None
+    ):
+        """
+        Initializes a manager of the temporary files of media instances.
+
+        Each instance's usage is tracked. Creating an instance or starting
+        an FFmpeg job waits while the budget is exhausted, after closing
+        expired instances. Waiting fails right away when no other thread
+        can free space. Files shared between instances, like hardlinks, are
+        counted once.
+
+        Parameters
+        ----------
+        budget: int, optional
+            Maximum number of bytes of temporary files. Default is None,
+            for no limit.
+        expiry: float, optional
+            Seconds after which an unused instance is closed when space is
+            needed. Default is None, instances never expire.
+        timeout: float, optional
+            Maximum number of seconds to wait for space. Default is None,
+            for no limit.
+
+        Raises
+        ------
+        TypeError
+            If budget is not an int.
+            If expiry or timeout are not an int or a float.
+        ValueError
+            If budget, expiry or timeout are not positive.
+        """
+        # Verifying parameters types
+        if budget is not None and not isinstance(budget, int):
+            raise TypeError(
+                f"Expected 'budget' to be of type 'int', but got "
+                f"'{type(budget).__name__}' instead."
+            )
+        if expiry is not None and not isinstance(expiry, (int, float)):
+            raise TypeError(
+                f"Expected 'expiry' to be of type 'int' or 'float', but got "
+                f"'{type(expiry).__name__}' instead."
+            )
+        if timeout is not None and not isinstance(timeout, (int, float)):
+            raise TypeError(
+                f"Expected 'timeout' to be of type 'int' or 'float', but "
+                f"got '{type(timeout).__name__}' instead."
+            )
+        # Verifying parameters values
+        for name, value in [
+            ("budget", budget),
+            ("expiry", expiry),
+            ("timeout", timeout)
+        ]:
+            if value is not None and value <= 0:
+                raise ValueError(
+                    f"Invalid value: '{name}' must be positive. "
+                    f"Got {name}={value}."
+                )
+        self.budget = budget
+        self.expiry = expiry
+        self.timeout = timeout
+        # Tracked instances, keyed by id, with their files, last use and
+        # the thread that last used them
+        self._entries = {}
+        # Threads waiting for space, which can not free any meanwhile
+        self._waiting = set()
+        self._condition = threading.Condition(threading.RLock())
+
+    @property
+    def used(
+        self
+    ):
+        """
+        Number of bytes of the tracked temporary files.
+        """
+        with self._condition:
+            files = {}
+            for entry in self._entries.values():
+                files.update(entry["files"])
+            return sum(files.values())
+
+    def register(
+        self,
+        media,
+        size: int
+    ):
+        """
+        Starts tracking an instance, waiting for space for its first file.
+
+        Parameters
+        ----------
+        media: _Base
+            The instance.
+        size: int
+            Number of bytes reserved until the first `update`.
+
+        Raises
+        ------
+        TimeoutError
+            If space is not available before the timeout, or if no other
+            thread can free space.
+        """
+        with self._condition:
+            self._wait_for_space(
+                size
+            )
+            key = id(media)
+            self._entries[key] = {
+                "media": weakref.ref(
+                    media,
+                    lambda _: self._forget(key)
+                ),
+                "files": {("reserved", key): size},
+                "last_used": time.monotonic(),
+                "busy": 0,
+                "thread": threading.current_thread()
+            }
+
+    def reserve(
+        self,
+        media,
+        size: int
+    ):
+        """
+        Waits for space before an FFmpeg job of a tracked instance.
+
+        Parameters
+        ----------
+        media: _Base
+            The instance.
+        size: int
+            Number of bytes the job is expected to write.
+
+        Raises
+        ------
+        TimeoutError
+            If space is not available before the timeout, or if no other
+            thread can free space.
+        """
+        with self._condition:
+            self._wait_for_space(
+                size,
+                key=id(media)
+            )
+
+    def _wait_for_space(
+        self,
+        size: int,
+        key: int = None
+    ):
+        """
+        Waits until a number of bytes fits in the budget, closing expired
+        instances first.
+
+        Parameters
+        ----------
+        size: int
+            Number of bytes.
+        key: int, optional
+            Id of the instance requesting the bytes. Default is None, for a
+            new instance.
+
+        Raises
+        ------
+        TimeoutError
+            If space is not available before the timeout, or if no other
+            thread can free space.
+        """
+        deadline = None
+        if self.timeout is not None:
+            deadline = time.monotonic() + self.timeout
+        thread = threading.current_thread()
+        while not self._has_space(size, key):
+            # Closing expired instances before waiting for others
+            if self.evict():
+                continue
+            remaining = None
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+            if (
+                remaining is not None and remaining <= 0
+            ) or not self._can_free_space(key):
+                raise TimeoutError(
+                    f"Scratch budget of {self.budget} bytes exhausted: "
+                    f"{self.used} bytes used, {size} bytes requested."
+                )
+            # Waking up to close instances expiring meanwhile
+            if self.expiry is not None:
+                remaining = min(remaining or self.expiry, self.expiry)
+            # Waking up the other waiting threads, which may now never get
+            # space
+            self._waiting.add(thread)
+            self._condition.notify_all()
+            try:
+                self._condition.wait(
+                    timeout=remaining
+                )
+            finally:
+                self._waiting.discard(thread)
+
+    def _has_space(
+        self,
+        size: int,
+        key: int = None
+    ):
+        """
+        Checks if a number of bytes fits in the budget.
+
+        Parameters
+        ----------
+        size: int
+            Number of bytes.
+        key: int, optional
+            Id of the instance requesting the bytes. Default is None, for a
+            new instance.
+
+        Returns
+        -------
+        has_space: bool
+            True if the bytes fit, or if no other instance is tracked.
+        """
+        if self.budget is None:
+            return True
+        used = self.used
+        others = any(
+            entry_key != key and entry["files"]
+            for entry_key, entry in self._entries.items()
+        )
+        return not others or used + size <= self.budget
+
+    def _can_free_space(
+        self,
+        key: int = None
+    ):
+        """
+        Checks if another thread can free space by running, closing or
+        letting expire an instance.
+
+        Parameters
+        ----------
+        key: int, optional
+            Id of the instance requesting space. Default is None, for a new
+            instance.
+
+        Returns
+        -------
+        can_free_space: bool
+            True if another instance is running, can expire, or was last
+            used by another thread that is not waiting for space.
+        """
+        thread = threading.current_thread()
+        for entry_key, entry in self._entries.items():
+            if entry_key == key:
+                continue
+            if entry["busy"] > 0 or self.expiry is not None:
+                return True
+            owner = entry["thread"]
+            if (
+                owner is not thread
+                and owner.is_alive()
+                and owner not in self._waiting
+            ):
+                return True
+        return False
+
+    def update(
+        self,
+        media
+    ):
+        """
+        Measures the temporary files of an instance and marks it as used.
+
+        Parameters
+        ----------
+        media: _Base
+            The instance.
+        """
+        media._verify_open()
+        files = {}
+        for entry in os.scandir(media._temp_dir.name):
+            if entry.is_file():
+                stat = entry.stat()
+                files[(stat.st_dev, stat.st_ino)] = stat.st_size
+        with self._condition:
+            entry = self._entries.get(id(media))
+            if entry is None:
+                return
+            entry["files"] = files
+            entry["last_used"] = time.monotonic()
+            entry["thread"] = threading.current_thread()
+            self._condition.notify_all()
+
+    @contextmanager
+    def busy(
+        self,
+        media
+    ):
+        """
+        Marks an instance as used until the context exits, so it is not
+        evicted while FFmpeg reads or writes its files.
+
+        Parameters
+        ----------
+        media: _Base
+            The instance.
+
+        Raises
+        ------
+        ValueError
+            If the instance is closed.
+        """
+        media._verify_open()
+        with self._condition:
+            entry = self._entries.get(id(media))
+            if entry is not None:
+                entry["busy"] += 1
+                entry["thread"] = threading.current_thread()
+        try:
+            yield
+        finally:
+            with self._condition:
+                if entry is not None:
+                    entry["busy"] -= 1
+                    entry["last_used"] = time.monotonic()
+                self._condition.notify_all()
+
+    def release(
+        self,
+        media
+    ):
+        """
+        Stops tracking an instance.
+
+        Parameters
+        ----------
+        media: _Base
+            The instance.
+        """
+        self._forget(id(media))
+
+    def _forget(
+        self,
+        key: int
+    ):
+        """
+        Stops tracking an instance and wakes up waiting instances.
+
+        Parameters
+        ----------
+        key: int
+            Id of the instance.
+        """
+        with self._condition:
+            self._entries.pop(key, None)
+            self._condition.notify_all()
+
+    def evict(
+        self
+    ):
+        """
+        Closes the idle instances that have not been used for `expiry`
+        seconds.
+
+        Returns
+        -------
+        evicted: int
+            Number of closed instances.
+        """
+        if self.expiry is None:
+            return 0
+        now = time.monotonic()
+        with self._condition:
+            expired = [
+                entry["media"]()
+                for entry in list(self._entries.values())
+                if entry["busy"] == 0
+                and now - entry["last_used"] >= self.expiry
+            ]
+            expired = [media for media in expired if media is not None]
+            for media in expired:
+                media._closed = "evicted"
+                media.close()
+            return len(expired)
+
+
+# Scratch manager shared by every media of the process
+_scratch_manager = ScratchManager()
+
+
+def get_scratch_manager():
+    """
+    Gets the process-wide scratch manager.
+
+    Returns
+    -------
+    scratch_manager: ScratchManager
+        The scratch manager tracking every new media.
+    """
+    return _scratch_manager
+
+
+def set_scratch_manager(
+    scratch_manager: ScratchManager
+):
+    """
+    Replaces the process-wide scratch manager.
+
+    Parameters
+    ----------
+    scratch_manager: ScratchManager
+        The scratch manager tracking every new media.
+
+    Raises
+    ------
+    TypeError
+        If scratch_manager is not an instance of `ScratchManager`.
+    """
+    global _scratch_manager
+    # Verifying parameters types
+    if not isinstance(scratch_manager, ScratchManager):
+        raise TypeError(
+            f"Expected 'scratch_manager' to be of type 'ScratchManager', "
+            f"but got '{type(scratch_manager).__name__}' instead."
+        )
+    _scratch_manager = scratch_manager
@@ -0,0 +1,380 @@
+# Operations a clip can be moved before, they do not depend on time
+_clip_commutative_operations = [
+    "resize",
+    "crop",
+    "remove_audio",
+    "gain",
+    "resample",
+    "remap_channels"
+]
+# Operations displayed between a start and an end time
+_timed_operations = [
+    "text",
+    "overlay"
+]
+
+
+def _is_plain_clip(
+    operation: dict
+):
+    """
+    Checks if an operation is a clip with fixed boundaries.
+
+    Parameters
+    ----------
+    operation: dict
+        Operation with "op" and "params" keys.
+
+    Returns
+    -------
+    is_plain_clip: bool
+        True if the operation is a clip that is not snapped.
+    """
+    return (
+        operation["op"] == "clip"
+        and operation["params"]["snap"] is None
+    )
+
+
+def _push_clips(
+    plan: list,
+    frame_size: tuple,
+    has_subtitles: bool
+):
+    """
+    Moves a clip before the previous operation when they commute.
+
+    Text and overlay operations are shifted to the clipped timeline, or
+    dropped when they are outside of the clip.
+
+    Parameters
+    ----------
+    plan: list
+        Operations with "op" and "params" keys.
+    frame_size: tuple
+        Height and width of the media before the plan, or None.
+    has_subtitles: bool
+        True if the media has subtitle streams before the plan.
+
+    Returns
+    -------
+    plan: list
+        Rewritten operations.
+    """
+    for index in range(1, len(plan)):
+        previous, operation = plan[index - 1], plan[index]
+        if not _is_plain_clip(operation):
+            continue
+        if previous["op"] in _clip_commutative_operations:
+            return (
+                plan[:index - 1]
+                + [operation, previous]
+                + plan[index + 1:]
+            )
+        if previous["op"] in _timed_operations:
+            clip_start = operation["params"]["start"]
+            clip_duration = operation["params"]["end"] - clip_start
+            start = max(0, previous["params"]["start"] - clip_start)
+            end = min(
+                previous["params"]["end"] - clip_start,
+                clip_duration
+            )
+            # Never displayed in the clip
+            if not end > start:
+                return plan[:index - 1] + plan[index:]
+            timed = {
+                "op": previous["op"],
+                "params": dict(
+                    previous["params"],
+                    start=round(start, 6),
+                    end=round(end, 6)
+                )
+            }
+            return (
+                plan[:index - 1]
+                + [operation, timed]
+                + plan[index + 1:]
+            )
+    return plan
+
+
+def _merge_clips(
+    plan: list,
+    frame_size: tuple,
+    has_subtitles: bool
+):
+    """
+    Merges two consecutive clips into a single range.
+
+    Parameters
+    ----------
+    plan: list
+        Operations with "op" and "params" keys.
+    frame_size: tuple
+        Height and width of the media before the plan, or None.
+    has_subtitles: bool
+        True if the media has subtitle streams before the plan.
+
+    Returns
+    -------
+    plan: list
+        Rewritten operations.
+
+    Raises
+    ------
+    ValueError
+        If the second clip ends after the end of the first clip.
+    """
+    for index in range(1, len(plan)):
+        first, second = plan[index - 1], plan[index]
+        if not (_is_plain_clip(first) and _is_plain_clip(second)):
+            continue
+        start = first["params"]["start"]
+        duration = first["params"]["end"] - start
+        if not second["params"]["end"] <= duration:
+            raise ValueError(
+                f"Invalid 'end' value: 'end' must be less than or equal to "
+                f"the media duration. Got end={second['params']['end']}, "
+                f"but media duration is {duration}."
+            )
+        clip = {
+            "op": "clip",
+            "params": {
+                "start": round(start + second["params"]["start"], 6),
+                "end": round(start + second["params"]["end"], 6),
+                "snap": None,
+                "accurate": (
+                    first["params"]["accurate"]
+                    or second["params"]["accurate"]
+                )
+            }
+        }
+        return plan[:index - 1] + [clip] + plan[index + 1:]
+    return plan
+
+
+def _fold_resizes(
+    plan: list,
+    frame_size: tuple,
+    has_subtitles: bool
+):
+    """
+    Keeps only the last of two consecutive resizes.
+
+    Parameters
+    ----------
+    plan: list
+        Operations with "op" and "params" keys.
+    frame_size: tuple
+        Height and width of the media before the plan, or None.
+    has_subtitles: bool
+        True if the media has subtitle streams before the plan.
+
+    Returns
+    -------
+    plan: list
+        Rewritten operations.
+    """
+    for index in range(1, len(plan)):
+        if plan[index - 1]["op"] == plan[index]["op"] == "resize":
+            return plan[:index - 1] + plan[index:]
+    return plan
+
+
+def _fold_crops(
+    plan: list,
+    frame_size: tuple,
+    has_subtitles: bool
+):
+    """
+    Merges two consecutive crops into a single crop.
+
+    Parameters
+    ----------
+    plan: list
+        Operations with "op" and "params" keys.
+    frame_size: tuple
+        Height and width of the media before the plan, or None.
+    has_subtitles: bool
+        True if the media has subtitle streams before the plan.
+
+    Returns
+    -------
+    plan: list
+        Rewritten operations.
+    """
+    for index in range(1, len(plan)):
+        first, second = plan[index - 1], plan[index]
+        if not first["op"] == second["op"] == "crop":
+            continue
+        width = first["params"]["width"]
+        height = first["params"]["height"]
+        # Centered coordinates are only integer for even sizes
+        if width % 2 != 0 or height % 2 != 0:
+            continue
+        crop = {
+            "op": "crop",
+            "params": {
+                "x": first["params"]["x"] - width // 2
+                + second["params"]["x"],
+                "y": first["params"]["y"] - height // 2
+                + second["params"]["y"],
+                "height": second["params"]["height"],
+                "width": second["params"]["width"]
+            }
+        }
+        return plan[:index - 1] + [crop] + plan[index + 1:]
+    return plan
+
+
+def _drop_noop_resizes(
+    plan: list,
+    frame_size: tuple,
+    has_subtitles: bool
+):
+    """
+    Drops resizes to the frame size the media already has.
+
+    Parameters
+    ----------
+    plan: list
+        Operations with "op" and "params" keys.
+    frame_size: tuple
+        Height and width of the media before the plan, or None.
+    has_subtitles: bool
+        True if the media has subtitle streams before the plan.
+
+    Returns
+    -------
+    plan: list
+        Rewritten operations.
+    """
+    if frame_size is None:
+        return plan
+    for index, operation in enumerate(plan):
+        if operation["op"] not in ["resize", "crop"]:
+            continue
+        size = (
+            operation["params"]["height"],
+            operation["params"]["width"]
+        )
+        if operation["op"] == "resize" and size == tuple(frame_size):
+            return plan[:index] + plan[index + 1:]
+        frame_size = size
+    return plan
+
+
+def _drop_removed_audio(
+    plan: list,
+    frame_size: tuple,
+    has_subtitles: bool
+):
+    """
+    Drops audio removals made useless by the next operation.
+
+    Parameters
+    ----------
+    plan: list
+        Operations with "op" and "params" keys.
+    frame_size: tuple
+        Height and width of the media before the plan, or None.
+    has_subtitles: bool
+        True if the media has subtitle streams before the plan.
+
+    Returns
+    -------
+    plan: list
+        Rewritten operations.
+    """
+    for index in range(1, len(plan)):
+        previous, operation = plan[index - 1], plan[index]
+        if previous["op"] != "remove_audio":
+            continue
+        if operation["op"] == "remove_audio":
+            return plan[:index - 1] + plan[index:]
+        # Adding audio to a silent video replaces its audio. Removing audio
+        # also removes subtitles, which add_audios keeps when replacing
+        subtitles = has_subtitles or any(
+            previous_operation["op"] == "add_subtitles"
+            for previous_operation in plan[:index - 1]
+        )
+        if (
+            operation["op"] in ["add_audio", "add_audios"]
+            and operation["params"]["strategy"] in ["replace", "add"]
+            and not (operation["op"] == "add_audios" and subtitles)
+        ):
+            add_audio = {
+                "op": operation["op"],
+                "params": dict(
+                    operation["params"],
+                    strategy="replace"
+                )
+            }
+            return plan[:index - 1] + [add_audio] + plan[index + 1:]
+    return plan
+
+
+# Rewriting rules, applied until none changes the plan
+_rules = [
+    _push_clips,
+    _merge_clips,
+    _fold_resizes,
+    _fold_crops,
+    _drop_noop_resizes,
+    _drop_removed_audio
+]
+
+
+def _optimize_plan(
+    plan: list,
+    frame_size: tuple = None,
+    has_subtitles: bool = False
+):
+    """
+    Optimizes a plan of deferred operations.
+
+    Consecutive clips are merged, consecutive resizes and crops are folded,
+    resizes to the current size are dropped and clips are moved before
+    filters so less content is processed.
+
+    Parameters
+    ----------
+    plan: list
+        Operations as dictionaries with "op" and "params" keys.
+    frame_size: tuple, optional
+        Height and width of the media before the plan, None for media
+        without frames. Default is None.
+    has_subtitles: bool, optional
+        True if the media has subtitle streams before the plan. Default is
+        False.
+
+    Returns
+    -------
+    optimized_plan: list
+        Equivalent operations, cheaper to run.
+
+    Raises
+    ------
+    ValueError
+        If merged operations are not valid anymore.
+    """
+    optimized_plan = [
+        {
+            "op": operation["op"],
+            "params": dict(operation["params"])
+        }
+        for operation in plan
+    ]
+    changed = True
+    while changed:
+        changed = False
+        for rule in _rules:
+            rewritten_plan = rule(
+                optimized_plan,
+                frame_size,
+                has_subtitles
+            )
+            if rewritten_plan is not optimized_plan:
+                optimized_plan = rewritten_plan
+                changed = True
+    return optimized_plan
@@ -1,5 +1,8 @@
 from mimetypes import guess_type
 import mimetypes
+import hashlib
+import shutil
+import os
 from os.path import isfile
 
 
@@ -55,3 +58,48 @@ def _guess_file_type(
         return "subtitles"
     else:
         return None
+
+
+def _file_digest(
+    path: str
+):
+    """
+    Computes a digest identifying the content of a file.
+
+    Parameters
+    ----------
+    path: str
+        The path to the file whose content is hashed.
+
+    Returns
+    -------
+    digest: str
+        Hexadecimal SHA-256 digest of the file content.
+    """
+    sha256 = hashlib.sha256()
+    # Reading file by chunks to keep memory bounded
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(2 ** 20), b""):
+            sha256.update(chunk)
+    digest = sha256.hexdigest()
+    return digest
+
+
+def _link_or_copy(
+    src: str,
+    dst: str
+):
+    """
+    Hardlinks a file, or copies it when the filesystem does not allow it.
+
+    Parameters
+    ----------
+    src: str
+        The path to the existing file.
+    dst: str
+        The path to the new file.
+    """
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy(src, dst)
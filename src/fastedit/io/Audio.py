@@ -1,8 +1,14 @@
+from typing import Union
 from fastedit.core.Media import _Media
 from fastedit.core.utils import _guess_file_type
 
 
 class Audio(_Media):
+    # Edit operations, the methods edit plans can run
+    _edit_operations = _Media._edit_operations + ["trim"]
+    # Operations rendered together as a single audio filter chain
+    _audio_filters = _Media._audio_filters + ["trim"]
+
     def __init__(
         self,
         path: str
@@ -30,3 +36,71 @@ class Audio(_Media):
             )
         # Initialize instance
         super().__init__(path)
+
+    def trim(
+        self,
+        start: Union[int, float],
+        end: Union[int, float]
+    ):
+        """
+        Trims the audio to a range, with sample accuracy.
+
+        Unlike `clip`, which cuts on packet boundaries without re-encoding,
+        the audio is decoded and re-encoded so the range is exact.
+
+        Parameters
+        ----------
+        start: int or float
+            Start time (in seconds) of the range.
+        end: int or float
+            End time (in seconds) of the range.
+
+        Raises
+        ------
+        TypeError
+            If start or end are not int or float.
+        ValueError
+            If start is negative.
+            If end is not strictly greater than start.
+            If end is strictly greater than media duration.
+        """
+        # Verifying parameters types
+        if not isinstance(start, (int, float)):
+            raise TypeError(
+                f"Expected 'start' to be of type 'int' or 'float', but got "
+                f"'{type(start).__name__}' instead."
+            )
+        if not isinstance(end, (int, float)):
+            raise TypeError(
+                f"Expected 'end' to be of type 'int' or 'float', but got "
+                f"'{type(end).__name__}' instead."
+            )
+        # Verifying parameters consistency
+        if start < 0:
+            raise ValueError(
+                f"Invalid 'start' value: 'start' must be greater than or "
+                f"equal to 0. Got start={start}."
+            )
+        if not end > start:
+            raise ValueError(
+                f"Invalid 'end' value: 'end' must be strictly greater than "
+                f"'start'. Got start={start} and end={end}."
+            )
+        media_duration = float(self.metadata()["duration"])
+        if not end <= media_duration:
+            raise ValueError(
+                f"Invalid 'end' value: 'end' must be less than or equal to "
+                f"the media duration. Got end={end}, but media duration is "
+                f"{media_duration}."
+            )
+        # Deferring operation when a plan is recorded
+        if self._record("trim", start=start, end=end):
+            return
+        self._render_audio_filters(
+            [
+                {
+                    "op": "trim",
+                    "params": {"start": start, "end": end}
+                }
+            ]
+        )
@@ -1,12 +1,69 @@
-import math
+import os
+import re
 import ffmpeg
+from fractions import Fraction
 from typing import Union
-from fastedit.core.Media import _Media
+from tempfile import TemporaryDirectory
+from fastedit.core.Media import _Media, _parse_intervals, _with_duration
+from fastedit.core.Scheduler import get_scheduler
 from fastedit.io.Audio import Audio
+from fastedit.io.Subtitles import Subtitles
+from fastedit.io.Image import Image
 from fastedit.core.utils import _guess_file_type
 
 
 class Video(_Media):
+    # Points to which clip boundaries can be snapped
+    _snaps = _Media._snaps + ["scene"]
+    # Edit operations, the methods edit plans can run
+    _edit_operations = _Media._edit_operations + [
+        "trim",
+        "resize",
+        "crop",
+        "zoom",
+        "zoom_in",
+        "text",
+        "overlay",
+        "burn_subtitles",
+        "add_subtitles",
+        "add_audio",
+        "add_audios",
+        "mix_audio",
+        "remove_audio",
+        "speed",
+        "trim_black"
+    ]
+    # Operations rendered together as a single video filter chain
+    _filters = ["resize", "crop", "text", "burn_subtitles", "overlay"]
+    # Operations keeping the metadata of the video
+    _metadata_keeping_operations = _Media._metadata_keeping_operations + [
+        "text",
+        "overlay",
+        "burn_subtitles",
+        "zoom",
+        "zoom_in"
+    ]
+    # Parameters in pixels, scaled when operations run on a proxy
+    _pixel_params = {
+        "resize": ["height", "width"],
+        "crop": ["x", "y", "height", "width"],
+        "text": ["x", "y", "fontsize", "borderw", "boxborderw"],
+        "zoom": ["start_x", "start_y", "end_x", "end_y"],
+        "overlay": ["x", "y"]
+    }
+    # Highest frame rate produced by relabeling timestamps, faster speeds
+    # drop frames instead
+    _max_relabeled_fps = 120
+    # Audio codecs muxed without re-encoding, keyed by container extension,
+    # None accepting every codec
+    _audio_copy_codecs = {
+        ".mp4": ["aac", "mp3", "ac3", "eac3", "alac"],
+        ".m4v": ["aac", "mp3", "ac3", "eac3", "alac"],
+        ".mov": ["aac", "mp3", "ac3", "eac3", "alac"],
+        ".webm": ["opus", "vorbis"],
+        ".mkv": None
+    }
+
     def __init__(
         self,
         path: str
@@ -34,6 +91,9 @@ class Video(_Media):
             )
         # Initialize instance
         super().__init__(path)
+        # Low resolution copy previewing recorded operations
+        self._proxy = None
+        self._proxy_scale = None
 
     def resize(
         self,
@@ -81,26 +141,48 @@ class Video(_Media):
                 f"Invalid value: 'height' and 'width' must be "
                 f"divisible by 2. Got height={height} and width={width}."
             )
-        # Resizing input video
-        input = ffmpeg.input(
-            filename=self._main_temp_file,
-        )
-        # Defining output and codec copying
-        output = ffmpeg.output(
-            input,
-            self._second_temp_file,
-            vf=f"scale={width}:{height}"
+        # Deferring operation when a plan is recorded
+        if self._record("resize", height=height, width=width):
+            return
+        # Resizing video, other streams are copied
+        self._render_filters(
+            [
+                {
+                    "op": "resize",
+                    "params": {"height": height, "width": width}
+                }
+            ]
         )
-        overwrite = ffmpeg.overwrite_output(
-            output
-        )
-        # Running command
-        ffmpeg.run(
-            stream_spec=overwrite,
-            quiet=True
+
+    def _resize_filter(
+        self,
+        stream,
+        height: int,
+        width: int
+    ):
+        """
+        Applies the resizing filter to a video stream.
+
+        Parameters
+        ----------
+        stream: ffmpeg.Stream
+            The video stream to resize.
+        height: int
+            The desired height of the video in pixels.
+        width: int
+            The desired width of the video in pixels.
+
+        Returns
+        -------
+        stream: ffmpeg.Stream
+            The resized video stream.
+        """
+        return ffmpeg.filter(
+            stream,
+            "scale",
+            width,
+            height
         )
-        # Saving result to main file
-        self._move_and_replace()
 
     def crop(
         self,
@@ -157,39 +239,213 @@ class Video(_Media):
                 f"Invalid value: 'height' and 'width' must be positive "
                 f"integers. Got height={height}, width={width}."
             )
+        # Deferring operation when a plan is recorded
+        if self._record("crop", x=x, y=y, height=height, width=width):
+            return
+        # Cropping video, other streams are copied
+        self._render_filters(
+            [
+                {
+                    "op": "crop",
+                    "params": {
+                        "x": x,
+                        "y": y,
+                        "height": height,
+                        "width": width
+                    }
+                }
+            ]
+        )
+
+    def _crop_filter(
+        self,
+        stream,
+        x: int,
+        y: int,
+        height: int,
+        width: int
+    ):
+        """
+        Applies the cropping filter to a video stream.
+
+        Parameters
+        ----------
+        stream: ffmpeg.Stream
+            The video stream to crop.
+        x: int
+            The x-coordinate of the center of the crop area.
+        y: int
+            The y-coordinate of the center of the crop area.
+        height: int
+            The height of the crop area in pixels.
+        width: int
+            The width of the crop area in pixels.
+
+        Returns
+        -------
+        stream: ffmpeg.Stream
+            The cropped video stream.
+        """
         # Getting vertical and horizontal positions for FFmpeg
         cropped_x = x - (width/2)
         cropped_y = y - (height/2)
-        # Input video
-        input = ffmpeg.input(
-            filename=self._main_temp_file
-        )
-        # Cropping video
-        crop = ffmpeg.crop(
-            stream=input,
+        return ffmpeg.crop(
+            stream=stream,
             x=cropped_x,
             y=cropped_y,
             height=height,
             width=width
         )
+
+    def _render_filters(
+        self,
+        operations: list,
+        clip: dict = None
+    ):
+        """
+        Renders video filter operations in a single encode.
+
+        Audio and subtitles streams are stream-copied.
+
+        Parameters
+        ----------
+        operations: list
+            Operations of `_filters`, as dictionaries with "op" and "params"
+            keys, applied in order.
+        clip: dict, optional
+            Clip operation applied to the input before the filters. Default
+            is None.
+        """
+        # Trimming input video
+        input_kwargs = {}
+        if clip is not None:
+            input_kwargs = {
+                "ss": clip["params"]["start"],
+                "to": clip["params"]["end"]
+            }
+        input = ffmpeg.input(
+            filename=self._main_temp_file,
+            **input_kwargs
+        )
+        # Chaining filters on the video stream
+        stream = input.video
+        for operation in operations:
+            build_filter = getattr(self, f"_{operation['op']}_filter")
+            stream = build_filter(
+                stream,
+                **operation["params"]
+            )
         # Defining output and codec copying
         output = ffmpeg.output(
-            crop,
-            input.audio,
+            stream,
+            input["a?"],
+            input["s?"],
             self._second_temp_file,
-            acodec="copy"
+            acodec="copy",
+            scodec="copy"
         )
         overwrite = ffmpeg.overwrite_output(
             output
         )
         # Running command
-        ffmpeg.run(
+        self._run(
             stream_spec=overwrite,
             quiet=True
         )
         # Saving result to main file
         self._move_and_replace()
 
+    def _expected_metadata(
+        self,
+        metadata: dict,
+        operation: dict
+    ):
+        """
+        Gets the metadata expected after an operation.
+
+        Parameters
+        ----------
+        metadata: dict
+            Metadata before the operation, as returned by `metadata`.
+        operation: dict
+            Operation with "op" and "params" keys.
+
+        Returns
+        -------
+        metadata: dict
+            Metadata expected after the operation, None if it cannot be
+            expected.
+        """
+        op, params = operation["op"], operation["params"]
+        video_streams = [
+            stream for stream in metadata["streams"]
+            if stream["codec_type"] == "video"
+        ]
+        if op in ["resize", "crop"]:
+            for stream in video_streams:
+                stream["height"] = params["height"]
+                stream["width"] = params["width"]
+                for key in ["coded_height", "coded_width"]:
+                    stream.pop(key, None)
+                stream.pop("display_aspect_ratio", None)
+            return metadata
+        if op == "remove_audio":
+            metadata["streams"] = video_streams
+            return metadata
+        if op == "add_subtitles":
+            metadata["streams"].append({"codec_type": "subtitle"})
+            return metadata
+        if op == "speed":
+            frame_rate = Fraction(video_streams[0]["r_frame_rate"])
+            if params["drop_audio"]:
+                metadata["streams"] = video_streams
+                # Relabeled timestamps keep every frame
+                if frame_rate * params["factor"] <= self._max_relabeled_fps:
+                    video_streams[0]["r_frame_rate"] = str(
+                        frame_rate * Fraction(params["factor"])
+                    )
+            return _with_duration(
+                metadata,
+                float(metadata["duration"]) / params["factor"]
+            )
+        return super()._expected_metadata(metadata, operation)
+
+    def _copies_audio(
+        self,
+        operation: dict
+    ):
+        """
+        Checks if an operation keeps the audio of the video unchanged.
+
+        Parameters
+        ----------
+        operation: dict
+            Operation with "op" and "params" keys.
+
+        Returns
+        -------
+        copies_audio: bool
+            True if the audio streams are stream-copied.
+        """
+        if operation["op"] == "zoom_in":
+            return operation["params"]["engine"] == "scale"
+        return operation["op"] in self._filters + ["zoom", "add_subtitles"]
+
+    def _frame_size(
+        self
+    ):
+        """
+        Gets the frame size of the video.
+
+        Returns
+        -------
+        frame_size: tuple
+            Height and width of the video in pixels.
+        """
+        metadata = self._get_video_metadata()
+        frame_size = (metadata["height"], metadata["width"])
+        return frame_size
+
     def _get_video_metadata(
         self
     ):
@@ -223,7 +479,8 @@ class Video(_Media):
 
     def zoom_in(
         self,
-        zoom: Union[int, float]
+        zoom: Union[int, float],
+        engine: str = "scale"
     ):
         """
         Applies a progressive zoom effect until the end of the video.
@@ -232,13 +489,20 @@ class Video(_Media):
         ----------
         zoom: Union[int, float]
             The zoom factor to achieve at the end of the video. Range is 0-10.
+        engine: str, optional
+            The engine rendering the zoom. Must be one of the following:
+            - "scale": Time expression scale and crop, see `zoom`.
+            - "zoompan": FFmpeg zoompan filter, single-threaded and slower.
+            Default is "scale".
 
         Raises
         ------
         TypeError
             If zoom is not of type `int` or `float`.
+            If engine is not a str.
         ValueError
             If zoom is not greater than or equal to 0.
+            If engine is not one of the valid options.
         """
         # Verifying parameters types
         if not isinstance(zoom, (int, float)):
@@ -246,18 +510,36 @@ class Video(_Media):
                 f"Expected 'zoom' to be of type 'int' or 'float', but got "
                 f"'{type(zoom).__name__}' instead."
             )
+        if not isinstance(engine, str):
+            raise TypeError(
+                f"Expected 'engine' to be of type 'str', but got "
+                f"'{type(engine).__name__}' instead."
+            )
         # Verifying parameter value
         if zoom < 0:
             raise ValueError(
                 f"Invalid value: 'zoom' must be greater than or equal to 0. "
                 f"Got zoom={zoom}."
             )
+        valid_engines = ["scale", "zoompan"]
+        if engine not in valid_engines:
+            raise ValueError(
+                f"Invalid engine '{engine}'. Expected one of: "
+                f"{', '.join(valid_engines)}."
+            )
+        # Deferring operation when a plan is recorded
+        if self._record("zoom_in", zoom=zoom, engine=engine):
+            return
+        if engine == "scale":
+            self.zoom(
+                end_zoom=1 + zoom
+            )
+            return
         # Getting video metadata
         metadata = self._get_video_metadata()
-        fps = math.ceil(eval(metadata["r_frame_rate"]))
         height = metadata["height"]
         width = metadata["width"]
-        total_frames = int(metadata["nb_frames"])
+        total_frames, _ = self.frame_count()
         # Computing zoom factor
         zoom_factor = zoom/total_frames
         # Input video
@@ -272,7 +554,7 @@ class Video(_Media):
             x="iw/2-(iw/zoom/2)",
             y="ih/2-(ih/zoom/2)",
             d=1,
-            fps=fps,
+            fps=metadata["r_frame_rate"],
             s=f"{width}x{height}"
         )
         # Defining output and codec copying
@@ -285,7 +567,263 @@ class Video(_Media):
             output
         )
         # Running command
-        ffmpeg.run(
+        self._run(
+            stream_spec=overwrite,
+            quiet=True
+        )
+        # Saving result to main file
+        self._move_and_replace()
+
+    def _frames_from_duration(
+        self
+    ):
+        """
+        Estimates the number of frames from the duration and frame rate.
+
+        Returns
+        -------
+        frames: int
+            Number of frames of the video, at least 1.
+        """
+        metadata = self._get_video_metadata()
+        fps = Fraction(metadata["r_frame_rate"])
+        duration = metadata.get("duration")
+        if duration is None:
+            duration = self.metadata()["duration"]
+        frames = max(1, round(Fraction(duration) * fps))
+        return frames
+
+    def frame_count(
+        self
+    ):
+        """
+        Counts the frames of the video with the cheapest reliable method.
+
+        Methods are tried in order: the frame count stored in the container
+        metadata, the packets of an already built packet index or a
+        demux-only packet count, then an estimate from duration and frame
+        rate. The result is cached with the metadata.
+
+        Returns
+        -------
+        frame_count: int
+            Number of frames of the video.
+        method: str
+            Method used, one of "metadata", "packets" or "estimate".
+        """
+        # Counting the frames expected after compiled commands
+        if self._compiled is not None and self._compiled.steps:
+            frame_count = int(
+                self._get_video_metadata().get("nb_frames", 0)
+            )
+            if frame_count > 0:
+                return frame_count, "metadata"
+            return self._frames_from_duration(), "estimate"
+        if "frame_count" not in self._cache:
+            metadata = self._get_video_metadata()
+            frame_count = int(metadata.get("nb_frames", 0))
+            method = "metadata"
+            # Reusing the packet index, counting packets otherwise
+            if frame_count <= 0 and "packets" in self._cache:
+                frame_count = len(self._cache["packets"]["pts"])
+                method = "packets"
+            if frame_count <= 0:
+                with self._scratch_manager.busy(self), \
+                        get_scheduler().slot(self._priority):
+                    probe = ffmpeg.probe(
+                        filename=self._main_temp_file,
+                        select_streams="v:0",
+                        count_packets=None,
+                        show_entries="stream=nb_read_packets"
+                    )
+                streams = probe.get("streams", [])
+                if streams:
+                    frame_count = int(streams[0].get("nb_read_packets", 0))
+                method = "packets"
+            if frame_count <= 0:
+                frame_count = self._frames_from_duration()
+                method = "estimate"
+            self._cache["frame_count"] = (frame_count, method)
+        return self._cache["frame_count"]
+
+    def zoom(
+        self,
+        end_zoom: Union[int, float],
+        start_zoom: Union[int, float] = 1,
+        start_x: int = None,
+        start_y: int = None,
+        end_x: int = None,
+        end_y: int = None,
+        supersample: int = 1
+    ):
+        """
+        Applies a progressive zoom and pan (Ken Burns effect) over the video.
+
+        Each frame is scaled with a time expression and cropped back to the
+        video size, which is multithreaded and much faster than zoompan.
+        Zoom and center move linearly from the first to the last frame.
+
+        Parameters
+        ----------
+        end_zoom: int or float
+            The zoom factor on the last frame. Must be greater than or equal
+            to 1.
+        start_zoom: int or float, optional
+            The zoom factor on the first frame. Must be greater than or equal
+            to 1. Default is 1.
+        start_x: int, optional
+            The x-coordinate of the zoom center on the first frame. Default is
+            the center of the video.
+        start_y: int, optional
+            The y-coordinate of the zoom center on the first frame. Default is
+            the center of the video.
+        end_x: int, optional
+            The x-coordinate of the zoom center on the last frame. Default is
+            `start_x`.
+        end_y: int, optional
+            The y-coordinate of the zoom center on the last frame. Default is
+            `start_y`.
+        supersample: int, optional
+            Factor frames are upscaled by before zooming, reducing the jitter
+            of slow zooms at the cost of speed. Default is 1.
+
+        Raises
+        ------
+        TypeError
+            If start_zoom or end_zoom are not int or float.
+            If start_x, start_y, end_x or end_y are not int.
+            If supersample is not an int.
+        ValueError
+            If start_zoom or end_zoom are less than 1.
+            If supersample is not a positive integer.
+        """
+        # Verifying parameters types
+        for name, value in [
+            ("start_zoom", start_zoom),
+            ("end_zoom", end_zoom)
+        ]:
+            if not isinstance(value, (int, float)):
+                raise TypeError(
+                    f"Expected '{name}' to be of type 'int' or 'float', but "
+                    f"got '{type(value).__name__}' instead."
+                )
+        for name, value in [
+            ("start_x", start_x),
+            ("start_y", start_y),
+            ("end_x", end_x),
+            ("end_y", end_y)
+        ]:
+            if value is not None and not isinstance(value, int):
+                raise TypeError(
+                    f"Expected '{name}' to be of type 'int', but got "
+                    f"'{type(value).__name__}' instead."
+                )
+        if not isinstance(supersample, int):
+            raise TypeError(
+                f"Expected 'supersample' to be of type 'int', but got "
+                f"'{type(supersample).__name__}' instead."
+            )
+        # Verifying parameters values
+        if start_zoom < 1 or end_zoom < 1:
+            raise ValueError(
+                f"Invalid value: 'start_zoom' and 'end_zoom' must be greater "
+                f"than or equal to 1. Got start_zoom={start_zoom}, "
+                f"end_zoom={end_zoom}."
+            )
+        if supersample <= 0:
+            raise ValueError(
+                f"Invalid value: 'supersample' must be a positive integer. "
+                f"Got supersample={supersample}."
+            )
+        # Deferring operation when a plan is recorded
+        if self._record(
+            "zoom",
+            end_zoom=end_zoom,
+            start_zoom=start_zoom,
+            start_x=start_x,
+            start_y=start_y,
+            end_x=end_x,
+            end_y=end_y,
+            supersample=supersample
+        ):
+            return
+        # Getting video metadata
+        metadata = self._get_video_metadata()
+        height = metadata["height"]
+        width = metadata["width"]
+        fps = Fraction(metadata["r_frame_rate"])
+        # Defaulting to a zoom on the center
+        if start_x is None:
+            start_x = width // 2
+        if start_y is None:
+            start_y = height // 2
+        if end_x is None:
+            end_x = start_x
+        if end_y is None:
+            end_y = start_y
+        # Progress reaches 1 on the last frame
+        total_frames, _ = self.frame_count()
+        last_frame_time = float((total_frames - 1) / fps)
+        if last_frame_time > 0:
+            progress = f"min(t/{last_frame_time},1)"
+        else:
+            progress = "1"
+        zoom = f"({start_zoom}+({end_zoom}-{start_zoom})*{progress})"
+        center_x = f"({start_x}+({end_x}-{start_x})*{progress})"
+        center_y = f"({start_y}+({end_y}-{start_y})*{progress})"
+        # Working on supersampled frames
+        work_width = width * supersample
+        work_height = height * supersample
+        scaled_width = f"trunc({work_width}*{zoom}/2)*2"
+        scaled_height = f"trunc({work_height}*{zoom}/2)*2"
+        # Input video
+        input = ffmpeg.input(
+            filename=self._main_temp_file
+        )
+        # Scaling frames by the zoom factor of their timestamp
+        stream = ffmpeg.filter(
+            input.video,
+            "scale",
+            w=scaled_width,
+            h=scaled_height,
+            eval="frame"
+        )
+        # Cropping a window of the working size around the center
+        stream = ffmpeg.crop(
+            stream,
+            x=(
+                f"clip({supersample}*{center_x}*{zoom}-{work_width}/2,"
+                f"0,{scaled_width}-{work_width})"
+            ),
+            y=(
+                f"clip({supersample}*{center_y}*{zoom}-{work_height}/2,"
+                f"0,{scaled_height}-{work_height})"
+            ),
+            width=work_width,
+            height=work_height
+        )
+        # Going back to the video size
+        if supersample > 1:
+            stream = ffmpeg.filter(
+                stream,
+                "scale",
+                width,
+                height
+            )
+        # Defining output and codec copying
+        output = ffmpeg.output(
+            stream,
+            input["a?"],
+            input["s?"],
+            self._second_temp_file,
+            acodec="copy",
+            scodec="copy"
+        )
+        overwrite = ffmpeg.overwrite_output(
+            output
+        )
+        # Running command
+        self._run(
             stream_spec=overwrite,
             quiet=True
         )
@@ -401,15 +939,65 @@ class Video(_Media):
                 f"the media duration. Got end={end}, but media duration is "
                 f"{media_duration}."
             )
+        params = {
+            "x": x,
+            "y": y,
+            "text": text,
+            "start": start,
+            "end": end,
+            "fontfile": fontfile,
+            "fontsize": fontsize,
+            "fontcolor": fontcolor,
+            "borderw": borderw,
+            "bordercolor": bordercolor,
+            "box": box,
+            "boxborderw": boxborderw,
+            "boxcolor": boxcolor
+        }
+        # Deferring operation when a plan is recorded
+        if self._record("text", **params):
+            return
+        # Drawing text, other streams are copied
+        self._render_filters(
+            [
+                {
+                    "op": "text",
+                    "params": params
+                }
+            ]
+        )
+
+    def _text_filter(
+        self,
+        stream,
+        x: int,
+        y: int,
+        text: str,
+        start: Union[int, float],
+        end: Union[int, float],
+        fontfile: str,
+        fontsize: int,
+        fontcolor: str,
+        borderw: int,
+        bordercolor: str,
+        box: bool,
+        boxborderw: int,
+        boxcolor: str
+    ):
+        """
+        Applies the text drawing filter to a video stream.
+
+        Parameters are the ones of `text`.
+
+        Returns
+        -------
+        stream: ffmpeg.Stream
+            The video stream with text drawn.
+        """
         # Boolean to 0 | 1
         box_enabled = int(box)
-        # Input video
-        input = ffmpeg.input(
-            filename=self._main_temp_file
-        )
-        # Text in video
-        zoom = ffmpeg.drawtext(
-            input,
+        return ffmpeg.drawtext(
+            stream,
             x=f"{x}-(text_w)/2",
             y=f"{y}-(text_h)/2",
             text=text,
@@ -423,72 +1011,220 @@ class Video(_Media):
             boxborderw=boxborderw,
             boxcolor=boxcolor
         )
-        # Defining output and codec copying
-        output = ffmpeg.output(
-            zoom,
-            input.audio,
-            self._second_temp_file
-        )
-        overwrite = ffmpeg.overwrite_output(
-            output
-        )
-        # Running command
-        ffmpeg.run(
-            stream_spec=overwrite,
-            quiet=True
-        )
-        # Saving result to main file
-        self._move_and_replace()
 
-    def add_audio(
+    def overlay(
         self,
-        audio: Audio,
-        strategy: str
+        image: Image,
+        x: int,
+        y: int,
+        start: Union[int, float] = 0,
+        end: Union[int, float] = None,
+        scale: Union[int, float] = 1
     ):
         """
-        Adds an audio track to the video using a specified strategy.
+        Overlays an image, like a watermark or a logo, on the video.
 
         Parameters
         ----------
-        audio: Audio
-            The new audio to be added to the video. This should be an instance
-            of the `Audio` class.
-        strategy: str
-            The strategy for handling the audio merge. Must be one of the
-            following:
-            - "replace": Replaces the existing audio track with the new one.
-            - "add": Adds a new audio track to the video.
-            - "mix": Mixes the new audio track with the existing one.
+        image: Image
+            The image to overlay. Transparent images keep their
+            transparency.
+        x: int
+            The x-coordinate of the center of the image on the video.
+        y: int
+            The y-coordinate of the center of the image on the video.
+        start: int or float, optional
+            The time (in seconds) from when the image is displayed. Default
+            is 0.
+        end: int or float, optional
+            The time (in seconds) when the image disappears. Default is the
+            end of the video.
+        scale: int or float, optional
+            Factor the image is resized by. Default is 1.
 
         Raises
         ------
         TypeError
-            If `audio` is not an instance of `Audio`.
-            If `strategy` is not a string.
+            If `image` is not an instance of `Image`.
+            If `x` or `y` are not int.
+            If `start`, `end` or `scale` are not int or float.
         ValueError
-            If `strategy` is not one of the valid options: "replace", "add",
-            or "mix".
-        NameError
-            If the specified strategy is not found in the strategy mapping.
+            If `end` is not strictly greater than `start`.
+            If `end` is strictly greater than media duration.
+            If `scale` is not positive.
         """
         # Verifying parameters types
-        if not isinstance(audio, Audio):
+        if not isinstance(image, Image):
             raise TypeError(
-                f"Expected 'audio' to be of type 'Audio', but got "
-                f"'{type(audio).__name__}' instead."
+                f"Expected 'image' to be of type 'Image', but got "
+                f"'{type(image).__name__}' instead."
             )
-        if not isinstance(strategy, str):
+        if not isinstance(x, int):
             raise TypeError(
-                f"Expected 'strategy' to be of type 'str', but got "
-                f"'{type(strategy).__name__}' instead."
+                f"Expected 'x' to be of type 'int', but got "
+                f"'{type(x).__name__}' instead."
             )
-        # Verifying parameters consistency
-        valid_strategies = ["replace", "add", "mix"]
-        if strategy not in valid_strategies:
-            raise ValueError(
-                f"Invalid strategy '{strategy}'. Expected one of: "
-                f"{', '.join(valid_strategies)}."
+        if not isinstance(y, int):
+            raise TypeError(
+                f"Expected 'y' to be of type 'int', but got "
+                f"'{type(y).__name__}' instead."
             )
+        if not isinstance(start, (int, float)):
+            raise TypeError(
+                f"Expected 'start' to be of type 'int' or 'float', but got "
+                f"'{type(start).__name__}' instead."
+            )
+        if end is not None and not isinstance(end, (int, float)):
+            raise TypeError(
+                f"Expected 'end' to be of type 'int' or 'float', but got "
+                f"'{type(end).__name__}' instead."
+            )
+        if not isinstance(scale, (int, float)):
+            raise TypeError(
+                f"Expected 'scale' to be of type 'int' or 'float', but got "
+                f"'{type(scale).__name__}' instead."
+            )
+        # Verifying parameters values
+        if scale <= 0:
+            raise ValueError(
+                f"Invalid value: 'scale' must be positive. "
+                f"Got scale={scale}."
+            )
+        # Verifying parameters consistency
+        metadata = self.metadata()
+        media_duration = float(metadata["duration"])
+        if end is None:
+            end = media_duration
+        if not end > start:
+            raise ValueError(
+                f"Invalid 'end' value: 'end' must be strictly greater than "
+                f"'start'. Got start={start} and end={end}."
+            )
+        if not end <= media_duration:
+            raise ValueError(
+                f"Invalid 'end' value: 'end' must be less than or equal to "
+                f"the media duration. Got end={end}, but media duration is "
+                f"{media_duration}."
+            )
+        params = {
+            "image": image,
+            "x": x,
+            "y": y,
+            "start": start,
+            "end": end,
+            "scale": scale
+        }
+        # Deferring operation when a plan is recorded
+        if self._record("overlay", **params):
+            return
+        # Overlaying image, other streams are copied
+        self._render_filters(
+            [
+                {
+                    "op": "overlay",
+                    "params": params
+                }
+            ]
+        )
+
+    def _overlay_filter(
+        self,
+        stream,
+        image: Image,
+        x: int,
+        y: int,
+        start: Union[int, float],
+        end: Union[int, float],
+        scale: Union[int, float]
+    ):
+        """
+        Applies the overlay filter to a video stream.
+
+        Parameters are the ones of `overlay`.
+
+        Returns
+        -------
+        stream: ffmpeg.Stream
+            The video stream with the image overlaid.
+        """
+        image_stream = ffmpeg.input(
+            filename=image._main_temp_file
+        ).video
+        if scale != 1:
+            image_stream = ffmpeg.filter(
+                image_stream,
+                "scale",
+                f"iw*{scale}",
+                f"ih*{scale}"
+            )
+        # Still images are repeated until the end of the video
+        return ffmpeg.overlay(
+            stream,
+            image_stream,
+            x=f"{x}-overlay_w/2",
+            y=f"{y}-overlay_h/2",
+            enable=f"between(t,{start},{end})"
+        )
+
+    def add_audio(
+        self,
+        audio: Audio,
+        strategy: str
+    ):
+        """
+        Adds an audio track to the video using a specified strategy.
+
+        Parameters
+        ----------
+        audio: Audio
+            The new audio to be added to the video. This should be an instance
+            of the `Audio` class.
+        strategy: str
+            The strategy for handling the audio merge. Must be one of the
+            following:
+            - "replace": Replaces the existing audio track with the new one.
+            - "add": Adds a new audio track to the video.
+            - "mix": Mixes the new audio track with the existing one, see
+              `mix_audio`.
+
+        Raises
+        ------
+        TypeError
+            If `audio` is not an instance of `Audio`.
+            If `strategy` is not a string.
+        ValueError
+            If `strategy` is not one of the valid options: "replace", "add",
+            or "mix".
+        NameError
+            If the specified strategy is not found in the strategy mapping.
+        """
+        # Verifying parameters types
+        if not isinstance(audio, Audio):
+            raise TypeError(
+                f"Expected 'audio' to be of type 'Audio', but got "
+                f"'{type(audio).__name__}' instead."
+            )
+        if not isinstance(strategy, str):
+            raise TypeError(
+                f"Expected 'strategy' to be of type 'str', but got "
+                f"'{type(strategy).__name__}' instead."
+            )
+        # Verifying parameters consistency
+        valid_strategies = ["replace", "add", "mix"]
+        if strategy not in valid_strategies:
+            raise ValueError(
+                f"Invalid strategy '{strategy}'. Expected one of: "
+                f"{', '.join(valid_strategies)}."
+            )
+        # Deferring operation when a plan is recorded
+        if self._record("add_audio", audio=audio, strategy=strategy):
+            return
+        # Mixing audio, the video is copied
+        if strategy == valid_strategies[2]:
+            self.mix_audio(
+                audios=[audio]
+            )
+            return
         # Input video and audio
         input_video = ffmpeg.input(
             filename=self._main_temp_file
@@ -514,38 +1250,393 @@ class Video(_Media):
                 shortest=None,
                 vcodec="copy"
             )
-        # Mixing audio
-        elif strategy == valid_strategies[2]:
-            # Mixing audios
-            mixed_audio = ffmpeg.filter(
-                [
-                    input_video.audio,
-                    input_audio.audio
-                ],
-                filter_name="amix",
-                duration="shortest"
+        else:
+            raise NameError(
+                "Strategy not found"
             )
-            # Merging video and mixed audios
-            merged = ffmpeg.concat(
-                input_video,
-                mixed_audio,
-                v=1,
-                a=1
+        # Overwrite output file
+        overwrite = ffmpeg.overwrite_output(
+            output
+        )
+        # Running command
+        self._run(
+            stream_spec=overwrite,
+            quiet=True
+        )
+        # Saving result to main file
+        self._move_and_replace()
+
+    def add_audios(
+        self,
+        audios: list,
+        strategy: str = "add",
+        languages: list = None,
+        titles: list = None
+    ):
+        """
+        Adds several audio tracks to the video in a single mux.
+
+        Video and subtitles are stream-copied, as well as the audios whose
+        codec the container supports. Other audios are encoded with the
+        default codec of the container.
+
+        Parameters
+        ----------
+        audios: list
+            The audios to add, instances of the `Audio` class, in the order
+            of the tracks.
+        strategy: str, optional
+            The strategy for handling the existing audio tracks. Must be one
+            of the following:
+            - "replace": Replaces the existing audio tracks with the new ones.
+            - "add": Adds the new tracks after the existing ones.
+            Default is "add". Use `mix_audio` to mix the audios instead.
+        languages: list, optional
+            ISO 639-2 language code of each track (e.g. "eng"), or None to
+            leave a track untagged. Default is None.
+        titles: list, optional
+            Title of each track (e.g. "Commentary"), or None to leave a track
+            untitled. Default is None.
+
+        Raises
+        ------
+        TypeError
+            If `audios` is not a list of `Audio`.
+            If `strategy` is not a string.
+            If `languages` or `titles` are not lists of str or None.
+        ValueError
+            If `audios` is empty.
+            If `strategy` is not one of the valid options: "replace" or
+            "add".
+            If `languages` or `titles` do not have one value per audio.
+        """
+        # Verifying parameters types
+        if not isinstance(audios, list):
+            raise TypeError(
+                f"Expected 'audios' to be of type 'list', but got "
+                f"'{type(audios).__name__}' instead."
             )
-            output = ffmpeg.output(
-                merged,
-                self._second_temp_file
+        for audio in audios:
+            if not isinstance(audio, Audio):
+                raise TypeError(
+                    f"Expected 'audios' items to be of type 'Audio', but got "
+                    f"'{type(audio).__name__}' instead."
+                )
+        if not isinstance(strategy, str):
+            raise TypeError(
+                f"Expected 'strategy' to be of type 'str', but got "
+                f"'{type(strategy).__name__}' instead."
+            )
+        for name, values in [("languages", languages), ("titles", titles)]:
+            if values is None:
+                continue
+            if not isinstance(values, list):
+                raise TypeError(
+                    f"Expected '{name}' to be of type 'list', but got "
+                    f"'{type(values).__name__}' instead."
+                )
+            for value in values:
+                if value is not None and not isinstance(value, str):
+                    raise TypeError(
+                        f"Expected '{name}' items to be of type 'str', but "
+                        f"got '{type(value).__name__}' instead."
+                    )
+        # Verifying parameters values
+        if len(audios) == 0:
+            raise ValueError(
+                "Invalid value: 'audios' must contain at least one audio."
+            )
+        valid_strategies = ["replace", "add"]
+        if strategy not in valid_strategies:
+            raise ValueError(
+                f"Invalid strategy '{strategy}'. Expected one of: "
+                f"{', '.join(valid_strategies)}."
+            )
+        if languages is None:
+            languages = [None] * len(audios)
+        if titles is None:
+            titles = [None] * len(audios)
+        for name, values in [("languages", languages), ("titles", titles)]:
+            if len(values) != len(audios):
+                raise ValueError(
+                    f"Invalid value: '{name}' must have one value per audio. "
+                    f"Got {len(values)} values for {len(audios)} audios."
+                )
+        # Deferring operation when a plan is recorded
+        if self._record(
+            "add_audios",
+            audios=audios,
+            strategy=strategy,
+            languages=languages,
+            titles=titles
+        ):
+            return
+        # Input video and audios
+        input_video = ffmpeg.input(
+            filename=self._main_temp_file
+        )
+        input_audios = [
+            ffmpeg.input(filename=audio._main_temp_file).audio
+            for audio in audios
+        ]
+        metadata = self.metadata()
+        streams = metadata["streams"]
+        kwargs = {}
+        if strategy == valid_strategies[0]:
+            # Keeping video and subtitles, the new tracks come first
+            mapped = [input_video["v?"], *input_audios, input_video["s?"]]
+            first_index = sum(
+                stream["codec_type"] == "video" for stream in streams
             )
+            first_audio = 0
         else:
-            raise NameError(
-                "Strategy not found"
+            # Keeping every stream, the new tracks come last
+            mapped = [input_video, *input_audios]
+            first_index = len(streams)
+            first_audio = sum(
+                stream["codec_type"] == "audio" for stream in streams
+            )
+            # Existing audio tracks are already muxed in the container
+            for index in range(first_audio):
+                kwargs[f"c:a:{index}"] = "copy"
+        # Copying the audios the container supports
+        extension = os.path.splitext(self._main_temp_file)[1].lower()
+        copy_codecs = self._audio_copy_codecs.get(extension, [])
+        # MP4 and QuickTime store track titles as handler names
+        title_key = "title"
+        if extension in [".mp4", ".m4v", ".mov"]:
+            title_key = "handler_name"
+        for offset, (audio, language, title) in enumerate(
+            zip(audios, languages, titles)
+        ):
+            codec = audio._audio_metadata()["codec_name"]
+            if copy_codecs is None or codec in copy_codecs:
+                kwargs[f"c:a:{first_audio + offset}"] = "copy"
+            # Tagging tracks by audio index and by stream index, as each
+            # specifier can only be given once
+            if language is not None:
+                kwargs[f"metadata:s:a:{first_audio + offset}"] = (
+                    f"language={language}"
+                )
+            if title is not None:
+                kwargs[f"metadata:s:{first_index + offset}"] = (
+                    f"{title_key}={title}"
+                )
+        # Cutting longer tracks at the end of the video, as "shortest" has
+        # no effect when every stream is copied
+        output = ffmpeg.output(
+            *mapped,
+            self._second_temp_file,
+            t=metadata["duration"],
+            vcodec="copy",
+            scodec="copy",
+            **kwargs
+        )
+        # Overwrite output file
+        overwrite = ffmpeg.overwrite_output(
+            output
+        )
+        # Running command
+        self._run(
+            stream_spec=overwrite,
+            quiet=True
+        )
+        # Saving result to main file
+        self._move_and_replace()
+
+    def mix_audio(
+        self,
+        audios: list,
+        gains: list = None,
+        offsets: list = None,
+        ducking: bool = False
+    ):
+        """
+        Mixes audio tracks with the audio of the video in a single pass.
+
+        Only the first audio track of the video is mixed and encoded, its
+        other audio tracks, video and subtitles are copied. The mix keeps
+        the duration of the video and the level of its audio.
+
+        Parameters
+        ----------
+        audios: list
+            The audios to mix, instances of the `Audio` class.
+        gains: list, optional
+            The gain (in dB) applied to each audio. Default is 0 for every
+            audio.
+        offsets: list, optional
+            The time (in seconds) of the video at which each audio starts.
+            Default is 0 for every audio.
+        ducking: bool, optional
+            If True, the mixed audios are lowered while the video audio is
+            loud, like background music under speech. Default is False.
+
+        Raises
+        ------
+        TypeError
+            If `audios` is not a list of `Audio`.
+            If `gains` or `offsets` are not lists of int or float.
+            If `ducking` is not a bool.
+        ValueError
+            If `audios` is empty.
+            If `gains` or `offsets` do not have one value per audio.
+            If an offset is negative.
+            If `ducking` is True and the video has no audio.
+        """
+        # Verifying parameters types
+        if not isinstance(audios, list):
+            raise TypeError(
+                f"Expected 'audios' to be of type 'list', but got "
+                f"'{type(audios).__name__}' instead."
+            )
+        for audio in audios:
+            if not isinstance(audio, Audio):
+                raise TypeError(
+                    f"Expected 'audios' items to be of type 'Audio', but got "
+                    f"'{type(audio).__name__}' instead."
+                )
+        for name, values in [("gains", gains), ("offsets", offsets)]:
+            if values is None:
+                continue
+            if not isinstance(values, list):
+                raise TypeError(
+                    f"Expected '{name}' to be of type 'list', but got "
+                    f"'{type(values).__name__}' instead."
+                )
+            for value in values:
+                if not isinstance(value, (int, float)):
+                    raise TypeError(
+                        f"Expected '{name}' items to be of type 'int' or "
+                        f"'float', but got '{type(value).__name__}' instead."
+                    )
+        if not isinstance(ducking, bool):
+            raise TypeError(
+                f"Expected 'ducking' to be of type 'bool', but got "
+                f"'{type(ducking).__name__}' instead."
+            )
+        # Verifying parameters values
+        if len(audios) == 0:
+            raise ValueError(
+                "Invalid value: 'audios' must contain at least one audio."
+            )
+        if gains is None:
+            gains = [0] * len(audios)
+        if offsets is None:
+            offsets = [0] * len(audios)
+        for name, values in [("gains", gains), ("offsets", offsets)]:
+            if len(values) != len(audios):
+                raise ValueError(
+                    f"Invalid value: '{name}' must have one value per audio. "
+                    f"Got {len(values)} values for {len(audios)} audios."
+                )
+        for offset in offsets:
+            if offset < 0:
+                raise ValueError(
+                    f"Invalid value: 'offsets' must be greater than or equal "
+                    f"to 0. Got offset={offset}."
+                )
+        # Verifying parameters consistency
+        audio_count = len([
+            stream
+            for stream in self.metadata()["streams"]
+            if stream["codec_type"] == "audio"
+        ])
+        has_audio = audio_count > 0
+        if ducking and not has_audio:
+            raise ValueError(
+                "Invalid value: 'ducking' requires the video to have an "
+                "audio stream."
+            )
+        # Deferring operation when a plan is recorded
+        if self._record(
+            "mix_audio",
+            audios=audios,
+            gains=gains,
+            offsets=offsets,
+            ducking=ducking
+        ):
+            return
+        # Input video
+        input_video = ffmpeg.input(
+            filename=self._main_temp_file
+        )
+        # Applying gain and offset of each audio
+        sources = []
+        for audio, gain, offset in zip(audios, gains, offsets):
+            source = ffmpeg.input(
+                filename=audio._main_temp_file
+            ).audio
+            if gain != 0:
+                source = source.filter(
+                    "volume",
+                    f"{gain}dB"
+                )
+            if offset > 0:
+                source = source.filter(
+                    "adelay",
+                    delays=int(offset * 1000),
+                    all=1
+                )
+            sources.append(source)
+        # Mixing the audios together
+        if len(sources) > 1:
+            mixed_audio = ffmpeg.filter(
+                sources,
+                filter_name="amix",
+                inputs=len(sources),
+                duration="longest",
+                normalize=0
+            )
+        else:
+            mixed_audio = sources[0]
+        output_params = {}
+        if has_audio:
+            video_audio = input_video["a:0"]
+            # Lowering the mixed audios under the video audio
+            if ducking:
+                split = video_audio.filter_multi_output("asplit")
+                video_audio = split[0]
+                mixed_audio = ffmpeg.filter(
+                    [mixed_audio, split[1]],
+                    filter_name="sidechaincompress",
+                    threshold=0.05,
+                    ratio=8,
+                    attack=20,
+                    release=300
+                )
+            # Mixing with the video audio, keeping its duration
+            mixed_audio = ffmpeg.filter(
+                [video_audio, mixed_audio],
+                filter_name="amix",
+                inputs=2,
+                duration="first",
+                normalize=0
             )
+        else:
+            # Cutting the mixed audios at the end of the video
+            output_params["shortest"] = None
+        # Copying the other audio tracks after the mix
+        copied_audios = []
+        for index in range(1, audio_count):
+            copied_audios.append(input_video[f"a:{index}"])
+            output_params[f"c:a:{index}"] = "copy"
+        output = ffmpeg.output(
+            input_video["v?"],
+            mixed_audio,
+            *copied_audios,
+            input_video["s?"],
+            self._second_temp_file,
+            vcodec="copy",
+            scodec="copy",
+            **output_params
+        )
         # Overwrite output file
         overwrite = ffmpeg.overwrite_output(
             output
         )
         # Running command
-        ffmpeg.run(
+        self._run(
             stream_spec=overwrite,
             quiet=True
         )
@@ -558,6 +1649,9 @@ class Video(_Media):
         """
         Removes audio tracks from the video.
         """
+        # Deferring operation when a plan is recorded
+        if self._record("remove_audio"):
+            return
         # Input video
         input = ffmpeg.input(
             filename=self._main_temp_file
@@ -573,9 +1667,1646 @@ class Video(_Media):
             output
         )
         # Running command
-        ffmpeg.run(
+        self._run(
             stream_spec=overwrite,
             quiet=True
         )
         # Saving result to main file
         self._move_and_replace()
+
+    def trim(
+        self,
+        start: Union[int, float],
+        end: Union[int, float]
+    ):
+        """
+        Trims the video to a range, with sample accuracy on the audio.
+
+        Unlike `clip`, which cuts on packet boundaries without re-encoding,
+        video and audio are decoded and cut at the exact same bounds, so
+        they stay in sync. Subtitles are stream-copied and cut at the same
+        bounds.
+
+        Parameters
+        ----------
+        start: int or float
+            Start time (in seconds) of the range.
+        end: int or float
+            End time (in seconds) of the range.
+
+        Raises
+        ------
+        TypeError
+            If start or end are not int or float.
+        ValueError
+            If start is negative.
+            If end is not strictly greater than start.
+            If end is strictly greater than media duration.
+        """
+        # Verifying parameters types
+        if not isinstance(start, (int, float)):
+            raise TypeError(
+                f"Expected 'start' to be of type 'int' or 'float', but got "
+                f"'{type(start).__name__}' instead."
+            )
+        if not isinstance(end, (int, float)):
+            raise TypeError(
+                f"Expected 'end' to be of type 'int' or 'float', but got "
+                f"'{type(end).__name__}' instead."
+            )
+        # Verifying parameters consistency
+        if start < 0:
+            raise ValueError(
+                f"Invalid 'start' value: 'start' must be greater than or "
+                f"equal to 0. Got start={start}."
+            )
+        if not end > start:
+            raise ValueError(
+                f"Invalid 'end' value: 'end' must be strictly greater than "
+                f"'start'. Got start={start} and end={end}."
+            )
+        media_duration = float(self.metadata()["duration"])
+        if not end <= media_duration:
+            raise ValueError(
+                f"Invalid 'end' value: 'end' must be less than or equal to "
+                f"the media duration. Got end={end}, but media duration is "
+                f"{media_duration}."
+            )
+        # Deferring operation when a plan is recorded
+        if self._record("trim", start=start, end=end):
+            return
+        input = ffmpeg.input(
+            filename=self._main_temp_file
+        )
+        # Output seeking cuts decoded frames and samples at the bounds
+        output = ffmpeg.output(
+            input["v"],
+            input["a?"],
+            input["s?"],
+            self._second_temp_file,
+            ss=start,
+            to=end,
+            scodec="copy"
+        )
+        overwrite = ffmpeg.overwrite_output(
+            output
+        )
+        # Running command
+        self._run(
+            stream_spec=overwrite,
+            quiet=True
+        )
+        # Saving result to main file
+        self._move_and_replace()
+
+    def speed(
+        self,
+        factor: Union[int, float],
+        preserve_pitch: bool = True,
+        drop_audio: bool = False
+    ):
+        """
+        Changes the playback speed of the video.
+
+        Frames are retimed with setpts and dropped down to the original frame
+        rate right after, so later filters and the encoder only process the
+        kept frames. Every audio stream is retimed with chained atempo
+        filters, and subtitles are copied with rescaled timestamps.
+
+        When the audio is dropped and the relabeled frame rate stays under
+        120 fps, timestamps are only relabeled and the video is copied
+        without re-encoding, which suits timelapses.
+
+        Parameters
+        ----------
+        factor: int or float
+            The speed factor, greater than 1 to speed up and lower than 1 to
+            slow down.
+        preserve_pitch: bool, optional
+            If True, the pitch of the audio is kept, otherwise it changes
+            with the speed. Default is True.
+        drop_audio: bool, optional
+            If True, audio and subtitles are removed. Default is False.
+
+        Raises
+        ------
+        TypeError
+            If `factor` is not an int or a float.
+            If `preserve_pitch` or `drop_audio` are not bool.
+        ValueError
+            If `factor` is not positive.
+        """
+        # Verifying parameters types
+        if not isinstance(factor, (int, float)):
+            raise TypeError(
+                f"Expected 'factor' to be of type 'int' or 'float', but got "
+                f"'{type(factor).__name__}' instead."
+            )
+        if not isinstance(preserve_pitch, bool):
+            raise TypeError(
+                f"Expected 'preserve_pitch' to be of type 'bool', but got "
+                f"'{type(preserve_pitch).__name__}' instead."
+            )
+        if not isinstance(drop_audio, bool):
+            raise TypeError(
+                f"Expected 'drop_audio' to be of type 'bool', but got "
+                f"'{type(drop_audio).__name__}' instead."
+            )
+        # Verifying parameters values
+        if factor <= 0:
+            raise ValueError(
+                f"Invalid value: 'factor' must be positive. "
+                f"Got factor={factor}."
+            )
+        # Deferring operation when a plan is recorded
+        if self._record(
+            "speed",
+            factor=factor,
+            preserve_pitch=preserve_pitch,
+            drop_audio=drop_audio
+        ):
+            return
+        video_metadata = self._get_video_metadata()
+        frame_rate = Fraction(video_metadata["r_frame_rate"])
+        # Relabeling timestamps of the copied video
+        if drop_audio and frame_rate * factor <= self._max_relabeled_fps:
+            input = ffmpeg.input(
+                filename=self._main_temp_file,
+                itsscale=1 / factor
+            )
+            output = ffmpeg.output(
+                input.video,
+                self._second_temp_file,
+                vcodec="copy"
+            )
+        else:
+            input = ffmpeg.input(
+                filename=self._main_temp_file
+            )
+            # Retiming frames, then dropping the extra ones
+            video = input.video.filter(
+                "setpts",
+                f"PTS/{factor}"
+            ).filter(
+                "fps",
+                fps=str(frame_rate)
+            )
+            streams = [video]
+            audio_streams = [
+                stream
+                for stream in self.metadata()["streams"]
+                if stream["codec_type"] == "audio"
+            ]
+            if not drop_audio:
+                # Retiming every audio stream
+                for index, audio_metadata in enumerate(audio_streams):
+                    streams.append(
+                        self._speed_audio(
+                            input[f"a:{index}"],
+                            factor=factor,
+                            preserve_pitch=preserve_pitch,
+                            sample_rate=int(audio_metadata["sample_rate"])
+                        )
+                    )
+                # Copying subtitles with timestamps scaled at demuxing
+                subtitles_input = ffmpeg.input(
+                    filename=self._main_temp_file,
+                    itsscale=1 / factor
+                )
+                streams.append(subtitles_input["s?"])
+            output = ffmpeg.output(
+                *streams,
+                self._second_temp_file,
+                scodec="copy"
+            )
+        overwrite = ffmpeg.overwrite_output(
+            output
+        )
+        # Running command
+        self._run(
+            stream_spec=overwrite,
+            quiet=True
+        )
+        # Saving result to main file
+        self._move_and_replace()
+
+    def _speed_audio(
+        self,
+        stream: ffmpeg.nodes.FilterableStream,
+        factor: Union[int, float],
+        preserve_pitch: bool,
+        sample_rate: int
+    ):
+        """
+        Builds the filters changing the speed of an audio stream.
+
+        Parameters
+        ----------
+        stream: ffmpeg.nodes.FilterableStream
+            The audio stream.
+        factor: int or float
+            The speed factor.
+        preserve_pitch: bool
+            If True, the pitch of the audio is kept.
+        sample_rate: int
+            The sample rate of the audio stream.
+
+        Returns
+        -------
+        stream: ffmpeg.nodes.FilterableStream
+            The audio stream at the new speed.
+        """
+        if not preserve_pitch:
+            # Playing samples faster, then restoring the sample rate
+            return stream.filter(
+                "asetrate",
+                round(sample_rate * factor)
+            ).filter(
+                "aresample",
+                sample_rate
+            )
+        # Chaining atempo filters, each one keeping its best quality range
+        while factor > 2:
+            stream = stream.filter("atempo", 2)
+            factor /= 2
+        while factor < 0.5:
+            stream = stream.filter("atempo", 0.5)
+            factor /= 0.5
+        if factor != 1:
+            stream = stream.filter("atempo", factor)
+        return stream
+
+    def scenes(
+        self,
+        threshold: Union[int, float] = 0.3,
+        width: int = 160,
+        frame_step: int = 1
+    ):
+        """
+        Detects scene cuts in a single pass over downscaled frames.
+
+        Cuts are cached with the metadata of the video, so later calls with
+        the same parameters and clips snapped to scenes reuse them.
+
+        Parameters
+        ----------
+        threshold: int or float, optional
+            Minimum scene change score for a frame to be a cut. Range is 0-1.
+            Default is 0.3.
+        width: int, optional
+            Width in pixels frames are downscaled to before analysis (divisible
+            by 2), or None to analyse frames at full resolution. Default is
+            160.
+        frame_step: int, optional
+            Analyses one frame every `frame_step` frames. Every frame is still
+            decoded, so this only saves the scaling and scene scoring of the
+            skipped frames. Cuts are then located within `frame_step` frames.
+            Default is 1.
+
+        Returns
+        -------
+        cuts: list
+            Sorted timestamps in seconds of the first frame of each scene,
+            excluding the first scene.
+
+        Raises
+        ------
+        TypeError
+            If threshold is not int or float.
+            If width is not an int or None.
+            If frame_step is not an int.
+        ValueError
+            If threshold is not between 0 and 1.
+            If width is not a positive integer divisible by 2.
+            If frame_step is not a positive integer.
+        """
+        # Verifying parameters types
+        if not isinstance(threshold, (int, float)):
+            raise TypeError(
+                f"Expected 'threshold' to be of type 'int' or 'float', but "
+                f"got '{type(threshold).__name__}' instead."
+            )
+        if width is not None and not isinstance(width, int):
+            raise TypeError(
+                f"Expected 'width' to be of type 'int', but got "
+                f"'{type(width).__name__}' instead."
+            )
+        if not isinstance(frame_step, int):
+            raise TypeError(
+                f"Expected 'frame_step' to be of type 'int', but got "
+                f"'{type(frame_step).__name__}' instead."
+            )
+        # Verifying parameters values
+        if not 0 <= threshold <= 1:
+            raise ValueError(
+                f"Invalid value: 'threshold' must be between 0 and 1. "
+                f"Got threshold={threshold}."
+            )
+        if width is not None and (width <= 0 or width % 2 != 0):
+            raise ValueError(
+                f"Invalid value: 'width' must be a positive integer "
+                f"divisible by 2. Got width={width}."
+            )
+        if frame_step <= 0:
+            raise ValueError(
+                f"Invalid value: 'frame_step' must be a positive integer. "
+                f"Got frame_step={frame_step}."
+            )
+        self._verify_current()
+        scenes = self._cache.setdefault("scenes", {})
+        key = (threshold, width, frame_step)
+        if key not in scenes:
+            # Input video
+            input = ffmpeg.input(
+                filename=self._main_temp_file
+            )
+            stream = input.video
+            # Dropping decoded frames before scaling and scoring them
+            if frame_step > 1:
+                stream = ffmpeg.filter(
+                    stream,
+                    "framestep",
+                    step=frame_step
+                )
+            # Downscaling frames for a cheap analysis
+            if width is not None:
+                stream = ffmpeg.filter(
+                    stream,
+                    "scale",
+                    width,
+                    -2
+                )
+            # Keeping and logging frames starting a new scene
+            stream = ffmpeg.filter(
+                stream,
+                "select",
+                f"gt(scene,{threshold})"
+            )
+            stream = ffmpeg.filter(
+                stream,
+                "showinfo"
+            )
+            output = ffmpeg.output(
+                stream,
+                "-",
+                format="null"
+            )
+            # Running command
+            _, stderr = self._run(
+                stream_spec=output,
+                capture_stderr=True,
+                quiet=True
+            )
+            scenes[key] = sorted(
+                float(timestamp)
+                for timestamp in re.findall(
+                    r"pts_time:\s*(-?[0-9.]+)",
+                    stderr.decode(errors="replace")
+                )
+            )
+        cuts = list(scenes[key])
+        return cuts
+
+    def detect_black(
+        self,
+        duration: Union[int, float] = 0.5,
+        threshold: Union[int, float] = 0.1,
+        width: int = 160
+    ):
+        """
+        Detects black intervals in a single low resolution decode.
+
+        Intervals are cached with the metadata of the video, so later calls
+        with the same parameters reuse them.
+
+        Parameters
+        ----------
+        duration: int or float, optional
+            Minimum duration (in seconds) of a black interval. Default is
+            0.5.
+        threshold: int or float, optional
+            Luminance under which a pixel is black. Range is 0-1. Default is
+            0.1.
+        width: int, optional
+            Width in pixels frames are downscaled to before analysis (divisible
+            by 2), or None to analyse frames at full resolution. Default is
+            160.
+
+        Returns
+        -------
+        intervals: list
+            Sorted (start, end) tuples in seconds of the black intervals.
+
+        Raises
+        ------
+        TypeError
+            If duration or threshold are not int or float.
+            If width is not an int or None.
+        ValueError
+            If duration is not positive.
+            If threshold is not between 0 and 1.
+            If width is not a positive integer divisible by 2.
+        """
+        # Verifying parameters types
+        if not isinstance(duration, (int, float)):
+            raise TypeError(
+                f"Expected 'duration' to be of type 'int' or 'float', but got "
+                f"'{type(duration).__name__}' instead."
+            )
+        if not isinstance(threshold, (int, float)):
+            raise TypeError(
+                f"Expected 'threshold' to be of type 'int' or 'float', but "
+                f"got '{type(threshold).__name__}' instead."
+            )
+        if width is not None and not isinstance(width, int):
+            raise TypeError(
+                f"Expected 'width' to be of type 'int', but got "
+                f"'{type(width).__name__}' instead."
+            )
+        # Verifying parameters values
+        if duration <= 0:
+            raise ValueError(
+                f"Invalid value: 'duration' must be positive. "
+                f"Got duration={duration}."
+            )
+        if not 0 <= threshold <= 1:
+            raise ValueError(
+                f"Invalid value: 'threshold' must be between 0 and 1. "
+                f"Got threshold={threshold}."
+            )
+        if width is not None and (width <= 0 or width % 2 != 0):
+            raise ValueError(
+                f"Invalid value: 'width' must be a positive integer "
+                f"divisible by 2. Got width={width}."
+            )
+        self._verify_current()
+        blacks = self._cache.setdefault("blacks", {})
+        key = (duration, threshold, width)
+        if key not in blacks:
+            # Input video
+            input = ffmpeg.input(
+                filename=self._main_temp_file
+            )
+            stream = input.video
+            # Downscaling frames for a cheap analysis
+            if width is not None:
+                stream = ffmpeg.filter(
+                    stream,
+                    "scale",
+                    width,
+                    -2
+                )
+            stream = ffmpeg.filter(
+                stream,
+                "blackdetect",
+                d=duration,
+                pix_th=threshold
+            )
+            output = ffmpeg.output(
+                stream,
+                "-",
+                format="null"
+            )
+            # Running command
+            _, stderr = self._run(
+                stream_spec=output,
+                capture_stderr=True,
+                quiet=True
+            )
+            blacks[key] = _parse_intervals(
+                stderr.decode(errors="replace"),
+                r"black_(start|end):\s*(-?[0-9.]+)",
+                float(self.metadata()["duration"])
+            )
+        return list(blacks[key])
+
+    def trim_black(
+        self,
+        duration: Union[int, float] = 0.5,
+        threshold: Union[int, float] = 0.1,
+        width: int = 160,
+        accurate: bool = False
+    ):
+        """
+        Removes the black frames at the start and at the end of the video.
+
+        The video is cut with `clip`, so streams are copied and, unless
+        `accurate` is True, the cut starts at the keyframe before the end
+        of the leading black frames.
+
+        Parameters
+        ----------
+        duration: int or float, optional
+            Minimum duration (in seconds) of a black interval. Default is
+            0.5.
+        threshold: int or float, optional
+            Luminance under which a pixel is black. Range is 0-1. Default is
+            0.1.
+        width: int, optional
+            Width in pixels frames are downscaled to before analysis (divisible
+            by 2), or None to analyse frames at full resolution. Default is
+            160.
+        accurate: bool, optional
+            Whether the video must start exactly at the end of the leading
+            black frames, see `clip`. Default is False.
+
+        Raises
+        ------
+        TypeError
+            If duration or threshold are not int or float.
+            If width is not an int or None.
+            If accurate is not a bool.
+        ValueError
+            If duration is not positive.
+            If threshold is not between 0 and 1.
+            If width is not a positive integer divisible by 2.
+            If the video is black from start to end.
+        """
+        # Verifying parameters types
+        if not isinstance(accurate, bool):
+            raise TypeError(
+                f"Expected 'accurate' to be of type 'bool', but got "
+                f"'{type(accurate).__name__}' instead."
+            )
+        # Deferring operation when a plan is recorded
+        if self._record(
+            "trim_black",
+            duration=duration,
+            threshold=threshold,
+            width=width,
+            accurate=accurate
+        ):
+            return
+        # Black intervals end at the timestamp of their last frame
+        frame_rate = Fraction(self._get_video_metadata()["r_frame_rate"])
+        self._trim_intervals(
+            self.detect_black(
+                duration=duration,
+                threshold=threshold,
+                width=width
+            ),
+            accurate=accurate,
+            tolerance=float(1 / frame_rate)
+        )
+
+    def _snap_points(
+        self,
+        snap: str
+    ):
+        """
+        Gets the timestamps to which clip boundaries can be snapped.
+
+        Parameters
+        ----------
+        snap: str
+            The kind of points to snap to, one of `_snaps`.
+
+        Returns
+        -------
+        points: list
+            Sorted timestamps in seconds.
+        """
+        if snap == "scene":
+            return self.scenes()
+        return super()._snap_points(snap)
+
+    def _burn_subtitles_filter(
+        self,
+        stream,
+        subtitles: Subtitles,
+        style: dict = None
+    ):
+        """
+        Applies the subtitles rendering filter to a video stream.
+
+        Parameters
+        ----------
+        stream: ffmpeg.Stream
+            The video stream on which subtitles are rendered.
+        subtitles: Subtitles
+            The subtitles to render.
+        style: dict, optional
+            ASS style fields overriding the subtitles style. Default is None.
+
+        Returns
+        -------
+        stream: ffmpeg.Stream
+            The video stream with subtitles rendered.
+        """
+        subtitles_file = subtitles._main_temp_file
+        # ASS subtitles carry their own style, no conversion needed
+        if style is None and subtitles_file.endswith(".ass"):
+            return ffmpeg.filter(
+                stream,
+                "ass",
+                filename=subtitles_file
+            )
+        # Other formats go through libass with optional style override
+        kwargs = {}
+        if style:
+            kwargs["force_style"] = ",".join(
+                f"{key}={value}"
+                for key, value in style.items()
+            )
+        return ffmpeg.filter(
+            stream,
+            "subtitles",
+            filename=subtitles_file,
+            **kwargs
+        )
+
+    def burn_subtitles(
+        self,
+        subtitles: Subtitles,
+        style: dict = None
+    ):
+        """
+        Burns subtitles into the video frames in a single encode.
+
+        Parameters
+        ----------
+        subtitles: Subtitles
+            The subtitles to burn into the video. This should be an instance
+            of the `Subtitles` class.
+        style: dict, optional
+            ASS style fields overriding the subtitles style, for example
+            {"Fontsize": 24, "PrimaryColour": "&H00FFFFFF"}. Default is None.
+
+        Raises
+        ------
+        TypeError
+            If `subtitles` is not an instance of `Subtitles`.
+            If `style` is not a dict.
+            If a key of `style` is not a str.
+        """
+        # Verifying parameters types
+        if not isinstance(subtitles, Subtitles):
+            raise TypeError(
+                f"Expected 'subtitles' to be of type 'Subtitles', but got "
+                f"'{type(subtitles).__name__}' instead."
+            )
+        if style is not None and not isinstance(style, dict):
+            raise TypeError(
+                f"Expected 'style' to be of type 'dict', but got "
+                f"'{type(style).__name__}' instead."
+            )
+        for key in (style or {}):
+            if not isinstance(key, str):
+                raise TypeError(
+                    f"Expected 'style' keys to be of type 'str', but got "
+                    f"'{type(key).__name__}' instead."
+                )
+        # Deferring operation when a plan is recorded
+        if self._record("burn_subtitles", subtitles=subtitles, style=style):
+            return
+        # Rendering subtitles on video frames, other streams are copied
+        self._render_filters(
+            [
+                {
+                    "op": "burn_subtitles",
+                    "params": {"subtitles": subtitles, "style": style}
+                }
+            ]
+        )
+
+    def add_subtitles(
+        self,
+        subtitles: Subtitles,
+        language: str = None
+    ):
+        """
+        Adds a soft subtitles track to the video without re-encoding.
+
+        Audio and video streams are stream-copied, only the subtitles track is
+        muxed into the container.
+
+        Parameters
+        ----------
+        subtitles: Subtitles
+            The subtitles to add to the video. This should be an instance of
+            the `Subtitles` class.
+        language: str, optional
+            ISO 639-2 language code of the subtitles track (e.g. "eng").
+            Default is None.
+
+        Raises
+        ------
+        TypeError
+            If `subtitles` is not an instance of `Subtitles`.
+            If `language` is not a str.
+        """
+        # Verifying parameters types
+        if not isinstance(subtitles, Subtitles):
+            raise TypeError(
+                f"Expected 'subtitles' to be of type 'Subtitles', but got "
+                f"'{type(subtitles).__name__}' instead."
+            )
+        if language is not None and not isinstance(language, str):
+            raise TypeError(
+                f"Expected 'language' to be of type 'str', but got "
+                f"'{type(language).__name__}' instead."
+            )
+        # Deferring operation when a plan is recorded
+        if self._record(
+            "add_subtitles",
+            subtitles=subtitles,
+            language=language
+        ):
+            return
+        # Choosing a subtitles codec supported by the container
+        extension = os.path.splitext(self._main_temp_file)[1].lower()
+        if extension in [".mp4", ".m4v", ".mov"]:
+            subtitles_codec = "mov_text"
+        elif extension == ".webm":
+            subtitles_codec = "webvtt"
+        else:
+            subtitles_codec = "copy"
+        # Input video and subtitles
+        input_video = ffmpeg.input(
+            filename=self._main_temp_file
+        )
+        input_subtitles = ffmpeg.input(
+            filename=subtitles._main_temp_file
+        )
+        kwargs = {}
+        if language is not None:
+            # Tagging the new track, muxed after the existing subtitles
+            index = len([
+                stream for stream in self.metadata()["streams"]
+                if stream["codec_type"] == "subtitle"
+            ])
+            kwargs[f"metadata:s:s:{index}"] = f"language={language}"
+        # Copying audio and video, muxing subtitles only
+        output = ffmpeg.output(
+            input_video,
+            input_subtitles,
+            self._second_temp_file,
+            vcodec="copy",
+            acodec="copy",
+            scodec=subtitles_codec,
+            **kwargs
+        )
+        overwrite = ffmpeg.overwrite_output(
+            output
+        )
+        # Running command
+        self._run(
+            stream_spec=overwrite,
+            quiet=True
+        )
+        # Saving result to main file
+        self._move_and_replace()
+
+    def export(
+        self,
+        path: str,
+        target_size: int = None,
+        bitrate: int = None,
+        preset: str = "medium"
+    ):
+        """
+        Saves the video re-encoded to a target file size or average bitrate,
+        with a two-pass H.264 encode.
+
+        The first pass only analyses the video at fast analysis settings,
+        without muxing any output. The second pass encodes it at the bitrate
+        left by the AAC audio and a margin for the container overhead. Only
+        the first audio track is exported. The video itself is not
+        modified.
+
+        Parameters
+        ----------
+        path: str
+            The destination file path where the video will be saved.
+        target_size: int, optional
+            Maximum size of the file, in bytes. Default is None.
+        bitrate: int, optional
+            Average bitrate of the file, in bits per second. Default is
+            None.
+        preset: str, optional
+            x264 preset of both passes, faster presets reduce quality at a
+            given size. The first pass also uses x264 fast first pass
+            settings. Default is "medium".
+
+        Raises
+        ------
+        TypeError
+            If `path` or `preset` are not str.
+            If `target_size` or `bitrate` are not int.
+        ValueError
+            If the specified `path` is invalid or does not exist.
+            If not exactly one of `target_size` and `bitrate` is given.
+            If `target_size` or `bitrate` are too small for the video.
+        """
+        # Verifying parameters types
+        if not isinstance(path, str):
+            raise TypeError(
+                f"Expected 'path' to be of type 'str', but got "
+                f"'{type(path).__name__}' instead."
+            )
+        if target_size is not None and not isinstance(target_size, int):
+            raise TypeError(
+                f"Expected 'target_size' to be of type 'int', but got "
+                f"'{type(target_size).__name__}' instead."
+            )
+        if bitrate is not None and not isinstance(bitrate, int):
+            raise TypeError(
+                f"Expected 'bitrate' to be of type 'int', but got "
+                f"'{type(bitrate).__name__}' instead."
+            )
+        if not isinstance(preset, str):
+            raise TypeError(
+                f"Expected 'preset' to be of type 'str', but got "
+                f"'{type(preset).__name__}' instead."
+            )
+        # Verifying parameters consistency
+        if (target_size is None) == (bitrate is None):
+            raise ValueError(
+                "Invalid parameters: exactly one of 'target_size' and "
+                "'bitrate' must be given."
+            )
+        if not os.path.exists(os.path.dirname(os.path.abspath(path))):
+            raise ValueError(
+                f"The specified path '{path}' is invalid or does not exist."
+            )
+        # Running recorded operations, deferring the next ones again
+        if self._plan:
+            self.render()
+            self.defer()
+        metadata = self.metadata()
+        duration = float(metadata["duration"])
+        if bitrate is None:
+            # Keeping 2% of the size for the container overhead
+            bitrate = int(target_size * 8 / duration * 0.98)
+        has_audio = any(
+            stream.get("codec_type") == "audio"
+            for stream in metadata["streams"]
+        )
+        audio_bitrate = min(128000, bitrate // 4) if has_audio else 0
+        video_bitrate = bitrate - audio_bitrate
+        if video_bitrate < 10000:
+            raise ValueError(
+                f"Invalid value: the bitrate left for the video must be at "
+                f"least 10000 bits per second. Got {video_bitrate} for a "
+                f"duration of {duration} seconds."
+            )
+        passlog = os.path.join(self._temp_dir.name, "passlog")
+        # Capping the rate over two seconds windows, so short or uneven
+        # videos do not overshoot the average bitrate
+        encoding = {
+            "vcodec": "libx264",
+            "video_bitrate": video_bitrate,
+            "maxrate": video_bitrate,
+            "bufsize": 2 * video_bitrate,
+            "preset": preset,
+            "passlogfile": passlog
+        }
+        input = ffmpeg.input(
+            filename=self._main_temp_file
+        )
+        # First pass, analysing the video without muxing, with a single
+        # reference frame and the fastest motion and partition searches
+        first_pass = ffmpeg.output(
+            input.video,
+            "-",
+            format="null",
+            fastfirstpass=1,
+            **{"pass": 1},
+            **encoding
+        )
+        self._run(
+            stream_spec=ffmpeg.overwrite_output(first_pass),
+            quiet=True
+        )
+        # Second pass, encoding at the bitrate measured to fit
+        streams = [input.video]
+        if has_audio:
+            streams.append(input["a:0"])
+            encoding.update(acodec="aac", audio_bitrate=audio_bitrate)
+        second_pass = ffmpeg.output(
+            *streams,
+            path,
+            **{"pass": 2},
+            **encoding
+        )
+        try:
+            self._run(
+                stream_spec=ffmpeg.overwrite_output(second_pass),
+                quiet=True
+            )
+        finally:
+            # Removing pass statistics from the scratch space
+            for name in os.listdir(self._temp_dir.name):
+                if name.startswith("passlog"):
+                    os.remove(os.path.join(self._temp_dir.name, name))
+
+    def proxy(
+        self,
+        height: int = 360
+    ):
+        """
+        Starts previewing operations on a low resolution proxy.
+
+        The proxy is encoded once for fast decoding. Operations are then
+        recorded as with `defer` and run right away on the proxy, with
+        pixel coordinates and sizes scaled to it, so `preview` shows their
+        result. `render` or `save` run the recorded operations on the full
+        resolution video and end proxy mode.
+
+        Parameters
+        ----------
+        height: int, optional
+            Height of the proxy in pixels, rounded down to an even value,
+            the width keeps the aspect ratio. Default is 360.
+
+        Raises
+        ------
+        TypeError
+            If height is not an int.
+        ValueError
+            If height is not positive or exceeds the video height.
+        """
+        # Verifying parameters types
+        if not isinstance(height, int):
+            raise TypeError(
+                f"Expected 'height' to be of type 'int', but got "
+                f"'{type(height).__name__}' instead."
+            )
+        # Verifying parameters values
+        video_height, video_width = self._frame_size()
+        if not 0 < height <= video_height:
+            raise ValueError(
+                f"Invalid value: 'height' must be positive and less than or "
+                f"equal to the video height. Got height={height}, but video "
+                f"height is {video_height}."
+            )
+        if self._proxy is not None:
+            self._proxy.close()
+        # Encoding the proxy from a copy of the video before the plan
+        proxy = _Media.fork(self)
+        proxy._plan = None
+        proxy._proxy = None
+        proxy.set_priority("interactive")
+        # Encoded sizes are kept even
+        height = max(2, height // 2 * 2)
+        width = max(2, round(video_width * height / video_height / 2) * 2)
+        input = ffmpeg.input(
+            filename=proxy._main_temp_file
+        )
+        video = ffmpeg.filter(
+            input.video,
+            "scale",
+            width,
+            height
+        )
+        output = ffmpeg.output(
+            video,
+            input["a?"],
+            input["s?"],
+            proxy._second_temp_file,
+            vcodec="libx264",
+            preset="ultrafast",
+            tune="fastdecode",
+            acodec="copy",
+            scodec="copy"
+        )
+        proxy._run(
+            stream_spec=ffmpeg.overwrite_output(output),
+            quiet=True
+        )
+        proxy._move_and_replace()
+        self._proxy = proxy
+        self._proxy_scale = (height / video_height, width / video_width)
+        # Previewing operations recorded before
+        self.defer()
+        for operation in self._plan:
+            self._preview(operation["op"], operation["params"])
+
+    def _preview(
+        self,
+        op: str,
+        params: dict
+    ):
+        """
+        Runs an operation on the proxy, with pixel parameters scaled.
+
+        Parameters
+        ----------
+        op: str
+            Name of the operation method.
+        params: dict
+            Parameters of the operation method, for the full resolution.
+        """
+        scale_y, scale_x = self._proxy_scale
+        scaled_params = dict(params)
+        for name in self._pixel_params.get(op, []):
+            value = params.get(name)
+            if value is None:
+                continue
+            if name in ["y", "height", "start_y", "end_y"]:
+                scale = scale_y
+            else:
+                scale = scale_x
+            scaled_params[name] = max(1, round(value * scale))
+        # Overlaid images are scaled with the frames
+        if op == "overlay":
+            scaled_params["scale"] = params["scale"] * scale_x
+        # Encoded sizes must be even
+        if op in ["resize", "crop"]:
+            for name in ["height", "width"]:
+                scaled_params[name] = max(2, scaled_params[name] // 2 * 2)
+        getattr(self._proxy, op)(**scaled_params)
+
+    def _record(
+        self,
+        op: str,
+        **params
+    ):
+        """
+        Records an operation if operations are deferred, and previews it on
+        the proxy in proxy mode.
+
+        Parameters
+        ----------
+        op: str
+            Name of the operation method.
+        **params
+            Parameters of the operation method.
+
+        Returns
+        -------
+        recorded: bool
+            True if the operation was recorded and must not run now.
+        """
+        recorded = super()._record(op, **params)
+        if recorded and self._proxy is not None:
+            self._preview(op, params)
+        return recorded
+
+    def preview(
+        self,
+        path: str
+    ):
+        """
+        Saves the proxy, with the recorded operations applied.
+
+        Parameters
+        ----------
+        path: str
+            The destination file path where the proxy will be saved.
+
+        Raises
+        ------
+        ValueError
+            If proxy mode is not enabled.
+        """
+        if self._proxy is None:
+            raise ValueError(
+                "Proxy mode is not enabled, enable it with 'proxy'."
+            )
+        self._proxy.save(path)
+
+    def render(
+        self
+    ):
+        """
+        Runs the optimized plan of the recorded operations.
+
+        Consecutive filters are rendered in a single encode, starting with
+        a clip of the input when the plan starts with one, and streams left
+        untouched are copied. Operations are not deferred anymore afterwards
+        and proxy mode ends.
+
+        Raises
+        ------
+        ValueError
+            If merged operations are not valid anymore.
+        """
+        super().render()
+        if self._proxy is not None:
+            self._proxy.close()
+            self._proxy = None
+
+    def fork(
+        self
+    ):
+        """
+        Creates an independent copy of the video, in its current state.
+
+        The main file is shared through a hardlink when the filesystem
+        allows it, and cached results like metadata are copied, so forking
+        neither copies nor probes the video. Recorded operations and the
+        proxy are copied too.
+
+        Returns
+        -------
+        forked: Video
+            The copy of the video.
+        """
+        forked = super().fork()
+        if self._proxy is not None:
+            forked._proxy = self._proxy.fork()
+        return forked
+
+    @classmethod
+    def from_images(
+        cls,
+        pattern: str,
+        fps: Union[int, float],
+        extension: str = ".mp4"
+    ):
+        """
+        Creates a video from a sequence of images.
+
+        Parameters
+        ----------
+        pattern: str
+            Path of the images, either with a printf-style frame number
+            (e.g. "frames/%04d.png") or a glob pattern (e.g.
+            "frames/*.png"), sorted by name.
+        fps: int or float
+            Number of images per second of video.
+        extension: str, optional
+            Extension of the video container. Default is ".mp4".
+
+        Returns
+        -------
+        video: Video
+            The video made of the images, encoded in H.264.
+
+        Raises
+        ------
+        TypeError
+            If `pattern` or `extension` are not str.
+            If `fps` is not an int or float.
+        ValueError
+            If `fps` is not positive.
+        """
+        # Verifying parameters types
+        if not isinstance(pattern, str):
+            raise TypeError(
+                f"Expected 'pattern' to be of type 'str', but got "
+                f"'{type(pattern).__name__}' instead."
+            )
+        if not isinstance(fps, (int, float)):
+            raise TypeError(
+                f"Expected 'fps' to be of type 'int' or 'float', but got "
+                f"'{type(fps).__name__}' instead."
+            )
+        if not isinstance(extension, str):
+            raise TypeError(
+                f"Expected 'extension' to be of type 'str', but got "
+                f"'{type(extension).__name__}' instead."
+            )
+        # Verifying parameters values
+        if fps <= 0:
+            raise ValueError(
+                f"Invalid value: 'fps' must be positive. Got fps={fps}."
+            )
+        input_kwargs = {}
+        if any(character in pattern for character in "*?["):
+            input_kwargs["pattern_type"] = "glob"
+        input = ffmpeg.input(
+            filename=pattern,
+            framerate=fps,
+            **input_kwargs
+        )
+        # H.264 in 4:2:0 requires even dimensions
+        stream = ffmpeg.filter(
+            input.video,
+            "scale",
+            "trunc(iw/2)*2",
+            "trunc(ih/2)*2"
+        )
+        with TemporaryDirectory(
+            dir=os.getcwd(),
+            prefix="fastedit-temp-dir"
+        ) as temp_dir:
+            path = os.path.join(temp_dir, "images" + extension)
+            output = ffmpeg.output(
+                stream,
+                path,
+                vcodec="libx264",
+                pix_fmt="yuv420p"
+            )
+            get_scheduler().run(
+                ffmpeg.overwrite_output(output),
+                quiet=True
+            )
+            video = cls(path)
+        return video
+
+    def to_images(
+        self,
+        pattern: str,
+        fps: Union[int, float] = None
+    ):
+        """
+        Saves the frames of the video as a sequence of images.
+
+        Parameters
+        ----------
+        pattern: str
+            Path of the images, with a printf-style frame number starting at
+            1 (e.g. "frames/%04d.png"). The format is guessed from the
+            extension.
+        fps: int or float, optional
+            Number of images per second of video. Default is every frame.
+
+        Raises
+        ------
+        TypeError
+            If `pattern` is not a str.
+            If `fps` is not an int or float.
+        ValueError
+            If the directory of `pattern` does not exist.
+            If `fps` is not positive.
+        """
+        # Verifying parameters types
+        if not isinstance(pattern, str):
+            raise TypeError(
+                f"Expected 'pattern' to be of type 'str', but got "
+                f"'{type(pattern).__name__}' instead."
+            )
+        if fps is not None and not isinstance(fps, (int, float)):
+            raise TypeError(
+                f"Expected 'fps' to be of type 'int' or 'float', but got "
+                f"'{type(fps).__name__}' instead."
+            )
+        # Verifying parameters values
+        if fps is not None and fps <= 0:
+            raise ValueError(
+                f"Invalid value: 'fps' must be positive. Got fps={fps}."
+            )
+        if not os.path.exists(os.path.dirname(os.path.abspath(pattern))):
+            raise ValueError(
+                f"The specified path '{pattern}' is invalid or does not "
+                f"exist."
+            )
+        # Running recorded operations, deferring the next ones again
+        if self._plan:
+            self.render()
+            self.defer()
+        input = ffmpeg.input(
+            filename=self._main_temp_file
+        )
+        stream = input.video
+        if fps is not None:
+            stream = ffmpeg.filter(
+                stream,
+                "fps",
+                fps
+            )
+        output = ffmpeg.output(
+            stream,
+            pattern
+        )
+        self._run(
+            stream_spec=ffmpeg.overwrite_output(output),
+            quiet=True
+        )
+
+    def _animation_stream(
+        self,
+        path: str,
+        start: Union[int, float],
+        end: Union[int, float],
+        fps: Union[int, float],
+        width: int
+    ):
+        """
+        Verifies the parameters of an animation export and builds its
+        resampled and resized video stream.
+
+        Parameters
+        ----------
+        path: str
+            The destination file path of the animation.
+        start: int or float
+            Start time (in seconds) of the animation, or None.
+        end: int or float
+            End time (in seconds) of the animation, or None.
+        fps: int or float
+            Frames per second of the animation.
+        width: int
+            Width of the animation in pixels, or None.
+
+        Returns
+        -------
+        stream: ffmpeg.Stream
+            The video stream of the animation, only the range between start
+            and end is decoded.
+
+        Raises
+        ------
+        TypeError
+            If `path` is not a str.
+            If `start`, `end` or `fps` are not int or float.
+            If `width` is not an int.
+        ValueError
+            If the specified `path` is invalid or does not exist.
+            If `end` is not strictly greater than `start`.
+            If `end` is strictly greater than media duration.
+            If `fps` or `width` are not positive.
+        """
+        # Verifying parameters types
+        if not isinstance(path, str):
+            raise TypeError(
+                f"Expected 'path' to be of type 'str', but got "
+                f"'{type(path).__name__}' instead."
+            )
+        if start is not None and not isinstance(start, (int, float)):
+            raise TypeError(
+                f"Expected 'start' to be of type 'int' or 'float', but got "
+                f"'{type(start).__name__}' instead."
+            )
+        if end is not None and not isinstance(end, (int, float)):
+            raise TypeError(
+                f"Expected 'end' to be of type 'int' or 'float', but got "
+                f"'{type(end).__name__}' instead."
+            )
+        if not isinstance(fps, (int, float)):
+            raise TypeError(
+                f"Expected 'fps' to be of type 'int' or 'float', but got "
+                f"'{type(fps).__name__}' instead."
+            )
+        if width is not None and not isinstance(width, int):
+            raise TypeError(
+                f"Expected 'width' to be of type 'int', but got "
+                f"'{type(width).__name__}' instead."
+            )
+        # Verifying parameters values
+        if fps <= 0:
+            raise ValueError(
+                f"Invalid value: 'fps' must be positive. Got fps={fps}."
+            )
+        if width is not None and width <= 0:
+            raise ValueError(
+                f"Invalid value: 'width' must be a positive integer. "
+                f"Got width={width}."
+            )
+        if not os.path.exists(os.path.dirname(os.path.abspath(path))):
+            raise ValueError(
+                f"The specified path '{path}' is invalid or does not exist."
+            )
+        # Running recorded operations, deferring the next ones again
+        if self._plan:
+            self.render()
+            self.defer()
+        # Verifying parameters consistency
+        media_duration = float(self.metadata()["duration"])
+        if start is None:
+            start = 0
+        if end is None:
+            end = media_duration
+        if not end > start:
+            raise ValueError(
+                f"Invalid 'end' value: 'end' must be strictly greater than "
+                f"'start'. Got start={start} and end={end}."
+            )
+        if not end <= media_duration:
+            raise ValueError(
+                f"Invalid 'end' value: 'end' must be less than or equal to "
+                f"the media duration. Got end={end}, but media duration is "
+                f"{media_duration}."
+            )
+        # Decoding only the exported range
+        input = ffmpeg.input(
+            filename=self._main_temp_file,
+            ss=start,
+            to=end
+        )
+        stream = ffmpeg.filter(
+            input.video,
+            "fps",
+            fps
+        )
+        if width is not None:
+            stream = ffmpeg.filter(
+                stream,
+                "scale",
+                width,
+                -1,
+                flags="lanczos"
+            )
+        return stream
+
+    def to_gif(
+        self,
+        path: str,
+        start: Union[int, float] = None,
+        end: Union[int, float] = None,
+        fps: Union[int, float] = 10,
+        width: int = 480,
+        dither: str = "sierra2_4a"
+    ):
+        """
+        Saves a range of the video as an animated GIF.
+
+        The palette is generated from the exported frames and applied in a
+        single FFmpeg run, so the video is decoded only once.
+
+        Parameters
+        ----------
+        path: str
+            The destination file path where the GIF will be saved.
+        start: int or float, optional
+            Start time (in seconds) of the GIF. Default is the start of the
+            video.
+        end: int or float, optional
+            End time (in seconds) of the GIF. Default is the end of the
+            video.
+        fps: int or float, optional
+            Frames per second of the GIF. Default is 10.
+        width: int, optional
+            Width of the GIF in pixels, the height keeps the aspect ratio.
+            None keeps the video width. Default is 480.
+        dither: str, optional
+            Dithering algorithm of the palette. Must be one of the
+            following: "none", "bayer", "floyd_steinberg", "sierra2",
+            "sierra2_4a". Default is "sierra2_4a".
+
+        Raises
+        ------
+        TypeError
+            If `path` or `dither` are not str.
+            If `start`, `end` or `fps` are not int or float.
+            If `width` is not an int.
+        ValueError
+            If the specified `path` is invalid or does not exist.
+            If `end` is not strictly greater than `start`.
+            If `end` is strictly greater than media duration.
+            If `fps` or `width` are not positive.
+            If `dither` is not one of the valid options.
+        """
+        # Verifying parameters types
+        if not isinstance(dither, str):
+            raise TypeError(
+                f"Expected 'dither' to be of type 'str', but got "
+                f"'{type(dither).__name__}' instead."
+            )
+        # Verifying parameters consistency
+        valid_dithers = [
+            "none",
+            "bayer",
+            "floyd_steinberg",
+            "sierra2",
+            "sierra2_4a"
+        ]
+        if dither not in valid_dithers:
+            raise ValueError(
+                f"Invalid dither '{dither}'. Expected one of: "
+                f"{', '.join(valid_dithers)}."
+            )
+        stream = self._animation_stream(path, start, end, fps, width)
+        # Generating the palette and using it on the same frames
+        split = stream.filter_multi_output("split")
+        palette = ffmpeg.filter(
+            split[0],
+            "palettegen",
+            stats_mode="diff"
+        )
+        stream = ffmpeg.filter(
+            [split[1], palette],
+            "paletteuse",
+            dither=dither
+        )
+        output = ffmpeg.output(
+            stream,
+            path,
+            loop=0
+        )
+        self._run(
+            stream_spec=ffmpeg.overwrite_output(output),
+            quiet=True
+        )
+
+    def to_webp(
+        self,
+        path: str,
+        start: Union[int, float] = None,
+        end: Union[int, float] = None,
+        fps: Union[int, float] = 10,
+        width: int = 480,
+        quality: int = 75,
+        lossless: bool = False
+    ):
+        """
+        Saves a range of the video as an animated WebP.
+
+        Parameters
+        ----------
+        path: str
+            The destination file path where the WebP will be saved.
+        start: int or float, optional
+            Start time (in seconds) of the WebP. Default is the start of the
+            video.
+        end: int or float, optional
+            End time (in seconds) of the WebP. Default is the end of the
+            video.
+        fps: int or float, optional
+            Frames per second of the WebP. Default is 10.
+        width: int, optional
+            Width of the WebP in pixels, the height keeps the aspect ratio.
+            None keeps the video width. Default is 480.
+        quality: int, optional
+            Quality from 0 to 100. Default is 75.
+        lossless: bool, optional
+            Whether frames are compressed losslessly. Default is False.
+
+        Raises
+        ------
+        TypeError
+            If `path` is not a str.
+            If `start`, `end` or `fps` are not int or float.
+            If `width` or `quality` are not int.
+            If `lossless` is not a bool.
+        ValueError
+            If the specified `path` is invalid or does not exist.
+            If `end` is not strictly greater than `start`.
+            If `end` is strictly greater than media duration.
+            If `fps` or `width` are not positive.
+            If `quality` is not between 0 and 100.
+        """
+        # Verifying parameters types
+        if not isinstance(quality, int):
+            raise TypeError(
+                f"Expected 'quality' to be of type 'int', but got "
+                f"'{type(quality).__name__}' instead."
+            )
+        if not isinstance(lossless, bool):
+            raise TypeError(
+                f"Expected 'lossless' to be of type 'bool', but got "
+                f"'{type(lossless).__name__}' instead."
+            )
+        # Verifying parameters values
+        if not 0 <= quality <= 100:
+            raise ValueError(
+                f"Invalid value: 'quality' must be between 0 and 100. "
+                f"Got quality={quality}."
+            )
+        stream = self._animation_stream(path, start, end, fps, width)
+        output = ffmpeg.output(
+            stream,
+            path,
+            vcodec="libwebp",
+            quality=quality,
+            lossless=int(lossless),
+            loop=0
+        )
+        self._run(
+            stream_spec=ffmpeg.overwrite_output(output),
+            quiet=True
+        )
+
+    def to_apng(
+        self,
+        path: str,
+        start: Union[int, float] = None,
+        end: Union[int, float] = None,
+        fps: Union[int, float] = 10,
+        width: int = 480
+    ):
+        """
+        Saves a range of the video as an animated PNG.
+
+        Parameters
+        ----------
+        path: str
+            The destination file path where the APNG will be saved.
+        start: int or float, optional
+            Start time (in seconds) of the APNG. Default is the start of the
+            video.
+        end: int or float, optional
+            End time (in seconds) of the APNG. Default is the end of the
+            video.
+        fps: int or float, optional
+            Frames per second of the APNG. Default is 10.
+        width: int, optional
+            Width of the APNG in pixels, the height keeps the aspect ratio.
+            None keeps the video width. Default is 480.
+
+        Raises
+        ------
+        TypeError
+            If `path` is not a str.
+            If `start`, `end` or `fps` are not int or float.
+            If `width` is not an int.
+        ValueError
+            If the specified `path` is invalid or does not exist.
+            If `end` is not strictly greater than `start`.
+            If `end` is strictly greater than media duration.
+            If `fps` or `width` are not positive.
+        """
+        stream = self._animation_stream(path, start, end, fps, width)
+        output = ffmpeg.output(
+            stream,
+            path,
+            vcodec="apng",
+            format="apng",
+            plays=0
+        )
+        self._run(
+            stream_spec=ffmpeg.overwrite_output(output),
+            quiet=True
+        )
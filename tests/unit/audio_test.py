@@ -1,4 +1,10 @@
 from fastedit.io.Audio import Audio
+from fastedit.io.Video import Video
+from fastedit.core.CompiledPlan import CompiledPlan
+from fastedit.core import Media
+from collections import OrderedDict
+from array import array
+import subprocess
 import ffmpeg
 import pytest
 import os
@@ -187,6 +193,115 @@ def test_audio_loop_float():
     assert output["streams"][0]["codec_name"] == "mp3"
 
 
+def test_audio_loop_duration_not_positive():
+    audio = Audio(test_files[0])
+    with pytest.raises(ValueError) as error:
+        audio.loop(
+            duration=0
+        )
+    expected_error = (
+        "Invalid value: 'duration' must be positive. Got duration=0."
+    )
+    assert str(error.value) == expected_error
+
+
+def test_audio_loop_many_repeats():
+    audio = Audio(test_files[0])
+    audio.clip(
+        start=0,
+        end=0.5
+    )
+    audio.loop(
+        duration=500.25
+    )
+    output = audio.metadata()
+    assert abs(float(output["duration"]) - 500.25) < 0.1
+    assert output["streams"][0]["codec_name"] == "mp3"
+
+
+def test_audio_loop_to_media_not_media():
+    audio = Audio(test_files[0])
+    with pytest.raises(TypeError) as error:
+        audio.loop_to(
+            media=35
+        )
+    expected_error = (
+        "Expected 'media' to be of type '_Media', but got "
+        "'int' instead."
+    )
+    assert str(error.value) == expected_error
+
+
+def test_audio_loop_to_video():
+    audio = Audio(test_files[0])
+    video = Video(test_files[1])
+    video.loop(
+        duration=40
+    )
+    audio.loop_to(
+        media=video
+    )
+    output = audio.metadata()
+    assert abs(
+        float(output["duration"]) - float(video.metadata()["duration"])
+    ) < 0.1
+
+
+def test_audio_detect_silence_duration_not_number():
+    audio = Audio(test_files[0])
+    with pytest.raises(TypeError) as error:
+        audio.detect_silence(
+            duration="1"
+        )
+    expected_error = (
+        "Expected 'duration' to be of type 'int' or 'float', but got "
+        "'str' instead."
+    )
+    assert str(error.value) == expected_error
+
+
+def test_audio_trim_silence():
+    audio = Audio(test_files[0])
+    silence = audio.detect_silence(
+        noise=-40,
+        duration=0.3
+    )
+    assert len(silence) == 1
+    assert silence[0][0] == 0
+    audio.trim_silence(
+        noise=-40,
+        duration=0.3
+    )
+    output = audio.metadata()
+    assert float(output["duration"]) < 27.252 - 0.2
+    assert output["streams"][0]["codec_name"] == "mp3"
+
+
+def test_audio_trim_silence_after_first_timestamp(tmp_path):
+    # 1s of silence then 2s of sound, starting after 0
+    path = str(tmp_path / "late_start.ogg")
+    audio = ffmpeg.concat(
+        ffmpeg.input("anullsrc=d=1", f="lavfi"),
+        ffmpeg.input("sine=d=2", f="lavfi"),
+        v=0,
+        a=1
+    )
+    ffmpeg.output(
+        audio,
+        path,
+        output_ts_offset=0.05
+    ).run(quiet=True)
+    audio = Audio(path)
+    silence = audio.detect_silence(
+        duration=0.3
+    )
+    assert 0 < silence[0][0] < float(audio.metadata()["start_time"])
+    audio.trim_silence(
+        duration=0.3
+    )
+    assert abs(float(audio.metadata()["duration"]) - 2) < 0.05
+
+
 def test_audio_loop_without_ffmpeg(monkeypatch):
     # Mocking FFmpeg not installed
     def mock_ffmpeg(*args, **kwargs):
@@ -245,3 +360,426 @@ def test_audio_save_wrong_path_type():
         "'int' instead."
     )
     assert str(error.value) == expected_error
+
+
+def test_audio_peaks_wrong_resolution_type():
+    audio = Audio(test_files[0])
+    with pytest.raises(TypeError) as error:
+        audio.peaks(
+            resolution=10.5
+        )
+    expected_error = (
+        "Expected 'resolution' to be of type 'int', but got "
+        "'float' instead."
+    )
+    assert str(error.value) == expected_error
+
+
+def test_audio_peaks_negative_resolution():
+    audio = Audio(test_files[0])
+    with pytest.raises(ValueError) as error:
+        audio.peaks(
+            resolution=-1
+        )
+    expected_error = (
+        "Invalid value: 'resolution' must be a positive integer. "
+        "Got resolution=-1."
+    )
+    assert str(error.value) == expected_error
+
+
+def test_audio_peaks():
+    audio = Audio(test_files[0])
+    minimums, maximums = audio.peaks(
+        resolution=1024
+    )
+    assert len(minimums) == len(maximums)
+    assert len(minimums) == 850
+    assert (minimums <= maximums).all()
+
+
+def test_audio_peaks_coarser_level_without_decoding(monkeypatch):
+    audio = Audio(test_files[0])
+    minimums, maximums = audio.peaks(
+        resolution=1024
+    )
+
+    # Mocking FFmpeg not installed
+    def mock_ffmpeg(*args, **kwargs):
+        raise ffmpeg.Error(
+            "ffmpeg",
+            "stdout",
+            "stderr"
+        )
+
+    # Replace subprocess.Popen by mocking
+    monkeypatch.setattr(subprocess, "Popen", mock_ffmpeg)
+
+    # Testing
+    coarse_minimums, coarse_maximums = audio.peaks(
+        resolution=3072
+    )
+    assert len(coarse_minimums) == 284
+    assert coarse_minimums[0] == minimums[:3].min()
+    assert coarse_maximums[0] == maximums[:3].max()
+
+
+def test_audio_peaks_verbose_ffmpeg(monkeypatch):
+    expected_minimums, expected_maximums = Audio(test_files[0]).peaks(
+        resolution=1024
+    )
+    audio = Audio(test_files[0])
+    popen = subprocess.Popen
+
+    # Writing more errors than a pipe can hold before decoding
+    def mock_popen(args, **kwargs):
+        script = 'head -c 1048576 /dev/zero >&2; exec "$@"'
+        return popen(["sh", "-c", script, "sh", *args], **kwargs)
+
+    monkeypatch.setattr(subprocess, "Popen", mock_popen)
+    minimums, maximums = audio.peaks(
+        resolution=1024
+    )
+    assert (minimums == expected_minimums).all()
+    assert (maximums == expected_maximums).all()
+
+
+def test_audio_normalize_loudness_wrong_target_type():
+    audio = Audio(test_files[0])
+    with pytest.raises(TypeError) as error:
+        audio.normalize_loudness(
+            target_lufs="-23"
+        )
+    expected_error = (
+        "Expected 'target_lufs' to be of type 'int' or 'float', but "
+        "got 'str' instead."
+    )
+    assert str(error.value) == expected_error
+
+
+def test_audio_normalize_loudness_target_out_of_range():
+    audio = Audio(test_files[0])
+    with pytest.raises(ValueError) as error:
+        audio.normalize_loudness(
+            target_lufs=0
+        )
+    expected_error = (
+        "Invalid value: 'target_lufs' must be between -70 and -5. "
+        "Got target_lufs=0."
+    )
+    assert str(error.value) == expected_error
+
+
+def test_audio_normalize_loudness():
+    audio = Audio(test_files[0])
+    audio.normalize_loudness(
+        target_lufs=-23,
+        true_peak=-1
+    )
+    output = audio.metadata()
+    assert output["format_name"] == "mp3"
+    assert int(float(output["duration"])) == 27
+    assert output["streams"][0]["sample_rate"] == "32000"
+    measurement = audio._measure_loudness()
+    assert abs(measurement["input_i"] + 23) < 1
+
+
+def test_audio_normalize_loudness_cached_measurement(monkeypatch):
+    Audio(test_files[0])._measure_loudness()
+
+    # Mocking FFmpeg not installed
+    def mock_ffmpeg(*args, **kwargs):
+        raise ffmpeg.Error(
+            "ffmpeg",
+            "stdout",
+            "stderr"
+        )
+
+    # Replace ffmpeg.run by mocking
+    monkeypatch.setattr(ffmpeg, "run", mock_ffmpeg)
+
+    # Testing
+    audio = Audio(test_files[0])
+    measurement = audio._measure_loudness()
+    assert set(measurement) == {
+        "input_i",
+        "input_tp",
+        "input_lra",
+        "input_thresh"
+    }
+    with pytest.raises(ffmpeg.Error):
+        audio.normalize_loudness()
+
+
+def test_audio_loudness_measurements_bounded(monkeypatch):
+    monkeypatch.setattr(Media, "_loudness_measurements", OrderedDict())
+    monkeypatch.setattr(Media, "_max_loudness_measurements", 1)
+    audio = Audio(test_files[0])
+    audio._measure_loudness()
+    audio.gain(-6)
+    audio._measure_loudness()
+    assert list(Media._loudness_measurements) == [(audio._digest(), 0)]
+
+
+def test_audio_keyframes():
+    audio = Audio(test_files[0])
+    keyframes = audio.keyframes()
+    assert keyframes[0] == 0
+    assert len(keyframes) == len(audio._packet_index()["pts"])
+
+
+def test_audio_set_history_negative():
+    audio = Audio(test_files[0])
+    with pytest.raises(ValueError) as error:
+        audio.set_history(
+            retention=-1
+        )
+    expected_error = (
+        "Invalid value: 'retention' must be a non-negative integer. "
+        "Got retention=-1."
+    )
+    assert str(error.value) == expected_error
+
+
+def test_audio_undo_without_history():
+    audio = Audio(test_files[0])
+    audio.clip(
+        start=0,
+        end=10
+    )
+    with pytest.raises(ValueError) as error:
+        audio.undo()
+    expected_error = (
+        "Nothing to undo: no previous version is kept, enable history "
+        "with 'set_history'."
+    )
+    assert str(error.value) == expected_error
+
+
+def test_audio_undo():
+    audio = Audio(test_files[0])
+    duration = audio.metadata()["duration"]
+    audio.set_history(
+        retention=2
+    )
+    audio.clip(
+        start=0,
+        end=10
+    )
+    audio.clip(
+        start=0,
+        end=5
+    )
+    assert int(float(audio.metadata()["duration"])) == 5
+    audio.undo()
+    assert int(float(audio.metadata()["duration"])) == 10
+    audio.undo()
+    assert audio.metadata()["duration"] == duration
+    with pytest.raises(ValueError):
+        audio.undo()
+
+
+def test_audio_history_retention():
+    audio = Audio(test_files[0])
+    audio.set_history(
+        retention=1
+    )
+    for end in [10, 5, 2]:
+        audio.clip(
+            start=0,
+            end=end
+        )
+    audio.undo()
+    assert int(float(audio.metadata()["duration"])) == 5
+    with pytest.raises(ValueError):
+        audio.undo()
+    # Versions over the disk cap are dropped
+    audio.set_history(
+        retention=1,
+        max_bytes=1
+    )
+    audio.clip(
+        start=0,
+        end=2
+    )
+    with pytest.raises(ValueError):
+        audio.undo()
+
+
+def test_audio_restore_invalid_tag():
+    audio = Audio(test_files[0])
+    audio.checkpoint("base")
+    with pytest.raises(ValueError) as error:
+        audio.restore("other")
+    expected_error = "Invalid tag 'other'. Expected one of: base."
+    assert str(error.value) == expected_error
+
+
+def test_audio_checkpoint_and_restore():
+    audio = Audio(test_files[0])
+    audio.set_history(
+        retention=1
+    )
+    audio.clip(
+        start=0,
+        end=10
+    )
+    audio.checkpoint("ten")
+    audio.clip(
+        start=0,
+        end=3
+    )
+    audio.restore("ten")
+    assert int(float(audio.metadata()["duration"])) == 10
+    # Restoring can be undone
+    audio.undo()
+    assert int(float(audio.metadata()["duration"])) == 3
+
+
+def test_audio_fade_without_duration():
+    audio = Audio(test_files[0])
+    with pytest.raises(ValueError) as error:
+        audio.fade_audio()
+    expected_error = (
+        "Invalid value: 'fade_in' or 'fade_out' must be positive. "
+        "Got fade_in=0 and fade_out=0."
+    )
+    assert str(error.value) == expected_error
+
+
+def test_audio_gain_wrong_type():
+    audio = Audio(test_files[0])
+    with pytest.raises(TypeError) as error:
+        audio.gain("6dB")
+    expected_error = (
+        "Expected 'gain' to be of type 'int' or 'float', but got "
+        "'str' instead."
+    )
+    assert str(error.value) == expected_error
+
+
+def test_audio_remap_invalid_channel():
+    audio = Audio(test_files[0])
+    with pytest.raises(ValueError) as error:
+        audio.remap_channels([0, 2])
+    expected_error = (
+        "Invalid value: channel indexes must be between 0 and 1. "
+        "Got channel=2."
+    )
+    assert str(error.value) == expected_error
+
+
+def test_audio_gain():
+    audio = Audio(test_files[0])
+    audio.clip(
+        start=0,
+        end=10
+    )
+    loudness = audio._measure_loudness()["input_i"]
+    audio.gain(-6)
+    assert audio._measure_loudness()["input_i"] == pytest.approx(
+        loudness - 6,
+        abs=0.5
+    )
+
+
+def test_audio_resample_remap_and_fade():
+    audio = Audio(test_files[0])
+    audio.defer()
+    audio.clip(
+        start=0,
+        end=10
+    )
+    audio.fade_audio(
+        fade_in=1,
+        fade_out=2
+    )
+    audio.resample(22050)
+    audio.remap_channels([1])
+    audio.render()
+    output = audio.metadata()["streams"][0]
+    assert output["sample_rate"] == "22050"
+    assert output["channels"] == 1
+
+
+def test_audio_trim_negative_start():
+    audio = Audio(test_files[0])
+    with pytest.raises(ValueError) as error:
+        audio.trim(
+            start=-1,
+            end=2
+        )
+    expected_error = (
+        "Invalid 'start' value: 'start' must be greater than or equal to 0. "
+        "Got start=-1."
+    )
+    assert str(error.value) == expected_error
+
+
+def test_audio_trim():
+    audio = Audio(test_files[0])
+    audio.trim(
+        start=1.25,
+        end=3.75
+    )
+    sample_rate = int(audio.metadata()["streams"][0]["sample_rate"])
+    # Counting decoded samples, MP3 duration includes encoder padding
+    samples, _ = (
+        ffmpeg
+        .input(audio._main_temp_file)
+        .output("-", format="s16le", ac=1)
+        .run(capture_stdout=True, quiet=True)
+    )
+    assert len(samples) // 2 == 2.5 * sample_rate
+
+
+def _samples(path, start, end):
+    # Decoded samples of a range, as mono signed 16 bits integers
+    data, _ = (
+        ffmpeg
+        .input(path, ss=start, to=end)
+        .output("-", format="s16le", ac=1)
+        .run(capture_stdout=True, quiet=True)
+    )
+    return array("h", data)
+
+
+def test_audio_deferred_trim_and_fade():
+    audio = Audio(test_files[0])
+    audio.defer()
+    audio.trim(
+        start=0,
+        end=6
+    )
+    audio.fade_audio(
+        fade_out=2
+    )
+    audio.render()
+    before_fade = max(map(abs, _samples(audio._main_temp_file, 3, 4)))
+    end_of_fade = max(map(abs, _samples(audio._main_temp_file, 5.75, 6)))
+    assert end_of_fade < 0.2 * before_fade
+
+
+def test_audio_compiled_trim_and_fade():
+    audio = Audio(test_files[0])
+    audio.defer()
+    audio.trim(
+        start=0,
+        end=6
+    )
+    audio.fade_audio(
+        fade_out=2
+    )
+    compiled_plan = audio.compile()
+    assert len(compiled_plan.steps) == 1
+    filter_graph = compiled_plan.steps[0]["filter_graph"]
+    assert "afade=duration=2:start_time=4:type=out" in filter_graph
+    save_path = "test_fastedit_compiled.mp3"
+    CompiledPlan.from_dict(compiled_plan.to_dict()).run(
+        input=test_files[0],
+        output=save_path
+    )
+    before_fade = max(map(abs, _samples(save_path, 3, 4)))
+    end_of_fade = max(map(abs, _samples(save_path, 5.75, 6)))
+    os.remove(save_path)
+    assert end_of_fade < 0.2 * before_fade
@@ -1,5 +1,6 @@
 from fastedit.core.Base import _Base
 import pytest
+import os
 
 
 test_files = [
@@ -38,3 +39,11 @@ def test_base_path_with_video():
 def test_base_path_with_audio():
     media = _Base(test_files[3])
     assert isinstance(media, _Base)
+
+
+def test_base_fork_shares_main_file():
+    media = _Base(test_files[3])
+    forked = media.fork()
+    assert isinstance(forked, _Base)
+    assert forked._temp_dir.name != media._temp_dir.name
+    assert os.path.samefile(media._main_temp_file, forked._main_temp_file)
@@ -0,0 +1,108 @@
+from fastedit.cli.batch import main, _parse_operation
+from fastedit.core.Scheduler import get_scheduler, set_scheduler
+from fastedit.io.Audio import Audio
+import pytest
+import json
+import os
+
+
+test_files = [
+    "./media/test_audio.mp3"
+]
+
+
+@pytest.fixture(autouse=True)
+def restore_scheduler():
+    previous = get_scheduler()
+    yield
+    set_scheduler(previous)
+
+
+def test_parse_operation():
+    operation = _parse_operation(["clip", "start=0", "end=5.5", "snap=null"])
+    assert operation == {
+        "op": "clip",
+        "params": {"start": 0, "end": 5.5, "snap": None}
+    }
+
+
+def test_parse_operation_invalid_parameter():
+    with pytest.raises(ValueError) as error:
+        _parse_operation(["clip", "start"])
+    expected_error = "Invalid parameter 'start'. Expected KEY=VALUE."
+    assert str(error.value) == expected_error
+
+
+def test_batch_glob_and_skip_up_to_date(tmp_path, capsys):
+    arguments = [
+        "--input", test_files[0],
+        "--op", "clip", "start=0", "end=5",
+        "--output-dir", str(tmp_path),
+        "--jobs", "2"
+    ]
+    assert main(arguments) == 0
+    output_path = str(tmp_path / "test_audio.mp3")
+    output = Audio(output_path).metadata()
+    assert int(float(output["duration"])) == 5
+    assert ": done (" in capsys.readouterr().out
+    # Same operations on an unchanged input are skipped
+    assert main(arguments) == 0
+    assert ": skipped (" in capsys.readouterr().out
+    # Changed operations run again
+    arguments[5] = "end=4"
+    assert main(arguments) == 0
+    assert ": done (" in capsys.readouterr().out
+
+
+def test_batch_manifest_failure(tmp_path, capsys):
+    manifest_path = tmp_path / "manifest.json"
+    manifest_path.write_text(
+        json.dumps(
+            {
+                "version": 1,
+                "plans": [
+                    {
+                        "source": test_files[0],
+                        "output": str(tmp_path / "a.mp3"),
+                        "operations": [
+                            {"op": "clip", "params": {"start": 0, "end": 3}}
+                        ]
+                    },
+                    {
+                        "source": test_files[0],
+                        "output": str(tmp_path / "b.mp3"),
+                        "operations": [{"op": "unknown", "params": {}}]
+                    }
+                ]
+            }
+        )
+    )
+    assert main([str(manifest_path)]) == 1
+    out = capsys.readouterr().out
+    assert "a.mp3: done" in out
+    assert "b.mp3: failed: Invalid operation 'unknown' for Audio." in out
+    assert "1/2 succeeded" in out
+    assert os.path.exists(tmp_path / "a.mp3")
+
+
+def test_batch_duplicate_outputs(tmp_path, capsys):
+    for name in ["a", "b"]:
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "audio.mp3").write_bytes(b"")
+    with pytest.raises(SystemExit):
+        main([
+            "--input", str(tmp_path / "*" / "audio.mp3"),
+            "--output-dir", str(tmp_path / "out")
+        ])
+    assert "would both be written to" in capsys.readouterr().err
+    assert not os.path.exists(tmp_path / "out" / "audio.mp3")
+
+
+def test_batch_output_overwrites_source(tmp_path, capsys):
+    (tmp_path / "audio.mp3").write_bytes(b"")
+    with pytest.raises(SystemExit):
+        main([
+            "--input", str(tmp_path / "audio.mp3"),
+            "--output-dir", str(tmp_path)
+        ])
+    assert "would overwrite its source" in capsys.readouterr().err
@@ -0,0 +1,196 @@
+from fastedit.core.CompiledPlan import CompiledPlan
+from fastedit.io.Video import Video
+from fastedit.io.Audio import Audio
+import ffmpeg
+import pytest
+import json
+import os
+
+
+test_files = [
+    "./media/test_video_with_audio.mp4",
+    "./media/test_audio.mp3"
+]
+
+
+def test_compiled_plan_extension_not_str():
+    with pytest.raises(TypeError) as error:
+        CompiledPlan(4)
+    expected_error = (
+        "Expected 'extension' to be of type 'str', but got "
+        "'int' instead."
+    )
+    assert str(error.value) == expected_error
+
+
+def test_compiled_plan_invalid_version():
+    with pytest.raises(ValueError) as error:
+        CompiledPlan.from_dict(
+            {"version": 0, "extension": ".mp4", "inputs": {}, "steps": []}
+        )
+    expected_error = (
+        "Invalid value: unsupported compiled plan version. "
+        "Got version=0, but expected version=1."
+    )
+    assert str(error.value) == expected_error
+
+
+def test_video_compile_placeholders():
+    video = Video(test_files[0])
+    video.defer()
+    video.clip(
+        start=3,
+        end=8
+    )
+    video.resize(
+        height=720,
+        width=1280
+    )
+    video.remove_audio()
+    compiled_plan = video.compile()
+    steps = compiled_plan.steps
+    assert len(steps) == 2
+    assert "{input}" in steps[0]["argv"]
+    assert "{step0}" in steps[0]["argv"]
+    assert "{step0}" in steps[1]["argv"]
+    assert "{output}" in steps[1]["argv"]
+    assert "scale" in steps[0]["filter_graph"]
+    # Nothing ran and the operations are still recorded
+    assert video.metadata()["streams"][0]["height"] == 1080
+    assert len(video.plan()) == 3
+
+
+def test_video_compile_and_run_later():
+    video = Video(test_files[0])
+    video.defer()
+    video.clip(
+        start=0,
+        end=2
+    )
+    video.resize(
+        height=360,
+        width=640
+    )
+    compiled_plan = CompiledPlan.from_dict(
+        json.loads(json.dumps(video.compile().to_dict()))
+    )
+    save_path = "test_fastedit_compiled.mp4"
+    compiled_plan.run(
+        input=test_files[0],
+        output=save_path
+    )
+    output = Video(save_path).metadata()
+    assert output["streams"][0]["height"] == 360
+    assert round(float(output["duration"])) == 2
+    os.remove(save_path)
+
+
+def test_video_compile_other_inputs():
+    video = Video(test_files[0])
+    audio = Audio(test_files[1])
+    video.defer()
+    video.add_audio(
+        audio=audio,
+        strategy="replace"
+    )
+    compiled_plan = video.compile()
+    assert compiled_plan.inputs == {"input1": audio._main_temp_file}
+    assert "{input1}" in compiled_plan.steps[0]["argv"]
+    commands = compiled_plan.commands(
+        input="in.mp4",
+        output="out.mp4",
+        inputs={"input1": "music.mp3"}
+    )
+    assert "music.mp3" in commands[0]
+    assert "out.mp4" in commands[0]
+
+
+def test_video_compile_chain_with_expected_metadata():
+    video = Video(test_files[0])
+    video.defer()
+    video.clip(
+        start=0,
+        end=2
+    )
+    video.crop(
+        x=960,
+        y=540,
+        height=540,
+        width=960
+    )
+    video.zoom_in(
+        zoom=1,
+        engine="zoompan"
+    )
+    compiled_plan = video.compile()
+    assert len(compiled_plan.steps) == 2
+    # The zoom uses the size and frames expected after the crop and clip
+    assert "s=960x540" in compiled_plan.steps[1]["filter_graph"]
+    assert "z=pzoom+0.016666" in compiled_plan.steps[1]["filter_graph"]
+    save_path = "test_fastedit_compiled.mp4"
+    compiled_plan.run(
+        input=test_files[0],
+        output=save_path
+    )
+    output = Video(save_path).metadata()
+    os.remove(save_path)
+    assert output["streams"][0]["height"] == 540
+    assert round(float(output["duration"])) == 2
+
+
+def test_video_compile_audio_analysis_after_video_filters():
+    video = Video(test_files[0])
+    video.defer()
+    video.text(
+        text="fastedit",
+        x=100,
+        y=100,
+        start=0,
+        end=2
+    )
+    video.normalize_loudness()
+    compiled_plan = video.compile()
+    assert len(compiled_plan.steps) == 2
+    assert "loudnorm" in " ".join(compiled_plan.steps[1]["argv"])
+
+
+def test_video_compile_dependent_operation():
+    audio = Audio(test_files[1])
+    audio.defer()
+    audio.gain(-6)
+    audio.normalize_loudness()
+    with pytest.raises(ValueError) as error:
+        audio.compile()
+    expected_error = (
+        "Invalid plan: an operation depends on the result of a previous "
+        "compiled operation. Render the previous operations before "
+        "compiling this one."
+    )
+    assert str(error.value) == expected_error
+
+
+def test_video_compile_unexpected_metadata():
+    video = Video(test_files[0])
+    audio = Audio(test_files[1])
+    video.defer()
+    video.mix_audio(
+        audios=[audio]
+    )
+    video.zoom_in(
+        zoom=1
+    )
+    with pytest.raises(ValueError) as error:
+        video.compile()
+    assert str(error.value).startswith("Invalid plan: an operation depends")
+
+
+def test_compiled_plan_run_failure():
+    video = Video(test_files[0])
+    video.defer()
+    video.remove_audio()
+    compiled_plan = video.compile()
+    with pytest.raises(ffmpeg.Error):
+        compiled_plan.run(
+            input=test_files[1],
+            output="test_fastedit_compiled.mp4"
+        )
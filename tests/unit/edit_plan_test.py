@@ -0,0 +1,177 @@
+from fastedit.core.EditPlan import EditPlan
+from fastedit.io.Video import Video
+from fastedit.io.Audio import Audio
+from fastedit.core.Base import _Base
+import pytest
+import sys
+import os
+
+
+test_files = [
+    "./media/test_video_with_audio.mp4",
+    "./media/test_audio.mp3",
+    "./media/test_subtitles.srt"
+]
+
+
+def test_edit_plan_operations_not_list():
+    with pytest.raises(TypeError) as error:
+        EditPlan(
+            source=test_files[0],
+            output="test_fastedit.mp4",
+            operations={"op": "resize"}
+        )
+    expected_error = (
+        "Expected 'operations' to be of type 'list', but got "
+        "'dict' instead."
+    )
+    assert str(error.value) == expected_error
+
+
+def test_edit_plan_invalid_version():
+    with pytest.raises(ValueError) as error:
+        EditPlan.loads(
+            b'{"version": 2, "source": "a.mp4", "output": "b.mp4", '
+            b'"operations": []}'
+        )
+    expected_error = (
+        "Invalid value: unsupported edit plan version. "
+        "Got version=2, but expected version=1."
+    )
+    assert str(error.value) == expected_error
+
+
+def test_edit_plan_invalid_format():
+    edit_plan = EditPlan(
+        source=test_files[0],
+        output="test_fastedit.mp4",
+        operations=[]
+    )
+    with pytest.raises(ValueError) as error:
+        edit_plan.dumps(
+            format="yaml"
+        )
+    expected_error = (
+        "Invalid format 'yaml'. Expected one of: json, msgpack."
+    )
+    assert str(error.value) == expected_error
+
+
+def test_edit_plan_invalid_operation():
+    edit_plan = EditPlan(
+        source=test_files[1],
+        output="test_fastedit.mp3",
+        operations=[{"op": "resize", "params": {"height": 1, "width": 1}}]
+    )
+    with pytest.raises(ValueError) as error:
+        edit_plan.run()
+    expected_error = "Invalid operation 'resize' for Audio."
+    assert str(error.value) == expected_error
+
+
+@pytest.mark.parametrize("op", [
+    "fork",
+    "checkpoint",
+    "undo",
+    "restore",
+    "export",
+    "peaks",
+    "set_priority",
+    "__init__"
+])
+def test_edit_plan_not_edit_operation(op):
+    edit_plan = EditPlan(
+        source=test_files[1],
+        output="test_fastedit.mp3",
+        operations=[{"op": op, "params": {}}]
+    )
+    with pytest.raises(ValueError) as error:
+        edit_plan.run()
+    expected_error = f"Invalid operation '{op}' for Audio."
+    assert str(error.value) == expected_error
+
+
+def test_edit_plan_run_closes_media(monkeypatch):
+    closed = []
+    close = _Base.close
+
+    def mock_close(self):
+        closed.append(type(self).__name__)
+        close(self)
+
+    monkeypatch.setattr(_Base, "close", mock_close)
+    save_path = "test_fastedit_plan.mp4"
+    edit_plan = EditPlan(
+        source=test_files[0],
+        output=save_path,
+        operations=[
+            {
+                "op": "add_audio",
+                "params": {
+                    "audio": {"media": test_files[1]},
+                    "strategy": "replace"
+                }
+            }
+        ]
+    )
+    edit_plan.run()
+    os.remove(save_path)
+    assert sorted(closed) == ["Audio", "Video"]
+
+
+def test_edit_plan_json_round_trip_and_run():
+    save_path = "test_fastedit_plan.mp4"
+    edit_plan = EditPlan(
+        source=test_files[0],
+        output=save_path,
+        operations=[
+            {"op": "clip", "params": {"start": 0, "end": 2}},
+            {"op": "resize", "params": {"height": 360, "width": 640}},
+            {
+                "op": "add_subtitles",
+                "params": {"subtitles": {"media": test_files[2]}}
+            }
+        ]
+    )
+    edit_plan = EditPlan.loads(edit_plan.dumps())
+    edit_plan.run()
+    output = Video(save_path).metadata()
+    assert output["streams"][0]["height"] == 360
+    assert output["streams"][-1]["codec_type"] == "subtitle"
+    os.remove(save_path)
+
+
+def test_edit_plan_msgpack_round_trip():
+    pytest.importorskip("msgpack")
+    edit_plan = EditPlan(
+        source=test_files[0],
+        output="test_fastedit.mp4",
+        operations=[{"op": "remove_audio", "params": {}}]
+    )
+    data = edit_plan.dumps(format="msgpack")
+    loaded = EditPlan.loads(data, format="msgpack")
+    assert loaded.to_dict() == edit_plan.to_dict()
+
+
+def test_edit_plan_without_msgpack(monkeypatch):
+    monkeypatch.setitem(sys.modules, "msgpack", None)
+    edit_plan = EditPlan(
+        source=test_files[0],
+        output="test_fastedit.mp4",
+        operations=[]
+    )
+    with pytest.raises(ImportError) as error:
+        edit_plan.dumps(
+            format="msgpack"
+        )
+    expected_error = (
+        "msgpack is required for msgpack edit plans, install it with "
+        "'pip install fastedit[msgpack]'."
+    )
+    assert str(error.value) == expected_error
+
+
+@pytest.mark.parametrize("media_class", [Video, Audio])
+def test_edit_plan_edit_operations_are_methods(media_class):
+    for op in media_class._edit_operations:
+        assert callable(getattr(media_class, op))
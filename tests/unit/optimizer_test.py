@@ -0,0 +1,187 @@
+from fastedit.core.optimizer import _optimize_plan
+from fastedit.io.Video import Video
+from fastedit.io.Audio import Audio
+from fastedit.io.Subtitles import Subtitles
+import pytest
+
+
+test_files = [
+    "./media/test_video_with_audio.mp4",
+    "./media/test_audio.mp3",
+    "./media/test_subtitles.srt"
+]
+
+
+def clip(start, end, snap=None, accurate=False):
+    return {
+        "op": "clip",
+        "params": {
+            "start": start,
+            "end": end,
+            "snap": snap,
+            "accurate": accurate
+        }
+    }
+
+
+def resize(height, width):
+    return {
+        "op": "resize",
+        "params": {"height": height, "width": width}
+    }
+
+
+def crop(x, y, height, width):
+    return {
+        "op": "crop",
+        "params": {"x": x, "y": y, "height": height, "width": width}
+    }
+
+
+def text(start, end):
+    return {
+        "op": "text",
+        "params": {"x": 0, "y": 0, "text": "text", "start": start, "end": end}
+    }
+
+
+def test_optimizer_merges_clips():
+    plan = _optimize_plan([clip(2, 12), clip(1, 6, accurate=True)])
+    assert plan == [clip(3, 8, accurate=True)]
+
+
+def test_optimizer_merged_clip_out_of_range():
+    with pytest.raises(ValueError) as error:
+        _optimize_plan([clip(2, 4), clip(1, 6)])
+    expected_error = (
+        "Invalid 'end' value: 'end' must be less than or equal to "
+        "the media duration. Got end=6, but media duration is 2."
+    )
+    assert str(error.value) == expected_error
+
+
+def test_optimizer_keeps_snapped_clips():
+    plan = [clip(2, 12, snap="scene"), clip(1, 6)]
+    assert _optimize_plan(plan) == plan
+
+
+def test_optimizer_folds_resizes():
+    plan = _optimize_plan([resize(720, 1280), resize(480, 854)])
+    assert plan == [resize(480, 854)]
+
+
+def test_optimizer_drops_noop_resize():
+    plan = _optimize_plan(
+        [resize(1080, 1920), crop(960, 540, 720, 1280), resize(720, 1280)],
+        frame_size=(1080, 1920)
+    )
+    assert plan == [crop(960, 540, 720, 1280)]
+
+
+def test_optimizer_folds_crops():
+    plan = _optimize_plan(
+        [crop(960, 540, 800, 1200), crop(600, 400, 600, 800)]
+    )
+    assert plan == [crop(960, 540, 600, 800)]
+
+
+def test_optimizer_pushes_clip_before_filters():
+    plan = _optimize_plan([resize(720, 1280), text(1, 14), clip(3, 8)])
+    assert plan == [clip(3, 8), resize(720, 1280), text(0, 5)]
+
+
+def test_optimizer_drops_text_outside_clip():
+    plan = _optimize_plan([text(10, 14), clip(3, 8)])
+    assert plan == [clip(3, 8)]
+
+
+def test_optimizer_replaces_removed_audio():
+    add_audio = {
+        "op": "add_audio",
+        "params": {"audio": None, "strategy": "add"}
+    }
+    plan = _optimize_plan([{"op": "remove_audio", "params": {}}, add_audio])
+    assert plan == [
+        {"op": "add_audio", "params": {"audio": None, "strategy": "replace"}}
+    ]
+
+
+def test_optimizer_replaces_removed_audio_tracks():
+    add_audios = {
+        "op": "add_audios",
+        "params": {"audios": [None, None], "strategy": "add"}
+    }
+    plan = _optimize_plan([{"op": "remove_audio", "params": {}}, add_audios])
+    assert plan == [
+        {
+            "op": "add_audios",
+            "params": {"audios": [None, None], "strategy": "replace"}
+        }
+    ]
+
+
+def test_optimizer_keeps_removed_subtitles():
+    add_audios = {
+        "op": "add_audios",
+        "params": {"audios": [None], "strategy": "add"}
+    }
+    plan = [{"op": "remove_audio", "params": {}}, add_audios]
+    assert _optimize_plan(plan, has_subtitles=True) == plan
+    add_subtitles = {
+        "op": "add_subtitles",
+        "params": {"subtitles": None, "language": None}
+    }
+    assert _optimize_plan([add_subtitles] + plan) == [add_subtitles] + plan
+
+
+@pytest.mark.parametrize("operation", ["add_audio", "add_audios"])
+def test_optimizer_removed_audio_same_streams(operation):
+    results = []
+    for deferred in [False, True]:
+        video = Video(test_files[0])
+        video.add_subtitles(
+            subtitles=Subtitles(test_files[2])
+        )
+        if deferred:
+            video.defer()
+        video.remove_audio()
+        if operation == "add_audio":
+            video.add_audio(
+                audio=Audio(test_files[1]),
+                strategy="add"
+            )
+        else:
+            video.add_audios(
+                audios=[Audio(test_files[1])],
+                strategy="add"
+            )
+        if deferred:
+            video.render()
+        results.append([
+            stream["codec_type"] for stream in video.metadata()["streams"]
+        ])
+    assert results[0] == results[1] == ["video", "audio"]
+
+
+def test_optimizer_keeps_zoom_order():
+    zoom_in = {
+        "op": "zoom_in",
+        "params": {"zoom": 2}
+    }
+    plan = [zoom_in, clip(3, 8)]
+    assert _optimize_plan(plan) == plan
+
+
+def test_optimizer_shifts_overlay():
+    overlay = {
+        "op": "overlay",
+        "params": {"image": None, "x": 0, "y": 0, "start": 4, "end": 14}
+    }
+    plan = _optimize_plan([overlay, clip(3, 8)])
+    assert plan == [
+        clip(3, 8),
+        {
+            "op": "overlay",
+            "params": {"image": None, "x": 0, "y": 0, "start": 1, "end": 5}
+        }
+    ]
@@ -0,0 +1,236 @@
+from fastedit.core.Scheduler import Scheduler, get_scheduler, set_scheduler
+from fastedit.core.Scheduler import _limit_argv_threads
+from fastedit.io.Audio import Audio
+import threading
+import ffmpeg
+import pytest
+import time
+
+
+test_files = [
+    "./media/test_audio.mp3"
+]
+
+
+def test_scheduler_max_jobs_not_int():
+    with pytest.raises(TypeError) as error:
+        Scheduler(
+            max_jobs=1.5
+        )
+    expected_error = (
+        "Expected 'max_jobs' to be of type 'int', but got "
+        "'float' instead."
+    )
+    assert str(error.value) == expected_error
+
+
+def test_scheduler_threads_negative():
+    with pytest.raises(ValueError) as error:
+        Scheduler(
+            threads=-1
+        )
+    expected_error = (
+        "Invalid value: 'threads' must be a positive integer. "
+        "Got threads=-1."
+    )
+    assert str(error.value) == expected_error
+
+
+def test_scheduler_invalid_priority():
+    scheduler = Scheduler()
+    with pytest.raises(ValueError) as error:
+        with scheduler.slot(priority="urgent"):
+            pass
+    expected_error = (
+        "Invalid priority 'urgent'. Expected one of: interactive, batch."
+    )
+    assert str(error.value) == expected_error
+
+
+def test_scheduler_slot_thread_budget():
+    scheduler = Scheduler(
+        max_jobs=2,
+        threads=3
+    )
+    with scheduler.slot() as cmd:
+        assert cmd[0] == "ffmpeg"
+        assert cmd[cmd.index("-threads") + 1] == "3"
+    with scheduler.slot(threads=1) as cmd:
+        assert cmd[cmd.index("-threads") + 1] == "1"
+
+
+def test_scheduler_run_caps_encoder_threads(monkeypatch):
+    commands = []
+
+    def mock_ffmpeg(stream_spec, cmd, **kwargs):
+        commands.append(ffmpeg.compile(stream_spec, cmd=cmd))
+        return None, None
+
+    monkeypatch.setattr(ffmpeg, "run", mock_ffmpeg)
+    scheduler = Scheduler(
+        max_jobs=2,
+        threads=3
+    )
+    stream_spec = ffmpeg.output(
+        ffmpeg.input("in.mp4"),
+        ffmpeg.input("in.mp3"),
+        "out.mp4",
+        vcodec="libx264"
+    )
+    scheduler.run(stream_spec)
+    command = commands[0]
+    # Every input has a thread budget
+    for path in ["in.mp4", "in.mp3"]:
+        index = command.index(path)
+        assert command[index - 3:index] == ["-threads", "3", "-i"]
+    # The output has a thread budget
+    output_options = command[command.index("in.mp3"):command.index("out.mp4")]
+    assert output_options[output_options.index("-threads") + 1] == "3"
+
+
+def test_limit_argv_threads():
+    argv = [
+        "ffmpeg", "-i", "in.mp4", "-threads", "1", "-i", "in.mp3",
+        "-c:v", "libx264", "out.mp4", "-y"
+    ]
+    assert _limit_argv_threads(argv, "out.mp4", "2") == [
+        "ffmpeg", "-threads", "2", "-i", "in.mp4", "-threads", "1", "-i",
+        "in.mp3", "-c:v", "libx264", "-threads", "2", "out.mp4", "-y"
+    ]
+
+
+def test_scheduler_slot_interrupted_wait(monkeypatch):
+    scheduler = Scheduler(
+        max_jobs=1
+    )
+    with scheduler.slot():
+        # Mocking an interruption while waiting
+        def interrupted_wait(*args, **kwargs):
+            raise KeyboardInterrupt()
+
+        with monkeypatch.context() as patch:
+            patch.setattr(scheduler._condition, "wait_for", interrupted_wait)
+            with pytest.raises(KeyboardInterrupt):
+                with scheduler.slot():
+                    pass
+    # The interrupted job does not block the next ones
+    acquired = []
+
+    def job():
+        with scheduler.slot():
+            acquired.append(True)
+
+    thread = threading.Thread(target=job)
+    thread.start()
+    thread.join(timeout=1)
+    assert acquired == [True]
+
+
+def test_scheduler_max_jobs():
+    scheduler = Scheduler(
+        max_jobs=2
+    )
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    def job():
+        with scheduler.slot():
+            with lock:
+                running.append(1)
+                peak.append(len(running))
+            time.sleep(0.05)
+            with lock:
+                running.pop()
+
+    threads = [threading.Thread(target=job) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert max(peak) == 2
+
+
+def test_scheduler_priorities_and_fifo():
+    scheduler = Scheduler(
+        max_jobs=1
+    )
+    order = []
+    started = threading.Event()
+    release = threading.Event()
+
+    def blocking_job():
+        with scheduler.slot():
+            started.set()
+            release.wait()
+
+    def job(name, priority):
+        with scheduler.slot(priority=priority):
+            order.append(name)
+
+    blocker = threading.Thread(target=blocking_job)
+    blocker.start()
+    started.wait()
+    threads = []
+    for name, priority in [
+        ("batch-1", "batch"),
+        ("batch-2", "batch"),
+        ("interactive-1", "interactive"),
+        ("interactive-2", "interactive")
+    ]:
+        thread = threading.Thread(target=job, args=(name, priority))
+        thread.start()
+        threads.append(thread)
+        # Letting the job enter the queue before the next one
+        time.sleep(0.05)
+    release.set()
+    blocker.join()
+    for thread in threads:
+        thread.join()
+    assert order == [
+        "interactive-1",
+        "interactive-2",
+        "batch-1",
+        "batch-2"
+    ]
+
+
+def test_set_scheduler_wrong_type():
+    with pytest.raises(TypeError) as error:
+        set_scheduler(2)
+    expected_error = (
+        "Expected 'scheduler' to be of type 'Scheduler', but got "
+        "'int' instead."
+    )
+    assert str(error.value) == expected_error
+
+
+def test_media_operations_use_scheduler():
+    previous = get_scheduler()
+    scheduler = Scheduler(
+        max_jobs=1,
+        threads=1
+    )
+    set_scheduler(scheduler)
+    try:
+        audio = Audio(test_files[0])
+        audio.set_priority("interactive")
+        audio.clip(
+            start=0,
+            end=10
+        )
+    finally:
+        set_scheduler(previous)
+    output = audio.metadata()
+    assert int(float(output["duration"])) == 10
+    assert scheduler._running == 0
+
+
+def test_media_set_priority_invalid():
+    audio = Audio(test_files[0])
+    with pytest.raises(ValueError) as error:
+        audio.set_priority("urgent")
+    expected_error = (
+        "Invalid priority 'urgent'. Expected one of: interactive, batch."
+    )
+    assert str(error.value) == expected_error
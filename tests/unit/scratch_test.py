@@ -0,0 +1,231 @@
+from fastedit.core.Scratch import (
+    ScratchManager,
+    get_scratch_manager,
+    set_scratch_manager
+)
+from fastedit.io.Audio import Audio
+import threading
+import ffmpeg
+import pytest
+import time
+import os
+
+
+test_files = [
+    "./media/test_audio.mp3"
+]
+
+
+@pytest.fixture
+def scratch_manager(request):
+    previous = get_scratch_manager()
+    scratch_manager = ScratchManager(**getattr(request, "param", {}))
+    set_scratch_manager(scratch_manager)
+    yield scratch_manager
+    set_scratch_manager(previous)
+
+
+def test_scratch_manager_budget_not_int():
+    with pytest.raises(TypeError) as error:
+        ScratchManager(
+            budget=1.5
+        )
+    expected_error = (
+        "Expected 'budget' to be of type 'int', but got 'float' instead."
+    )
+    assert str(error.value) == expected_error
+
+
+def test_scratch_manager_expiry_negative():
+    with pytest.raises(ValueError) as error:
+        ScratchManager(
+            expiry=-1
+        )
+    expected_error = (
+        "Invalid value: 'expiry' must be positive. Got expiry=-1."
+    )
+    assert str(error.value) == expected_error
+
+
+def test_set_scratch_manager_wrong_type():
+    with pytest.raises(TypeError) as error:
+        set_scratch_manager(2)
+    expected_error = (
+        "Expected 'scratch_manager' to be of type 'ScratchManager', but got "
+        "'int' instead."
+    )
+    assert str(error.value) == expected_error
+
+
+def test_scratch_manager_tracks_usage(scratch_manager):
+    size = os.path.getsize(test_files[0])
+    audio = Audio(test_files[0])
+    assert scratch_manager.used == size
+    # Hardlinked files are counted once
+    os.link(
+        audio._main_temp_file,
+        os.path.join(audio._temp_dir.name, "link.mp3")
+    )
+    scratch_manager.update(audio)
+    assert scratch_manager.used == size
+    audio.clip(
+        start=0,
+        end=5
+    )
+    assert 0 < scratch_manager.used < 2 * size
+    with Audio(test_files[0]) as other_audio:
+        assert scratch_manager.used > size
+    assert not os.path.exists(other_audio._temp_dir.name)
+    audio.close()
+    assert scratch_manager.used == 0
+    assert not os.path.exists(audio._temp_dir.name)
+
+
+@pytest.mark.parametrize(
+    "scratch_manager",
+    [{"budget": 1, "timeout": 0.1}],
+    indirect=True
+)
+def test_scratch_manager_timeout(scratch_manager):
+    audio = Audio(test_files[0])
+    with pytest.raises(TimeoutError):
+        Audio(test_files[0])
+    audio.close()
+
+
+@pytest.mark.parametrize(
+    "scratch_manager",
+    [{"budget": 1}],
+    indirect=True
+)
+def test_scratch_manager_backpressure(scratch_manager):
+    audio = Audio(test_files[0])
+    created = []
+    thread = threading.Thread(
+        target=lambda: created.append(Audio(test_files[0]))
+    )
+    thread.start()
+    time.sleep(0.1)
+    assert created == []
+    audio.close()
+    thread.join()
+    assert len(created) == 1
+
+
+@pytest.mark.parametrize(
+    "scratch_manager",
+    [{"budget": 1}],
+    indirect=True
+)
+def test_scratch_manager_fails_fast(scratch_manager):
+    audio = Audio(test_files[0])
+    # Only this thread could free space
+    with pytest.raises(TimeoutError):
+        Audio(test_files[0])
+    audio.close()
+
+
+@pytest.mark.parametrize(
+    "scratch_manager",
+    [{"budget": 2 * os.path.getsize(test_files[0])}],
+    indirect=True
+)
+def test_scratch_manager_backpressure_on_jobs(scratch_manager):
+    audio = Audio(test_files[0])
+    other_audio = Audio(test_files[0])
+    # Jobs of this thread fail right away
+    with pytest.raises(TimeoutError):
+        audio.gain(-6)
+    # Jobs of other threads wait for space
+    errors = []
+
+    def edit():
+        try:
+            audio.gain(-6)
+        except Exception as error:
+            errors.append(error)
+
+    editing = threading.Thread(target=edit)
+    editing.start()
+    time.sleep(0.1)
+    assert editing.is_alive()
+    other_audio.close()
+    editing.join()
+    assert errors == []
+    audio.close()
+
+
+def test_scratch_manager_closed_instance(scratch_manager):
+    audio = Audio(test_files[0])
+    audio.close()
+    with pytest.raises(ValueError) as error:
+        audio.gain(-6)
+    expected_error = (
+        "Invalid state: the instance is closed, it can not be used anymore."
+    )
+    assert str(error.value) == expected_error
+
+
+@pytest.mark.parametrize(
+    "scratch_manager",
+    [{"budget": 1, "expiry": 0.05}],
+    indirect=True
+)
+def test_scratch_manager_evicts_expired(scratch_manager):
+    audio = Audio(test_files[0])
+    time.sleep(0.1)
+    other_audio = Audio(test_files[0])
+    assert not os.path.exists(audio._temp_dir.name)
+    assert os.path.exists(other_audio._main_temp_file)
+    with pytest.raises(ValueError) as error:
+        audio.gain(-6)
+    expected_error = (
+        "Invalid state: the instance was closed by the scratch manager "
+        "after expiring, it can not be used anymore."
+    )
+    assert str(error.value) == expected_error
+
+
+@pytest.mark.parametrize(
+    "scratch_manager",
+    [{"budget": 1, "expiry": 0.05}],
+    indirect=True
+)
+def test_scratch_manager_keeps_running_instances(
+    scratch_manager,
+    monkeypatch
+):
+    run = ffmpeg.run
+
+    # Mocking a slow FFmpeg command
+    def slow_ffmpeg(*args, **kwargs):
+        time.sleep(0.3)
+        return run(*args, **kwargs)
+
+    monkeypatch.setattr(ffmpeg, "run", slow_ffmpeg)
+    audio = Audio(test_files[0])
+    errors = []
+
+    def edit():
+        try:
+            audio.gain(-6)
+        except Exception as error:
+            errors.append(error)
+
+    editing = threading.Thread(target=edit)
+    editing.start()
+    created = []
+    creating = threading.Thread(
+        target=lambda: created.append(Audio(test_files[0]))
+    )
+    creating.start()
+    # The running instance is not evicted past its expiry
+    time.sleep(0.2)
+    assert created == []
+    assert os.path.exists(audio._main_temp_file)
+    editing.join()
+    assert errors == []
+    # It is evicted once idle
+    creating.join()
+    assert len(created) == 1
+    assert not os.path.exists(audio._temp_dir.name)
@@ -1,5 +1,9 @@
 from fastedit.io.Video import Video
 from fastedit.io.Audio import Audio
+from fastedit.io.Subtitles import Subtitles
+from fastedit.io.Image import Image
+from fractions import Fraction
+import subprocess
 import ffmpeg
 import pytest
 import os
@@ -7,7 +11,10 @@ import os
 
 test_files = [
     "./media/test_video_with_audio.mp4",
-    "./media/test_audio.mp3"
+    "./media/test_audio.mp3",
+    "./media/test_subtitles.srt",
+    "./media/test_subtitles.ass",
+    "./media/test_image.jpeg"
 ]
 
 
@@ -838,10 +845,420 @@ def test_video_add_audio_mix_strategy():
     assert output["format_name"] == "mov,mp4,m4a,3gp,3g2,mj2"
     assert int(float(output["duration"])) == 15
     assert len(output["streams"]) == 2
-    assert output["streams"][1]["codec_name"] == "h264"
-    assert output["streams"][0]["codec_name"] == "aac"
-    assert output["streams"][1]["height"] == 1080
-    assert output["streams"][1]["width"] == 1920
+    assert output["streams"][0]["codec_name"] == "h264"
+    assert output["streams"][1]["codec_name"] == "aac"
+    assert output["streams"][0]["height"] == 1080
+    assert output["streams"][0]["width"] == 1920
+
+
+def test_video_add_audios_invalid_strategy():
+    video = Video(test_files[0])
+    audio = Audio(test_files[1])
+    with pytest.raises(ValueError) as error:
+        video.add_audios(
+            audios=[audio],
+            strategy="mix"
+        )
+    expected_error = (
+        "Invalid strategy 'mix'. Expected one of: replace, add."
+    )
+    assert str(error.value) == expected_error
+
+
+def test_video_add_audios_languages_not_str():
+    video = Video(test_files[0])
+    audio = Audio(test_files[1])
+    with pytest.raises(TypeError) as error:
+        video.add_audios(
+            audios=[audio],
+            languages=[4]
+        )
+    expected_error = (
+        "Expected 'languages' items to be of type 'str', but got "
+        "'int' instead."
+    )
+    assert str(error.value) == expected_error
+
+
+def test_video_add_audios_titles_length():
+    video = Video(test_files[0])
+    audio = Audio(test_files[1])
+    with pytest.raises(ValueError) as error:
+        video.add_audios(
+            audios=[audio],
+            titles=["Dub", "Commentary"]
+        )
+    expected_error = (
+        "Invalid value: 'titles' must have one value per audio. "
+        "Got 2 values for 1 audios."
+    )
+    assert str(error.value) == expected_error
+
+
+@pytest.mark.parametrize("strategy, existing", [("add", 1), ("replace", 0)])
+def test_video_add_audios(strategy, existing):
+    video = Video(test_files[0])
+    audio = Audio(test_files[1])
+    video.add_audios(
+        audios=[audio, audio],
+        strategy=strategy,
+        languages=["fra", None],
+        titles=["Dub", "Commentary"]
+    )
+    output = ffmpeg.probe(video._main_temp_file)
+    assert int(float(output["format"]["duration"])) == 15
+    audio_streams = [
+        stream for stream in output["streams"]
+        if stream["codec_type"] == "audio"
+    ]
+    assert len(audio_streams) == existing + 2
+    # New tracks are copied, with their metadata
+    new_streams = audio_streams[existing:]
+    assert [stream["codec_name"] for stream in new_streams] == [
+        "mp3",
+        "mp3"
+    ]
+    assert new_streams[0]["tags"]["language"] == "fra"
+    assert [stream["tags"]["handler_name"] for stream in new_streams] == [
+        "Dub",
+        "Commentary"
+    ]
+
+
+def test_video_speed_factor_not_number():
+    video = Video(test_files[0])
+    with pytest.raises(TypeError) as error:
+        video.speed(
+            factor="2"
+        )
+    expected_error = (
+        "Expected 'factor' to be of type 'int' or 'float', but got "
+        "'str' instead."
+    )
+    assert str(error.value) == expected_error
+
+
+def test_video_speed_preserve_pitch_not_bool():
+    video = Video(test_files[0])
+    with pytest.raises(TypeError) as error:
+        video.speed(
+            factor=2,
+            preserve_pitch=1
+        )
+    expected_error = (
+        "Expected 'preserve_pitch' to be of type 'bool', but got "
+        "'int' instead."
+    )
+    assert str(error.value) == expected_error
+
+
+def test_video_speed_factor_not_positive():
+    video = Video(test_files[0])
+    with pytest.raises(ValueError) as error:
+        video.speed(
+            factor=0
+        )
+    expected_error = (
+        "Invalid value: 'factor' must be positive. Got factor=0."
+    )
+    assert str(error.value) == expected_error
+
+
+@pytest.mark.parametrize("factor, preserve_pitch", [
+    (1.5, True),
+    (0.4, True),
+    (1.25, False)
+])
+def test_video_speed(factor, preserve_pitch):
+    video = Video(test_files[0])
+    video.clip(
+        start=0,
+        end=2
+    )
+    duration = float(video.metadata()["duration"])
+    video.speed(
+        factor=factor,
+        preserve_pitch=preserve_pitch
+    )
+    output = video.metadata()
+    assert abs(float(output["duration"]) - duration / factor) < 0.1
+    assert output["streams"][0]["r_frame_rate"] == "30/1"
+    assert output["streams"][1]["codec_name"] == "aac"
+
+
+def test_video_speed_keeps_subtitles():
+    video = Video(test_files[0])
+    video.add_subtitles(
+        subtitles=Subtitles(test_files[2])
+    )
+    video.speed(
+        factor=2
+    )
+    output = ffmpeg.probe(
+        video._main_temp_file,
+        select_streams="s",
+        show_packets=None
+    )
+    assert output["streams"][0]["codec_name"] == "mov_text"
+    # Cues are shown at twice the speed
+    assert [
+        float(packet["pts_time"]) for packet in output["packets"][:2]
+    ] == [0, 3]
+    assert float(output["packets"][0]["duration_time"]) == 3
+
+
+def test_video_trim_negative_start():
+    video = Video(test_files[0])
+    with pytest.raises(ValueError) as error:
+        video.trim(
+            start=-1,
+            end=2
+        )
+    expected_error = (
+        "Invalid 'start' value: 'start' must be greater than or equal to 0. "
+        "Got start=-1."
+    )
+    assert str(error.value) == expected_error
+
+
+def test_video_trim():
+    video = Video(test_files[0])
+    video.add_subtitles(
+        subtitles=Subtitles(test_files[2])
+    )
+    video.trim(
+        start=1.25,
+        end=3.75
+    )
+    output = video.metadata()
+    assert [stream["codec_type"] for stream in output["streams"]] == [
+        "video",
+        "audio",
+        "subtitle"
+    ]
+    assert output["streams"][0]["nb_frames"] == "75"
+    # Decoders output whole AAC frames, the stream duration is exact
+    audio = ffmpeg.probe(video._main_temp_file, select_streams="a")
+    sample_rate = int(audio["streams"][0]["sample_rate"])
+    assert audio["streams"][0]["duration_ts"] == 2.5 * sample_rate
+
+
+def test_video_trim_every_audio_stream(two_audio_tracks_video):
+    video = Video(two_audio_tracks_video)
+    video.trim(
+        start=1,
+        end=3
+    )
+    output = video.metadata()
+    assert [stream["codec_type"] for stream in output["streams"]] == [
+        "video",
+        "audio",
+        "audio"
+    ]
+
+
+def test_video_speed_every_audio_stream(two_audio_tracks_video):
+    video = Video(two_audio_tracks_video)
+    video.speed(
+        factor=2
+    )
+    output = video.metadata()
+    assert [stream["codec_type"] for stream in output["streams"]] == [
+        "video",
+        "audio",
+        "audio"
+    ]
+    for stream in output["streams"][1:]:
+        assert abs(float(stream["duration"]) - 15.5 / 2) < 0.1
+
+
+def test_video_speed_relabels_without_audio():
+    video = Video(test_files[0])
+    video.speed(
+        factor=4,
+        drop_audio=True
+    )
+    output = video.metadata()
+    assert abs(float(output["duration"]) - 15.5 / 4) < 0.1
+    assert len(output["streams"]) == 1
+    # Every frame is copied at a higher frame rate
+    assert output["streams"][0]["r_frame_rate"] == "120/1"
+    assert output["streams"][0]["nb_frames"] == "465"
+
+
+def test_video_speed_drops_frames():
+    video = Video(test_files[0])
+    video.speed(
+        factor=20,
+        drop_audio=True
+    )
+    output = video.metadata()
+    assert output["streams"][0]["r_frame_rate"] == "30/1"
+    assert output["streams"][0]["nb_frames"] == "23"
+
+
+@pytest.fixture
+def dead_air_video(tmp_path):
+    # 2s of black and 1.5s of silence before the content, 1s of black and
+    # 1.5s of silence after it, with a keyframe every 0.5s
+    path = str(tmp_path / "dead_air.mp4")
+    video = ffmpeg.concat(
+        ffmpeg.input("color=c=black:s=320x240:r=30:d=2", f="lavfi"),
+        ffmpeg.input("testsrc=s=320x240:r=30:d=3", f="lavfi"),
+        ffmpeg.input("color=c=black:s=320x240:r=30:d=1", f="lavfi")
+    )
+    audio = ffmpeg.concat(
+        ffmpeg.input("anullsrc=r=44100:cl=mono:d=1.5", f="lavfi"),
+        ffmpeg.input("sine=f=440:r=44100:d=3", f="lavfi"),
+        ffmpeg.input("anullsrc=r=44100:cl=mono:d=1.5", f="lavfi"),
+        v=0,
+        a=1
+    )
+    ffmpeg.output(
+        video,
+        audio,
+        path,
+        g=15,
+        pix_fmt="yuv420p"
+    ).overwrite_output().run(quiet=True)
+    return path
+
+
+def test_video_detect_black_threshold_out_of_range():
+    video = Video(test_files[0])
+    with pytest.raises(ValueError) as error:
+        video.detect_black(
+            threshold=2
+        )
+    expected_error = (
+        "Invalid value: 'threshold' must be between 0 and 1. "
+        "Got threshold=2."
+    )
+    assert str(error.value) == expected_error
+
+
+def test_video_detect_silence_noise_not_negative():
+    video = Video(test_files[0])
+    with pytest.raises(ValueError) as error:
+        video.detect_silence(
+            noise=0
+        )
+    expected_error = (
+        "Invalid value: 'noise' must be negative. Got noise=0."
+    )
+    assert str(error.value) == expected_error
+
+
+def test_video_detect_black_and_silence(dead_air_video):
+    video = Video(dead_air_video)
+    black = video.detect_black()
+    assert [round(start, 1) for start, _ in black] == [0.0, 5.0]
+    assert [round(end, 1) for _, end in black] == [2.0, 6.0]
+    silence = video.detect_silence()
+    assert [round(start, 1) for start, _ in silence] == [0.0, 4.5]
+    assert [round(end, 1) for _, end in silence] == [1.5, 6.0]
+
+
+def test_video_trim_black(dead_air_video):
+    video = Video(dead_air_video)
+    video.trim_black()
+    output = video.metadata()
+    assert abs(float(output["duration"]) - 3) < 0.1
+    assert video.detect_black() == []
+
+
+def test_video_trim_silence(dead_air_video):
+    video = Video(dead_air_video)
+    video.defer()
+    video.trim_silence(
+        accurate=True
+    )
+    video.render()
+    assert video.detect_silence() == []
+
+
+def test_video_mix_audio_audios_not_list():
+    video = Video(test_files[0])
+    audio = Audio(test_files[1])
+    with pytest.raises(TypeError) as error:
+        video.mix_audio(
+            audios=audio
+        )
+    expected_error = (
+        "Expected 'audios' to be of type 'list', but got "
+        "'Audio' instead."
+    )
+    assert str(error.value) == expected_error
+
+
+def test_video_mix_audio_gains_not_numbers():
+    video = Video(test_files[0])
+    audio = Audio(test_files[1])
+    with pytest.raises(TypeError) as error:
+        video.mix_audio(
+            audios=[audio],
+            gains=["-6"]
+        )
+    expected_error = (
+        "Expected 'gains' items to be of type 'int' or 'float', but got "
+        "'str' instead."
+    )
+    assert str(error.value) == expected_error
+
+
+def test_video_mix_audio_offsets_length():
+    video = Video(test_files[0])
+    audio = Audio(test_files[1])
+    with pytest.raises(ValueError) as error:
+        video.mix_audio(
+            audios=[audio, audio],
+            offsets=[1]
+        )
+    expected_error = (
+        "Invalid value: 'offsets' must have one value per audio. "
+        "Got 1 values for 2 audios."
+    )
+    assert str(error.value) == expected_error
+
+
+def test_video_mix_audio_ducking_without_audio():
+    video = Video(test_files[0])
+    audio = Audio(test_files[1])
+    video.remove_audio()
+    with pytest.raises(ValueError) as error:
+        video.mix_audio(
+            audios=[audio],
+            ducking=True
+        )
+    expected_error = (
+        "Invalid value: 'ducking' requires the video to have an "
+        "audio stream."
+    )
+    assert str(error.value) == expected_error
+
+
+def test_video_mix_audio_copies_video():
+    video = Video(test_files[0])
+    audio = Audio(test_files[1])
+    video.mix_audio(
+        audios=[audio, audio],
+        gains=[-6, -12],
+        offsets=[0, 2.5],
+        ducking=True
+    )
+    output = video.metadata()
+    assert round(float(output["duration"])) == 16
+    assert len(output["streams"]) == 2
+    assert output["streams"][0]["codec_name"] == "h264"
+    assert output["streams"][1]["codec_name"] == "aac"
+    # The video stream is copied, not re-encoded
+    packets = [
+        ffmpeg.probe(path, select_streams="v", show_packets=None)["packets"]
+        for path in [test_files[0], video._main_temp_file]
+    ]
+    assert [packet["size"] for packet in packets[0]] == [
+        packet["size"] for packet in packets[1]
+    ]
 
 
 def test_video_add_audio_mix_strategy_without_ffmpeg(monkeypatch):
@@ -922,6 +1339,24 @@ def test_video_add_audio_add_strategy_without_ffmpeg(monkeypatch):
     assert str(error.value) == expected_error
 
 
+def test_video_mix_audio_copies_other_tracks(two_audio_tracks_video):
+    video = Video(two_audio_tracks_video)
+    video.mix_audio(
+        audios=[Audio(test_files[1])]
+    )
+    output = ffmpeg.probe(video._main_temp_file)
+    assert [stream["codec_type"] for stream in output["streams"]] == [
+        "video",
+        "audio",
+        "audio"
+    ]
+    # The second track is copied as is
+    source = ffmpeg.probe(two_audio_tracks_video)
+    assert output["streams"][2]["nb_frames"] == source["streams"][2][
+        "nb_frames"
+    ]
+
+
 def test_video_remove_audio():
     video = Video(test_files[0])
     video.remove_audio()
@@ -990,3 +1425,880 @@ def test_video_save_wrong_path_type():
         "'int' instead."
     )
     assert str(error.value) == expected_error
+
+
+def test_video_burn_subtitles_wrong_subtitles_type():
+    video = Video(test_files[0])
+    with pytest.raises(TypeError) as error:
+        video.burn_subtitles(
+            subtitles=test_files[2]
+        )
+    expected_error = (
+        "Expected 'subtitles' to be of type 'Subtitles', but got "
+        "'str' instead."
+    )
+    assert str(error.value) == expected_error
+
+
+def test_video_burn_subtitles_wrong_style_type():
+    video = Video(test_files[0])
+    subtitles = Subtitles(test_files[2])
+    with pytest.raises(TypeError) as error:
+        video.burn_subtitles(
+            subtitles=subtitles,
+            style="Fontsize=24"
+        )
+    expected_error = (
+        "Expected 'style' to be of type 'dict', but got "
+        "'str' instead."
+    )
+    assert str(error.value) == expected_error
+
+
+def test_video_burn_subtitles_srt_with_style():
+    video = Video(test_files[0])
+    subtitles = Subtitles(test_files[2])
+    video.burn_subtitles(
+        subtitles=subtitles,
+        style={"Fontsize": 24}
+    )
+    output = video.metadata()
+    assert int(float(output["duration"])) == 15
+    assert len(output["streams"]) == 2
+    assert output["streams"][0]["codec_name"] == "h264"
+    assert output["streams"][1]["codec_name"] == "aac"
+
+
+def test_video_burn_subtitles_ass():
+    video = Video(test_files[0])
+    subtitles = Subtitles(test_files[3])
+    video.burn_subtitles(
+        subtitles=subtitles
+    )
+    output = video.metadata()
+    assert len(output["streams"]) == 2
+    assert output["streams"][0]["codec_name"] == "h264"
+
+
+def test_video_burn_subtitles_without_ffmpeg(monkeypatch):
+    # Mocking FFmpeg not installed
+    def mock_ffmpeg(*args, **kwargs):
+        raise ffmpeg.Error(
+            "ffmpeg",
+            "stdout",
+            "stderr"
+        )
+
+    # Replace ffmpeg.run by mocking
+    monkeypatch.setattr(ffmpeg, "run", mock_ffmpeg)
+
+    # Testing
+    video = Video(test_files[0])
+    subtitles = Subtitles(test_files[2])
+    with pytest.raises(ffmpeg.Error) as error:
+        video.burn_subtitles(
+            subtitles=subtitles
+        )
+    expected_error = (
+        "ffmpeg error (see stderr output for detail)"
+    )
+    assert str(error.value) == expected_error
+
+
+def test_video_add_subtitles():
+    video = Video(test_files[0])
+    subtitles = Subtitles(test_files[2])
+    video.add_subtitles(
+        subtitles=subtitles,
+        language="eng"
+    )
+    output = video.metadata()
+    assert len(output["streams"]) == 3
+    assert output["streams"][0]["codec_name"] == "h264"
+    assert output["streams"][1]["codec_name"] == "aac"
+    assert output["streams"][2]["codec_type"] == "subtitle"
+    assert output["streams"][2]["codec_name"] == "mov_text"
+
+
+def test_video_add_subtitles_twice():
+    video = Video(test_files[0])
+    subtitles = Subtitles(test_files[2])
+    video.add_subtitles(
+        subtitles=subtitles,
+        language="eng"
+    )
+    video.add_subtitles(
+        subtitles=subtitles,
+        language="fra"
+    )
+    output = ffmpeg.probe(video._main_temp_file)
+    assert len(output["streams"]) == 4
+    assert output["streams"][2]["tags"]["language"] == "eng"
+    assert output["streams"][3]["tags"]["language"] == "fra"
+
+
+def test_video_add_subtitles_wrong_language_type():
+    video = Video(test_files[0])
+    subtitles = Subtitles(test_files[2])
+    with pytest.raises(TypeError) as error:
+        video.add_subtitles(
+            subtitles=subtitles,
+            language=1
+        )
+    expected_error = (
+        "Expected 'language' to be of type 'str', but got "
+        "'int' instead."
+    )
+    assert str(error.value) == expected_error
+
+
+def test_video_normalize_loudness():
+    video = Video(test_files[0])
+    video.normalize_loudness(
+        target_lufs=-16,
+        true_peak=-1.5
+    )
+    output = video.metadata()
+    assert int(float(output["duration"])) == 15
+    assert len(output["streams"]) == 2
+    assert output["streams"][0]["codec_name"] == "h264"
+    assert output["streams"][1]["codec_name"] == "aac"
+    assert output["streams"][0]["height"] == 1080
+
+
+@pytest.fixture
+def two_audio_tracks_video(tmp_path):
+    # Video with a second, louder, audio track
+    path = str(tmp_path / "two_audio_tracks.mp4")
+    input = ffmpeg.input(test_files[0])
+    louder = ffmpeg.filter(input["a:0"], "volume", "6dB")
+    ffmpeg.output(
+        input["v"],
+        input["a:0"],
+        louder,
+        path,
+        vcodec="copy"
+    ).run(quiet=True)
+    return path
+
+
+def test_video_normalize_loudness_every_audio_stream(two_audio_tracks_video):
+    video = Video(two_audio_tracks_video)
+    video.normalize_loudness(
+        target_lufs=-16
+    )
+    output = video.metadata()
+    assert len(output["streams"]) == 3
+    for stream in [0, 1]:
+        measurement = video._measure_loudness(
+            stream=stream
+        )
+        assert abs(measurement["input_i"] + 16) < 1
+
+
+@pytest.mark.parametrize("operation, params", [
+    ("gain", {"gain": 3}),
+    ("fade_audio", {"fade_in": 1})
+])
+def test_video_audio_filters_every_audio_stream(
+    two_audio_tracks_video,
+    operation,
+    params
+):
+    video = Video(two_audio_tracks_video)
+    getattr(video, operation)(**params)
+    output = video.metadata()
+    assert [stream["codec_type"] for stream in output["streams"]] == [
+        "video",
+        "audio",
+        "audio"
+    ]
+
+
+def test_video_scenes_wrong_threshold_type():
+    video = Video(test_files[0])
+    with pytest.raises(TypeError) as error:
+        video.scenes(
+            threshold="0.3"
+        )
+    expected_error = (
+        "Expected 'threshold' to be of type 'int' or 'float', but "
+        "got 'str' instead."
+    )
+    assert str(error.value) == expected_error
+
+
+def test_video_scenes_threshold_out_of_range():
+    video = Video(test_files[0])
+    with pytest.raises(ValueError) as error:
+        video.scenes(
+            threshold=2
+        )
+    expected_error = (
+        "Invalid value: 'threshold' must be between 0 and 1. "
+        "Got threshold=2."
+    )
+    assert str(error.value) == expected_error
+
+
+def test_video_scenes_cached(monkeypatch):
+    video = Video(test_files[0])
+    cuts = video.scenes(
+        frame_step=2
+    )
+    assert isinstance(cuts, list)
+
+    # Mocking FFmpeg not installed
+    def mock_ffmpeg(*args, **kwargs):
+        raise ffmpeg.Error(
+            "ffmpeg",
+            "stdout",
+            "stderr"
+        )
+
+    # Replace ffmpeg.run by mocking
+    monkeypatch.setattr(ffmpeg, "run", mock_ffmpeg)
+
+    # Testing
+    assert video.scenes(frame_step=2) == cuts
+
+
+def test_video_clip_snap_to_scene():
+    video = Video(test_files[0])
+    # Scene cuts are known without decoding
+    video._cache["scenes"] = {(0.3, 160, 1): [5.0, 10.0]}
+    video.clip(
+        start=4.2,
+        end=10.4,
+        snap="scene"
+    )
+    output = video.metadata()
+    assert round(float(output["duration"])) == 5
+
+
+def test_video_clip_invalid_snap():
+    video = Video(test_files[0])
+    with pytest.raises(ValueError) as error:
+        video.clip(
+            start=0,
+            end=10,
+            snap="chapter"
+        )
+    expected_error = (
+        "Invalid snap 'chapter'. Expected one of: keyframe, scene."
+    )
+    assert str(error.value) == expected_error
+
+
+def test_video_keyframes():
+    video = Video(test_files[0])
+    keyframes = video.keyframes()
+    assert keyframes[0] == 0
+    assert keyframes == sorted(keyframes)
+    assert video._is_keyframe(keyframes[-1])
+
+
+def test_video_keyframes_verbose_ffprobe(monkeypatch):
+    video = Video(test_files[0])
+    expected_keyframes = video.keyframes()
+    video._cache.pop("packets")
+    popen = subprocess.Popen
+
+    # Writing more warnings than a pipe can hold before probing
+    def mock_popen(args, **kwargs):
+        script = 'head -c 1048576 /dev/zero >&2; exec "$@"'
+        return popen(["sh", "-c", script, "sh", *args], **kwargs)
+
+    monkeypatch.setattr(subprocess, "Popen", mock_popen)
+    assert video.keyframes() == expected_keyframes
+
+
+def test_video_keyframes_ffprobe_error(monkeypatch):
+    video = Video(test_files[0])
+    video.metadata()
+    popen = subprocess.Popen
+
+    def mock_popen(args, **kwargs):
+        script = "echo damaged >&2; exit 1"
+        return popen(["sh", "-c", script], **kwargs)
+
+    monkeypatch.setattr(subprocess, "Popen", mock_popen)
+    with pytest.raises(ffmpeg.Error) as error:
+        video.keyframes()
+    assert error.value.stderr == b"damaged\n"
+
+
+def test_video_clip_accurate_wrong_type():
+    video = Video(test_files[0])
+    with pytest.raises(TypeError) as error:
+        video.clip(
+            start=0,
+            end=10,
+            accurate=1
+        )
+    expected_error = (
+        "Expected 'accurate' to be of type 'bool', but got "
+        "'int' instead."
+    )
+    assert str(error.value) == expected_error
+
+
+def test_video_clip_accurate_between_keyframes():
+    video = Video(test_files[0])
+    keyframes = video.keyframes()
+    start = (keyframes[0] + keyframes[1]) / 2
+    video.clip(
+        start=start,
+        end=start + 5,
+        accurate=True
+    )
+    output = video.metadata()
+    assert round(float(output["duration"]), 1) == 5
+    assert output["streams"][0]["codec_name"] == "h264"
+
+
+def test_video_clip_snap_to_keyframe():
+    video = Video(test_files[0])
+    keyframes = video.keyframes()
+    video.clip(
+        start=keyframes[1] + 0.1,
+        end=10,
+        snap="keyframe"
+    )
+    assert video.keyframes()[0] == 0
+
+
+def test_video_defer_and_render():
+    video = Video(test_files[0])
+    video.defer()
+    video.resize(
+        height=720,
+        width=1280
+    )
+    video.text(
+        x=640,
+        y=360,
+        text="FastEdit",
+        start=1,
+        end=14
+    )
+    video.clip(
+        start=3,
+        end=8
+    )
+    # Nothing ran yet
+    output = video.metadata()
+    assert output["streams"][0]["height"] == 1080
+    assert [operation["op"] for operation in video.plan()] == [
+        "clip",
+        "resize",
+        "text"
+    ]
+    video.render()
+    output = video.metadata()
+    assert round(float(output["duration"])) == 5
+    assert len(output["streams"]) == 2
+    assert output["streams"][0]["height"] == 720
+    assert output["streams"][0]["width"] == 1280
+    assert output["streams"][1]["codec_name"] == "aac"
+    assert video.plan() == []
+
+
+def test_video_defer_save_renders_plan():
+    video = Video(test_files[0])
+    video.defer()
+    video.remove_audio()
+    save_path = "test_fastedit.mp4"
+    video.save(
+        path=save_path
+    )
+    assert len(video.metadata()["streams"]) == 1
+    assert os.path.exists(save_path)
+
+
+def test_video_zoom_in_invalid_engine():
+    video = Video(test_files[0])
+    with pytest.raises(ValueError) as error:
+        video.zoom_in(
+            zoom=1,
+            engine="perspective"
+        )
+    expected_error = (
+        "Invalid engine 'perspective'. Expected one of: scale, zoompan."
+    )
+    assert str(error.value) == expected_error
+
+
+def test_video_zoom_in_zoompan_engine():
+    video = Video(test_files[0])
+    video.clip(
+        start=0,
+        end=2
+    )
+    video.zoom_in(
+        zoom=1,
+        engine="zoompan"
+    )
+    output = video.metadata()
+    assert round(float(output["duration"])) == 2
+    assert output["streams"][0]["height"] == 1080
+    assert output["streams"][0]["width"] == 1920
+
+
+def test_video_zoom_wrong_zoom_type():
+    video = Video(test_files[0])
+    with pytest.raises(TypeError) as error:
+        video.zoom(
+            end_zoom="2"
+        )
+    expected_error = (
+        "Expected 'end_zoom' to be of type 'int' or 'float', but "
+        "got 'str' instead."
+    )
+    assert str(error.value) == expected_error
+
+
+def test_video_zoom_out_of_range():
+    video = Video(test_files[0])
+    with pytest.raises(ValueError) as error:
+        video.zoom(
+            end_zoom=0.5
+        )
+    expected_error = (
+        "Invalid value: 'start_zoom' and 'end_zoom' must be greater "
+        "than or equal to 1. Got start_zoom=1, end_zoom=0.5."
+    )
+    assert str(error.value) == expected_error
+
+
+def test_video_zoom_with_pan():
+    video = Video(test_files[0])
+    video.clip(
+        start=0,
+        end=2
+    )
+    video.zoom(
+        start_zoom=1.5,
+        end_zoom=2,
+        start_x=480,
+        start_y=270,
+        end_x=1440,
+        end_y=810,
+        supersample=2
+    )
+    output = video.metadata()
+    assert round(float(output["duration"])) == 2
+    assert len(output["streams"]) == 2
+    assert output["streams"][0]["height"] == 1080
+    assert output["streams"][0]["width"] == 1920
+    assert output["streams"][1]["codec_name"] == "aac"
+
+
+def test_video_frame_count_from_metadata():
+    video = Video(test_files[0])
+    frame_count, method = video.frame_count()
+    metadata = video.metadata()
+    assert frame_count == int(metadata["streams"][0]["nb_frames"])
+    assert method == "metadata"
+
+
+def test_video_frame_count_from_packets():
+    video = Video(test_files[0])
+    expected_frame_count, _ = video.frame_count()
+    # Container without frame count
+    video._cache = {"metadata": video.metadata()}
+    video._cache["metadata"]["streams"][0].pop("nb_frames")
+    frame_count, method = video.frame_count()
+    assert frame_count == expected_frame_count
+    assert method == "packets"
+
+
+def test_video_frame_count_estimate(monkeypatch):
+    video = Video(test_files[0])
+    metadata = video.metadata()
+    metadata["streams"][0].pop("nb_frames")
+    video._cache = {"metadata": metadata}
+
+    # Mocking FFprobe unable to count packets
+    def mock_ffprobe(*args, **kwargs):
+        return {"streams": []}
+
+    # Replace ffmpeg.probe by mocking
+    monkeypatch.setattr(ffmpeg, "probe", mock_ffprobe)
+
+    # Testing
+    frame_count, method = video.frame_count()
+    assert method == "estimate"
+    fps = Fraction(metadata["streams"][0]["r_frame_rate"])
+    duration = Fraction(metadata["streams"][0]["duration"])
+    assert frame_count == round(duration * fps)
+
+
+def test_video_fork_branches(monkeypatch):
+    video = Video(test_files[0])
+    video.clip(
+        start=0,
+        end=4
+    )
+    video.metadata()
+
+    def probe_without_ffmpeg(*args, **kwargs):
+        raise FileNotFoundError("ffprobe")
+
+    monkeypatch.setattr(ffmpeg, "probe", probe_without_ffmpeg)
+    forked = video.fork()
+    # Metadata is copied, not probed again
+    assert forked.metadata() == video.metadata()
+    monkeypatch.undo()
+    forked.resize(
+        height=360,
+        width=640
+    )
+    assert forked.metadata()["streams"][0]["height"] == 360
+    assert video.metadata()["streams"][0]["height"] == 1080
+    assert round(float(forked.metadata()["duration"])) == 4
+
+
+def test_video_export_invalid_parameters():
+    video = Video(test_files[0])
+    with pytest.raises(ValueError) as error:
+        video.export(
+            path="test_fastedit.mp4",
+            target_size=10 ** 6,
+            bitrate=10 ** 6
+        )
+    expected_error = (
+        "Invalid parameters: exactly one of 'target_size' and 'bitrate' "
+        "must be given."
+    )
+    assert str(error.value) == expected_error
+
+
+def test_video_export_target_size_too_small():
+    video = Video(test_files[0])
+    with pytest.raises(ValueError) as error:
+        video.export(
+            path="test_fastedit.mp4",
+            target_size=1000
+        )
+    assert str(error.value).startswith(
+        "Invalid value: the bitrate left for the video must be at least"
+    )
+
+
+def test_video_export_target_size():
+    video = Video(test_files[0])
+    video.clip(
+        start=0,
+        end=4
+    )
+    video.resize(
+        height=360,
+        width=640
+    )
+    save_path = "test_fastedit_export.mp4"
+    target_size = 200000
+    video.export(
+        path=save_path,
+        target_size=target_size
+    )
+    assert 0.8 * target_size < os.path.getsize(save_path) <= target_size
+    assert not any(
+        name.startswith("passlog")
+        for name in os.listdir(video._temp_dir.name)
+    )
+    os.remove(save_path)
+
+
+def test_video_export_passes(monkeypatch, two_audio_tracks_video):
+    commands = []
+    run = ffmpeg.run
+
+    # Recording the commands of both passes
+    def recording_ffmpeg(stream_spec, **kwargs):
+        commands.append(ffmpeg.compile(stream_spec))
+        return run(stream_spec, **kwargs)
+
+    monkeypatch.setattr(ffmpeg, "run", recording_ffmpeg)
+    video = Video(two_audio_tracks_video)
+    video.clip(
+        start=0,
+        end=2
+    )
+    commands.clear()
+    save_path = "test_fastedit_export.mp4"
+    video.export(
+        path=save_path,
+        bitrate=10 ** 6
+    )
+    first_pass, second_pass = commands
+    assert first_pass[first_pass.index("-fastfirstpass") + 1] == "1"
+    assert "-fastfirstpass" not in second_pass
+    # Only the first audio track is exported
+    output = ffmpeg.probe(save_path)
+    os.remove(save_path)
+    assert [stream["codec_type"] for stream in output["streams"]] == [
+        "video",
+        "audio"
+    ]
+
+
+def test_video_proxy_height_too_large():
+    video = Video(test_files[0])
+    with pytest.raises(ValueError) as error:
+        video.proxy(
+            height=2160
+        )
+    expected_error = (
+        "Invalid value: 'height' must be positive and less than or equal "
+        "to the video height. Got height=2160, but video height is 1080."
+    )
+    assert str(error.value) == expected_error
+
+
+def test_video_proxy_odd_height():
+    video = Video(test_files[0])
+    video.proxy(
+        height=359
+    )
+    output = video._proxy.metadata()
+    assert output["streams"][0]["height"] == 358
+    assert output["streams"][0]["width"] == 636
+
+
+def test_video_preview_without_proxy():
+    video = Video(test_files[0])
+    with pytest.raises(ValueError) as error:
+        video.preview(
+            path="test_fastedit.mp4"
+        )
+    expected_error = "Proxy mode is not enabled, enable it with 'proxy'."
+    assert str(error.value) == expected_error
+
+
+def test_video_proxy_preview_and_render():
+    video = Video(test_files[0])
+    video.clip(
+        start=0,
+        end=3
+    )
+    video.proxy(
+        height=360
+    )
+    video.crop(
+        x=960,
+        y=540,
+        height=800,
+        width=1200
+    )
+    video.text(
+        x=600,
+        y=400,
+        text="FastEdit",
+        start=0,
+        end=2
+    )
+    preview_path = "test_fastedit_preview.mp4"
+    video.preview(
+        path=preview_path
+    )
+    preview = Video(preview_path).metadata()
+    assert preview["streams"][0]["height"] == 266
+    assert preview["streams"][0]["width"] == 400
+    # Full resolution video is untouched until rendered
+    assert video.metadata()["streams"][0]["height"] == 1080
+    video.render()
+    output = video.metadata()
+    assert output["streams"][0]["height"] == 800
+    assert output["streams"][0]["width"] == 1200
+    assert video._proxy is None
+    os.remove(preview_path)
+
+
+def test_video_overlay_wrong_image_type():
+    video = Video(test_files[0])
+    with pytest.raises(TypeError) as error:
+        video.overlay(
+            image=test_files[4],
+            x=100,
+            y=100
+        )
+    expected_error = (
+        "Expected 'image' to be of type 'Image', but got 'str' instead."
+    )
+    assert str(error.value) == expected_error
+
+
+def test_video_overlay_negative_scale():
+    video = Video(test_files[0])
+    with pytest.raises(ValueError) as error:
+        video.overlay(
+            image=Image(test_files[4]),
+            x=100,
+            y=100,
+            scale=-1
+        )
+    expected_error = "Invalid value: 'scale' must be positive. Got scale=-1."
+    assert str(error.value) == expected_error
+
+
+def test_video_overlay_with_clip_and_resize():
+    video = Video(test_files[0])
+    video.defer()
+    video.clip(
+        start=0,
+        end=2
+    )
+    video.overlay(
+        image=Image(test_files[4]),
+        x=1700,
+        y=100,
+        start=1,
+        scale=0.25
+    )
+    video.resize(
+        height=360,
+        width=640
+    )
+    # Clip, overlay and resize run in a single encode
+    assert [operation["op"] for operation in video.plan()] == [
+        "clip",
+        "overlay",
+        "resize"
+    ]
+    video.render()
+    output = video.metadata()
+    assert output["streams"][0]["height"] == 360
+    assert round(float(output["duration"])) == 2
+    assert output["streams"][1]["codec_type"] == "audio"
+
+
+def test_video_from_images_wrong_fps():
+    with pytest.raises(ValueError) as error:
+        Video.from_images(
+            pattern="frames/%04d.png",
+            fps=0
+        )
+    expected_error = "Invalid value: 'fps' must be positive. Got fps=0."
+    assert str(error.value) == expected_error
+
+
+def test_video_to_and_from_images(tmp_path):
+    video = Video(test_files[0])
+    video.clip(
+        start=0,
+        end=2
+    )
+    video.to_images(
+        pattern=str(tmp_path / "%04d.png"),
+        fps=5
+    )
+    assert len(os.listdir(tmp_path)) == 10
+    images_video = Video.from_images(
+        pattern=str(tmp_path / "*.png"),
+        fps=5
+    )
+    output = images_video.metadata()
+    assert output["streams"][0]["height"] == 1080
+    assert output["streams"][0]["nb_frames"] == "10"
+
+
+def test_video_to_gif_invalid_dither():
+    video = Video(test_files[0])
+    with pytest.raises(ValueError) as error:
+        video.to_gif(
+            path="test_fastedit.gif",
+            dither="random"
+        )
+    expected_error = (
+        "Invalid dither 'random'. Expected one of: none, bayer, "
+        "floyd_steinberg, sierra2, sierra2_4a."
+    )
+    assert str(error.value) == expected_error
+
+
+def test_video_to_webp_invalid_quality():
+    video = Video(test_files[0])
+    with pytest.raises(ValueError) as error:
+        video.to_webp(
+            path="test_fastedit.webp",
+            quality=101
+        )
+    expected_error = (
+        "Invalid value: 'quality' must be between 0 and 100. "
+        "Got quality=101."
+    )
+    assert str(error.value) == expected_error
+
+
+def test_video_to_gif_end_out_of_range():
+    video = Video(test_files[0])
+    with pytest.raises(ValueError) as error:
+        video.to_gif(
+            path="test_fastedit.gif",
+            start=1,
+            end=20
+        )
+    assert str(error.value).startswith(
+        "Invalid 'end' value: 'end' must be less than or equal to"
+    )
+
+
+@pytest.mark.parametrize(
+    "method, extension, codec_name",
+    [
+        ("to_gif", ".gif", "gif"),
+        ("to_apng", ".png", "apng")
+    ]
+)
+def test_video_animations(method, extension, codec_name):
+    video = Video(test_files[0])
+    save_path = "test_fastedit_animation" + extension
+    getattr(video, method)(
+        path=save_path,
+        start=2,
+        end=4,
+        fps=5,
+        width=320
+    )
+    output = ffmpeg.probe(save_path)
+    assert output["streams"][0]["codec_name"] == codec_name
+    assert output["streams"][0]["width"] == 320
+    assert output["streams"][0]["height"] == 180
+    os.remove(save_path)
+
+
+def test_video_to_webp():
+    video = Video(test_files[0])
+    save_path = "test_fastedit_animation.webp"
+    video.to_webp(
+        path=save_path,
+        start=2,
+        end=4,
+        fps=5,
+        width=320
+    )
+    # FFprobe does not decode animated WebP, checking its chunks instead
+    with open(save_path, "rb") as file:
+        data = file.read()
+    assert data[8:12] == b"WEBP"
+    assert data.count(b"ANMF") == 10
+    os.remove(save_path)
+
+
+def test_video_audio_operations_copy_video():
+    video = Video(test_files[0])
+    video.clip(
+        start=0,
+        end=4
+    )
+    video_stream = video.metadata()["streams"][0]
+    video.defer()
+    video.gain(3)
+    video.fade_audio(
+        fade_out=1
+    )
+    video.render()
+    output = video.metadata()
+    assert output["streams"][0] == video_stream
+    assert output["streams"][1]["codec_type"] == "audio"
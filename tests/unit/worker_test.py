@@ -0,0 +1,70 @@
+from fastedit.cli.worker import main, run_worker, _claim, _prepare_spool
+from fastedit.core.EditPlan import EditPlan
+from fastedit.core.Scheduler import get_scheduler, set_scheduler
+from fastedit.io.Audio import Audio
+import pytest
+import os
+
+
+test_files = [
+    "./media/test_audio.mp3"
+]
+
+
+def write_plan(spool, name, operations, output):
+    edit_plan = EditPlan(
+        source=os.path.abspath(test_files[0]),
+        output=str(output),
+        operations=operations
+    )
+    with open(os.path.join(spool, "pending", name), "wb") as file:
+        file.write(edit_plan.dumps())
+
+
+def test_run_worker_jobs_negative(tmp_path):
+    with pytest.raises(ValueError) as error:
+        run_worker(
+            spool=str(tmp_path),
+            jobs=0
+        )
+    expected_error = (
+        "Invalid value: 'jobs' must be a positive integer. Got jobs=0."
+    )
+    assert str(error.value) == expected_error
+
+
+def test_claim_is_exclusive(tmp_path):
+    spool = str(tmp_path)
+    _prepare_spool(spool)
+    write_plan(spool, "a.json", [], tmp_path / "a.mp3")
+    path = _claim(spool)
+    assert path == os.path.join(spool, "running", "a.json")
+    assert _claim(spool) is None
+
+
+def test_worker_runs_spool(tmp_path):
+    spool = str(tmp_path)
+    _prepare_spool(spool)
+    clip = [{"op": "clip", "params": {"start": 0, "end": 5}}]
+    write_plan(spool, "a.json", clip, tmp_path / "a.mp3")
+    write_plan(spool, "b.json", clip, tmp_path / "b.mp3")
+    write_plan(
+        spool,
+        "c.json",
+        [{"op": "unknown", "params": {}}],
+        tmp_path / "c.mp3"
+    )
+    previous = get_scheduler()
+    try:
+        exit_code = main([spool, "--jobs", "2", "--once"])
+    finally:
+        set_scheduler(previous)
+    assert exit_code == 0
+    assert sorted(os.listdir(tmp_path / "done")) == ["a.json", "b.json"]
+    assert sorted(os.listdir(tmp_path / "failed")) == [
+        "c.json",
+        "c.json.error"
+    ]
+    assert os.listdir(tmp_path / "pending") == []
+    output = Audio(str(tmp_path / "a.mp3")).metadata()
+    assert int(float(output["duration"])) == 5